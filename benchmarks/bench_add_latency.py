@@ -0,0 +1,73 @@
+"""Per-add latency of the expense table at different ledger sizes.
+
+Fills a ledger with N synthetic expenses, builds the table once, then times
+adding single expenses the way ``ExpenseTrackerApp.add_expense`` does
+(ledger append + ``ExpenseTable.row_added`` + Tk idle processing).
+
+Needs a display (or Xvfb):
+
+    python benchmarks/bench_add_latency.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from expense_table import ExpenseTable
+from synthetic import synthetic_ledger, synthetic_records
+
+
+class BenchApp:
+    """The bits of ExpenseTrackerApp that ExpenseTable reads."""
+
+    def __init__(self, expenses):
+        self.expenses = expenses
+        self.currency_symbol = "$"
+        self.filter_result = None
+
+
+def bench_size(root, size, adds, seed):
+    frame = tk.Frame(root)
+    app = BenchApp(synthetic_ledger(size, seed=seed))
+    table = ExpenseTable(frame, app, lambda col: None)
+    table.rebuild()
+    root.update()
+
+    timings = []
+    for record in synthetic_records(adds, seed=seed + 1):
+        start = time.perf_counter()
+        expense_id = app.expenses.append(*record)
+        table.row_added(expense_id)
+        root.update_idletasks()
+        timings.append(time.perf_counter() - start)
+
+    frame.destroy()
+    timings.sort()
+    return {
+        'rows': size,
+        'median_ms': timings[len(timings) // 2] * 1000,
+        'p95_ms': timings[int(len(timings) * 0.95)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--adds', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.withdraw()
+    for size in args.sizes:
+        result = bench_size(root, size, args.adds, args.seed)
+        print(f"{result['rows']:>9} rows: median {result['median_ms']:.3f} ms, p95 {result['p95_ms']:.3f} ms per add")
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
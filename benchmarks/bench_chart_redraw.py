@@ -0,0 +1,119 @@
+"""Redraw time of the dashboard charts for a five-year daily ledger.
+
+Fills a ledger with expenses on every day of five years, then times, for
+each chart type:
+
+- rebuild: a new figure plotting every day, like the old ``generate_chart``
+  did before it called ``plt.show()``
+- first: the first ``ChartPanel.show`` of that chart type
+- update: ``ChartPanel.show`` after adding one expense, which updates the
+  existing artists in place
+
+Every timing includes preparing the data the way the dashboard does and a
+full ``canvas.draw()``. Needs a display (or Xvfb):
+
+    python benchmarks/bench_chart_redraw.py --years 5 --per-day 3
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tkinter as tk
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from ledger import Ledger
+from charts import ChartPanel
+from expense_tracker import prepare_chart_data
+
+CATEGORIES = ["Rent", "Food", "Entertainment", "Car", "Credit Cards"]
+
+
+def daily_records(years, per_day, rng):
+    first_day = date(2020, 1, 1).toordinal()
+    return [{
+        'date': date.fromordinal(day).strftime('%Y-%m-%d'),
+        'category': rng.choice(CATEGORIES),
+        'amount': round(rng.uniform(1, 500), 2)
+    } for day in range(first_day, first_day + years * 365) for _ in range(per_day)]
+
+
+def time_call(function, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2] * 1000
+
+
+def rebuild(ledger, chart_type):
+    """Builds and draws a new figure with every day on it."""
+    by_category = ledger.sum_by_category()
+    by_date = ledger.sum_by_date()
+    dates = [datetime.strptime(day, '%Y-%m-%d') for day in by_date]
+
+    figure = Figure(figsize=(10, 6))
+    axes = figure.add_subplot()
+    if chart_type == 'pie':
+        axes.pie(by_category.values(), labels=by_category.keys(), autopct='%1.1f%%')
+    elif chart_type == 'bar':
+        axes.bar(by_category.keys(), by_category.values())
+    else:
+        axes.plot(dates, list(by_date.values()), marker='o')
+    figure.tight_layout()
+    FigureCanvasAgg(figure).draw()
+
+
+def show(panel, ledger, chart_type):
+    totals = ledger.sum_by_category(), ledger.sum_by_day()
+    panel.show(chart_type, *prepare_chart_data(lambda: totals, panel.plot_width()))
+    panel.canvas.draw()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--years', type=int, default=5)
+    parser.add_argument('--per-day', type=int, default=3)
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ledger = Ledger.from_records(daily_records(args.years, args.per_day, rng))
+    print(f"{len(ledger):,} expenses over {len(ledger.sum_by_day()):,} days")
+
+    root = tk.Tk()
+    root.geometry("1000x400")
+    panel = ChartPanel(root)
+    panel.widget.pack(fill=tk.BOTH, expand=True)
+    root.update()
+
+    for chart_type in ('pie', 'bar', 'line'):
+        rebuild_ms = time_call(lambda: rebuild(ledger, chart_type), args.repeats)
+        panel.clear()
+        first_ms = time_call(lambda: (panel.clear(), show(panel, ledger, chart_type)), args.repeats)
+
+        def update():
+            ledger.append(date.fromordinal(rng.choice(list(ledger.sum_by_day()))).strftime('%Y-%m-%d'),
+                          rng.choice(CATEGORIES), 10.0)
+            show(panel, ledger, chart_type)
+        update_ms = time_call(update, args.repeats)
+
+        if chart_type == 'line':
+            shown = f"{len(panel.line.get_xdata()):,} points by {panel.series_kind}"
+        else:
+            shown = f"{len(panel.categories)} categories"
+        print(f"{chart_type:>4}: rebuild {rebuild_ms:8.1f} ms, first {first_ms:8.1f} ms, update {update_ms:8.1f} ms ({shown})")
+    root.destroy()
+
+
+if __name__ == '__main__':
+    main()
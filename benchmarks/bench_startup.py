@@ -0,0 +1,97 @@
+"""Import time of the app, checked against a budget.
+
+Runs ``python -X importtime -c "import expense_tracker"`` in a fresh
+interpreter a few times and reports the median cumulative import time of
+``expense_tracker`` and the slowest modules it pulls in. Exits with status
+1 if the median is over ``--budget-ms``, or if one of the libraries that
+should only load on first use (matplotlib, tkcalendar) was imported.
+
+With ``--window`` it also times a fresh interpreter up to the first paint
+of the home screen, which needs a display (or Xvfb):
+
+    python benchmarks/bench_startup.py --budget-ms 100 --window
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Top-level packages that must not be imported before they are needed
+DEFERRED = ('matplotlib', 'tkcalendar')
+
+FIRST_PAINT = """
+import time
+start = time.perf_counter()
+import tkinter as tk
+import expense_tracker
+root = tk.Tk()
+app = expense_tracker.ExpenseTrackerApp(root)
+root.update()
+print((time.perf_counter() - start) * 1000)
+app.on_close()
+"""
+
+
+def import_times():
+    """Returns {module: cumulative microseconds} for one import of expense_tracker."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import expense_tracker'],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"import expense_tracker failed:\n{result.stderr}")
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def first_paint_ms():
+    result = subprocess.run([sys.executable, '-c', FIRST_PAINT], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"starting the app failed:\n{result.stderr}")
+    return float(result.stdout.split()[0])
+
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=100.0)
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--window', action='store_true', help="also time the first paint of the home screen")
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    total_ms = median([times['expense_tracker'] for times in runs]) / 1000
+    print(f"import expense_tracker: {total_ms:.1f} ms (median of {args.runs}, budget {args.budget_ms:.0f} ms)")
+
+    last = runs[-1]
+    for name in sorted(last, key=last.get, reverse=True)[1:args.top + 1]:
+        print(f"  {last[name] / 1000:8.1f} ms  {name}")
+
+    failed = total_ms > args.budget_ms
+    imported_early = sorted({name.split('.')[0] for name in last} & set(DEFERRED))
+    if imported_early:
+        print(f"imported at startup but should load on first use: {', '.join(imported_early)}")
+        failed = True
+
+    if args.window:
+        paint_ms = median([first_paint_ms() for _ in range(args.runs)])
+        print(f"first paint of the home screen: {paint_ms:.1f} ms (median of {args.runs})")
+
+    if failed:
+        print("over budget")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,413 @@
+"""Timings of the app's hot paths on synthetic dashboards, written as JSON.
+
+For each ledger size a dashboard is generated with synthetic.py (same seed,
+same expenses) and these are timed:
+
+- add_expense: ``add_expense`` with its ``update_budget_info``, per expense
+- update_expense_list: rebuilding the expense table from the whole ledger
+- sort_by_column: sorting by each column from scratch (no cached order)
+- load_data / save_data: opening the file and saving it again
+- chart_data: preparing the chart totals and line series like ``generate_chart``
+- filter: filtering for one category over 200 in one quarter, once the
+  filter indexes are built
+
+With a display (or Xvfb) the real ``ExpenseTrackerApp`` runs in a withdrawn
+window, with its file dialogs answered by the benchmark. Without one the
+suite runs headless: files and expenses go through ``engine.Dashboard``,
+and the app's own table methods run against a Treeview stand-in, which
+leaves out only Tk's work. The mode is recorded in the results, and
+results of different modes are not compared.
+
+    python benchmarks/bench_suite.py --sizes 10000 100000 --output new.json
+    python benchmarks/bench_suite.py --baseline old.json --tolerance 0.25
+
+With ``--baseline``, exits with status 1 if a median got slower by more than
+the tolerance (a fraction of the baseline median).
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tkinter as tk
+from datetime import date, datetime
+from tkinter import ttk
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import expense_table
+import expense_tracker
+from engine import Dashboard
+from expense_filter import ExpenseFilter, FilterResult
+from expense_table import ExpenseTable
+from expense_tracker import ExpenseTrackerApp, prepare_chart_data
+from instrumentation import Instrumentation
+from synthetic import FIRST_DAY, synthetic_records, write_synthetic
+
+# Width in pixels the line series is prepared for, about that of the dashboard's chart
+CHART_POINTS = 800
+
+SORT_COLUMNS = ('Date', 'Category', 'Amount')
+
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        'repeats': len(timings),
+        'median_ms': timings[len(timings) // 2] * 1000,
+        'p95_ms': timings[min(int(len(timings) * 0.95), len(timings) - 1)] * 1000,
+        'min_ms': timings[0] * 1000,
+    }
+
+
+def time_calls(function, repeats, setup=None):
+    """Returns the time of each of repeats calls, running setup untimed before each."""
+    timings = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+class AnsweredDialogs:
+    """Stands in for filedialog and messagebox, answering file dialogs with one path."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def askopenfilename(self, **options):
+        return self.path
+
+    def asksaveasfilename(self, **options):
+        return self.path
+
+    def showinfo(self, title, message):
+        pass
+
+    def showwarning(self, title, message):
+        raise RuntimeError(f"{title}: {message}")
+
+    def showerror(self, title, message):
+        raise RuntimeError(f"{title}: {message}")
+
+
+class StubWidget:
+    """Stands in for a ttk widget whose only job is to be laid out."""
+
+    def __init__(self, parent=None, **options):
+        pass
+
+    def grid(self, **options):
+        pass
+
+    def set(self, first, last):
+        pass
+
+
+class StubTreeview(StubWidget):
+    """Stands in for ttk.Treeview without a display, keeping its items in order like Tk."""
+
+    def __init__(self, parent=None, **options):
+        self.items = {}  # iid -> values
+        self.order = []
+
+    def heading(self, column, **options):
+        pass
+
+    def configure(self, **options):
+        pass
+
+    def yview(self, *args):
+        pass
+
+    def get_children(self, item=''):
+        return tuple(self.order)
+
+    def insert(self, parent, index, iid, values):
+        self.items[iid] = values
+        if index == 'end':
+            self.order.append(iid)
+        else:
+            self.order.insert(index, iid)
+
+    def item(self, iid, values=None):
+        if values is not None:
+            self.items[iid] = values
+        return {'values': self.items[iid]}
+
+    def move(self, iid, parent, index):
+        self.order.remove(iid)
+        self.order.insert(index, iid)
+
+    def set_children(self, parent, *items):
+        self.order = list(items)
+
+    def delete(self, *items):
+        if len(items) == len(self.order):
+            self.items.clear()
+            self.order = []
+            return
+        for item in items:
+            del self.items[item]
+        removed = set(items)
+        self.order = [item for item in self.order if item not in removed]
+
+    def selection(self):
+        return ()
+
+
+# Replaces expense_table's ttk while HeadlessHarness runs
+StubTtk = SimpleNamespace(Treeview=StubTreeview, Scrollbar=StubWidget)
+
+
+class HeadlessApp:
+    """The state ExpenseTrackerApp's table methods use, with those methods taken from the app."""
+
+    update_expense_list = ExpenseTrackerApp.update_expense_list
+    sort_by_column = ExpenseTrackerApp.sort_by_column
+
+    def __init__(self, dashboard):
+        self.expenses = dashboard.expenses
+        self.currency_symbol = dashboard.currency_symbol
+        self.filter_result = None
+        self.instruments = Instrumentation()
+        self.expense_table = ExpenseTable(None, self, self.sort_by_column)
+        self.expense_tree = self.expense_table.tree
+        self.sort_columns = []
+        self.sort_descending = False
+
+
+class AppHarness:
+    """Runs the hot paths through ExpenseTrackerApp in a withdrawn Tk window."""
+
+    tk = True
+
+    def __init__(self, path):
+        self.root = tk.Tk()
+        self.root.withdraw()
+        dialogs = AnsweredDialogs(path)
+        expense_tracker.filedialog = expense_tracker.messagebox = dialogs
+        self.app = expense_tracker.ExpenseTrackerApp(self.root)
+        import tkcalendar  # The app imports it ahead of the first dashboard, keep it out of load_data
+
+    def load(self):
+        self.app.load_data()
+        while not self.app.data_loaded:
+            self.root.update()
+        self.root.update_idletasks()
+
+    def save(self):
+        self.app.save_data()
+        self.app.scheduler.wait('save')
+
+    def fill_form(self, record):
+        day, category, amount = record
+        self.app.date_entry.set_date(date.fromisoformat(day))
+        self.app.category_combobox.set(category)
+        self.app.amount_entry.delete(0, tk.END)
+        self.app.amount_entry.insert(0, str(amount))
+
+    def add_expense(self):
+        self.app.add_expense()
+        self.root.update_idletasks()
+
+    def update_expense_list(self):
+        self.app.update_expense_list()
+        self.root.update_idletasks()
+
+    def forget_sort(self):
+        self.app.expenses._sort_cache.clear()  # So every sort starts from scratch
+        self.app.sort_columns = []
+
+    def sort_by_column(self, column):
+        self.app.sort_by_column(column)
+        self.root.update_idletasks()
+
+    def chart_data(self):
+        return prepare_chart_data(self.app.chart_totals_reader(), CHART_POINTS)
+
+    def filter_expenses(self, expense_filter):
+        self.app.filter_result = FilterResult(self.app.expenses, expense_filter)
+        self.app.update_expense_list()
+        self.root.update_idletasks()
+        self.app.filter_result = None
+
+    def close(self):
+        self.app.on_close()
+
+
+class HeadlessHarness:
+    """Runs the hot paths through engine.Dashboard, and the app's table methods against StubTreeview."""
+
+    tk = False
+
+    def __init__(self, path):
+        self.path = path
+        self.dashboard = None
+        self.app = None
+        self.record = None
+        expense_table.ttk = StubTtk
+
+    def load(self):
+        self.dashboard = Dashboard.load(self.path)
+        self.app = HeadlessApp(self.dashboard)
+        self.app.update_expense_list()
+
+    def save(self):
+        self.dashboard.save()
+
+    def fill_form(self, record):
+        self.record = record
+
+    def add_expense(self):
+        expense_id = self.dashboard.add_expense(*self.record)
+        self.app.expense_table.row_added(expense_id)
+        # What update_budget_info shows
+        today = datetime.now()
+        self.dashboard.total()
+        self.dashboard.month_spending(today.year, today.month)
+
+    def update_expense_list(self):
+        self.app.update_expense_list()
+
+    def forget_sort(self):
+        self.dashboard.expenses._sort_cache.clear()  # So every sort starts from scratch
+        self.app.sort_columns = []
+
+    def sort_by_column(self, column):
+        self.app.sort_by_column(column)
+
+    def chart_data(self):
+        ledger = self.dashboard.expenses
+        totals = ledger.sum_by_category(), ledger.sum_by_day()
+        return prepare_chart_data(lambda: totals, CHART_POINTS)
+
+    def filter_expenses(self, expense_filter):
+        self.app.filter_result = FilterResult(self.dashboard.expenses, expense_filter)
+        self.app.update_expense_list()
+        self.app.filter_result = None
+
+    def close(self):
+        expense_table.ttk = ttk
+
+
+def bench_size(harness_class, size, args, directory):
+    """Returns the results of every benchmark for one ledger size."""
+    path = os.path.join(directory, f"synthetic_{size}.json")
+    ledger = write_synthetic(path, size, args.categories, args.days, args.seed)
+    results = {}
+
+    harness = harness_class(path)
+    try:
+        results['load_data'] = time_calls(harness.load, args.repeats)
+        results['save_data'] = time_calls(harness.save, args.repeats)
+
+        records = iter(synthetic_records(args.adds, args.categories, args.days, args.seed + 1))
+        results['add_expense'] = time_calls(harness.add_expense, args.adds, lambda: harness.fill_form(next(records)))
+
+        results['update_expense_list'] = time_calls(harness.update_expense_list, args.repeats)
+        for column in SORT_COLUMNS:
+            results[f'sort_by_column[{column}]'] = time_calls(lambda: harness.sort_by_column(column), args.repeats,
+                                                              harness.forget_sort)
+        results['chart_data'] = time_calls(harness.chart_data, args.repeats)
+
+        expense_filter = ExpenseFilter(categories=[ledger.category_names[-1]], min_amount=200,
+                                       first_day=FIRST_DAY.toordinal() + 90, last_day=FIRST_DAY.toordinal() + 180)
+        harness.filter_expenses(expense_filter)  # Builds the indexes
+        results['filter'] = time_calls(lambda: harness.filter_expenses(expense_filter), args.repeats)
+    finally:
+        harness.close()
+
+    return [{'benchmark': name, 'rows': size, **summarize(timings)} for name, timings in results.items()]
+
+
+def choose_harness(mode):
+    if mode == 'no':
+        return HeadlessHarness
+    try:
+        tk.Tk().destroy()
+    except tk.TclError:
+        if mode == 'yes':
+            raise
+        return HeadlessHarness
+    return AppHarness
+
+
+def compare(results, baseline, tolerance):
+    """Prints how each median changed against a baseline run and returns the regressions."""
+    if baseline['tk'] != results['tk']:
+        raise ValueError("The baseline was run in a different Tk mode, its timings are not comparable")
+
+    before = {(result['benchmark'], result['rows']): result['median_ms'] for result in baseline['results']}
+    regressions = []
+    for result in results['results']:
+        key = (result['benchmark'], result['rows'])
+        if key not in before:
+            continue
+        change = result['median_ms'] / before[key] - 1 if before[key] else 0.0
+        slower = change > tolerance
+        print(f"  {result['benchmark']:<26} {result['rows']:>10,} rows  {before[key]:9.3f} -> "
+              f"{result['median_ms']:9.3f} ms  {change:+7.1%}{'  REGRESSION' if slower else ''}", file=sys.stderr)
+        if slower:
+            regressions.append(result)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--categories', type=int, default=5)
+    parser.add_argument('--days', type=int, default=5 * 365)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--adds', type=int, default=200)
+    parser.add_argument('--tk', choices=('auto', 'yes', 'no'), default='auto',
+                        help="run the real app in a Tk window (needs a display), headless, or whichever is possible")
+    parser.add_argument('--output', help="file to write the JSON results to, instead of standard output")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    harness_class = choose_harness(args.tk)
+    directory = tempfile.mkdtemp(prefix='spendo-bench-')
+    try:
+        results = []
+        for size in args.sizes:
+            print(f"{size:,} rows ({'Tk' if harness_class.tk else 'headless'})", file=sys.stderr)
+            results.extend(bench_size(harness_class, size, args, directory))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'tk': harness_class.tk,
+        'config': {key: getattr(args, key) for key in ('sizes', 'categories', 'days', 'seed', 'repeats', 'adds')},
+        'results': results,
+    }
+    text = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            regressions = compare(report, json.load(file), args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} benchmarks slower than the baseline by more than {args.tolerance:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
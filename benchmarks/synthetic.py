@@ -0,0 +1,89 @@
+"""Seeded generator of synthetic dashboards for the benchmarks.
+
+The same arguments always give the same expenses, so runs on different
+machines or commits time the same data. Files are written by the same code
+as the app's Save, so they are exactly what it would have written:
+
+    python benchmarks/synthetic.py dashboard.json --rows 1000000 --categories 20 --days 1825
+"""
+
+import argparse
+import os
+import random
+import sys
+from array import array
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import write_dashboard
+from ledger import DEFAULT_CATEGORIES, Ledger
+
+FIRST_DAY = date(2020, 1, 1)
+
+
+def category_names(count):
+    """Returns the default categories, followed by numbered ones if more are asked for."""
+    names = list(DEFAULT_CATEGORIES[:count])
+    names.extend(f"Category {number}" for number in range(len(names) + 1, count + 1))
+    return names
+
+
+def synthetic_ledger(rows, categories=5, days=5 * 365, seed=0, first_day=FIRST_DAY):
+    """Returns a Ledger of rows expenses spread over days days from first_day, in categories categories."""
+    rng = random.Random(seed)
+    names = category_names(categories)
+    first = first_day.toordinal()
+
+    ledger = Ledger()
+    for name in names:
+        ledger.intern_category(name)
+    ledger.extend_columns(array('i', [first + rng.randrange(days) for _ in range(rows)]),
+                          array('H', [rng.randrange(categories) for _ in range(rows)]),
+                          array('d', [round(rng.uniform(1, 500), 2) for _ in range(rows)]))
+    return ledger
+
+
+def synthetic_records(count, categories=5, days=5 * 365, seed=0, first_day=FIRST_DAY):
+    """Returns (date, category, amount) tuples of more expenses like synthetic_ledger's, e.g. to add one at a time."""
+    rng = random.Random(seed)
+    names = category_names(categories)
+    first = first_day.toordinal()
+    return [(date.fromordinal(first + rng.randrange(days)).isoformat(), names[rng.randrange(categories)],
+             round(rng.uniform(1, 500), 2)) for _ in range(count)]
+
+
+def synthetic_settings(ledger, monthly_budget=2000.0, currency_symbol="$", revision=1):
+    """Returns the settings the app saves with a ledger."""
+    return {
+        'monthly_budget': monthly_budget,
+        'currency_symbol': currency_symbol,
+        'categories': list(ledger.category_names),
+        'revision': revision
+    }
+
+
+def write_synthetic(path, rows, categories=5, days=5 * 365, seed=0, file_format=None):
+    """Writes a synthetic dashboard file and returns its ledger."""
+    ledger = synthetic_ledger(rows, categories, days, seed)
+    write_dashboard(path, ledger, synthetic_settings(ledger), file_format)
+    return ledger
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('path', help="dashboard file to write, its format chosen by the extension like in the app")
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--categories', type=int, default=5)
+    parser.add_argument('--days', type=int, default=5 * 365, help="date span, from 2020-01-01")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.categories < 1 or args.days < 1:
+        parser.error("--categories and --days must be at least 1")
+    write_synthetic(args.path, args.rows, args.categories, args.days, args.seed)
+    print(f"Wrote {args.rows:,} expenses in {args.categories} categories over {args.days} days to {args.path}")
+
+
+if __name__ == '__main__':
+    main()
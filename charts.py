@@ -0,0 +1,214 @@
+"""Chart panel embedded in the dashboard.
+
+``ChartPanel`` owns one matplotlib figure drawn by a ``FigureCanvasTkAgg``
+that lives as long as the dashboard. Showing the same kind of chart again
+updates the existing artists (wedge angles, bar heights, line data) and
+asks for an idle redraw, instead of building a new figure and window.
+
+A line chart has one point per day, which for a few years of expenses is
+far more points than the plot is pixels wide. ``line_series`` rolls the
+days up into weeks or months until they fit, and falls back to min/max
+downsampling (the lowest and highest day of each pixel-wide slice) for
+ranges too long even for months.
+
+matplotlib takes longer to import than the rest of the app put together,
+so it is only imported when the first ``ChartPanel`` is made (or by
+``import_matplotlib`` to warm it up in the background); the series
+functions here do not need it.
+"""
+
+import math
+from datetime import date, datetime
+
+PIE_LABEL_DISTANCE = 1.1
+PIE_PCT_DISTANCE = 0.6
+
+# X-axis label of the line chart for each kind of point line_series returns
+SERIES_LABELS = {'day': 'Date', 'week': 'Week', 'month': 'Month', 'minmax': 'Date'}
+
+
+def import_matplotlib():
+    """Imports the matplotlib modules the panel uses and returns (dates, FigureCanvasTkAgg, Figure)."""
+    import matplotlib.dates as mdates
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+    from matplotlib.figure import Figure
+    return mdates, FigureCanvasTkAgg, Figure
+
+
+def week_start(day):
+    """Returns the day number of the Monday on or before a day number."""
+    return day - (day - 1) % 7  # Day 1, 0001-01-01, was a Monday
+
+
+def month_start(day):
+    return date.fromordinal(day).replace(day=1).toordinal()
+
+
+def roll_up(days, amounts, bucket_start):
+    """Sums sorted per-day totals into buckets, keyed by the first day of each bucket."""
+    bucket_days, bucket_amounts = [], []
+    for day, amount in zip(days, amounts):
+        start = bucket_start(day)
+        if bucket_days and bucket_days[-1] == start:
+            bucket_amounts[-1] += amount
+        else:
+            bucket_days.append(start)
+            bucket_amounts.append(amount)
+    return bucket_days, bucket_amounts
+
+
+def min_max_downsample(days, amounts, slices):
+    """Keeps the lowest and highest point of each of ``slices`` equal date ranges, in date order."""
+    first, span = days[0], days[-1] - days[0] + 1
+    kept_days, kept_amounts = [], []
+    start = 0
+    while start < len(days):
+        slice_number = (days[start] - first) * slices // span
+        end = start + 1
+        while end < len(days) and (days[end] - first) * slices // span == slice_number:
+            end += 1
+
+        low = min(range(start, end), key=amounts.__getitem__)
+        high = max(range(start, end), key=amounts.__getitem__)
+        for index in sorted({low, high}):
+            kept_days.append(days[index])
+            kept_amounts.append(amounts[index])
+        start = end
+    return kept_days, kept_amounts
+
+
+def line_series(days, amounts, max_points):
+    """Returns (days, amounts, kind) with at most about max_points points, kind being a SERIES_LABELS key."""
+    if len(days) <= max_points:
+        return days, amounts, 'day'
+    for kind, bucket_start in (('week', week_start), ('month', month_start)):
+        bucket_days, bucket_amounts = roll_up(days, amounts, bucket_start)
+        if len(bucket_days) <= max_points:
+            return bucket_days, bucket_amounts, kind
+    return (*min_max_downsample(days, amounts, max(1, max_points // 2)), 'minmax')
+
+
+class ChartPanel:
+    def __init__(self, parent, width=6, height=3):
+        self.mdates, FigureCanvasTkAgg, Figure = import_matplotlib()
+        self.figure = Figure(figsize=(width, height), dpi=100)
+        self.axes = self.figure.add_subplot()
+        self.axes.set_axis_off()  # Empty until the first chart is shown
+        self.canvas = FigureCanvasTkAgg(self.figure, master=parent)
+        self.widget = self.canvas.get_tk_widget()
+
+        self.chart_type = None
+        self.series_kind = None
+        self.categories = None  # Category names the pie or bars were built for
+        self.wedges = self.labels = self.percentages = None
+        self.bars = None
+        self.line = None
+
+        # matplotlib date numbers are days, offset from its configurable epoch
+        self._date_offset = self.mdates.date2num(datetime.fromordinal(1)) - 1
+
+    def plot_width(self):
+        """Returns the width of the plot area in pixels, the most line points worth drawing."""
+        return max(1, int(self.axes.bbox.width))
+
+    def show(self, chart_type, expenses_by_category, days, amounts, series_kind):
+        """Shows a 'pie', 'bar' or 'line' chart, reusing the artists of the one on show if possible."""
+        names = tuple(expenses_by_category)
+        values = list(expenses_by_category.values())
+
+        if chart_type == 'line':
+            if self.chart_type != 'line':
+                self._build_line()
+            self._update_line(days, amounts, series_kind)
+        elif chart_type in ('pie', 'bar'):
+            if self.chart_type != chart_type or self.categories != names:
+                build = self._build_pie if chart_type == 'pie' else self._build_bar
+                build(names, values)
+            elif chart_type == 'pie':
+                self._update_pie(values)
+            else:
+                self._update_bar(values)
+        else:
+            raise ValueError(f"Unknown chart type: {chart_type}")
+
+        self.chart_type = chart_type
+        self.canvas.draw_idle()
+
+    def clear(self):
+        self.axes.clear()
+        self.axes.set_axis_off()
+        self.chart_type = self.categories = None
+        self.canvas.draw_idle()
+
+    def _reset_axes(self):
+        self.axes.clear()
+        self.axes.set_axis_on()
+        self.axes.set_frame_on(True)
+        self.wedges = self.labels = self.percentages = self.bars = self.line = None
+
+    # Pie chart
+
+    def _build_pie(self, names, values):
+        self._reset_axes()
+        self.wedges, self.labels, self.percentages = self.axes.pie(
+            values, labels=names, autopct='%1.1f%%', labeldistance=PIE_LABEL_DISTANCE, pctdistance=PIE_PCT_DISTANCE)
+        self.axes.set_title('Expenses by Category (Pie Chart)')
+        self.categories = names
+        self.figure.tight_layout()
+
+    def _update_pie(self, values):
+        total = sum(values)
+        theta = 0.0
+        for wedge, label, percentage, value in zip(self.wedges, self.labels, self.percentages, values):
+            fraction = value / total if total else 0.0
+            wedge.set_theta1(theta)
+            theta += 360.0 * fraction
+            wedge.set_theta2(theta)
+
+            middle = math.radians((wedge.theta1 + wedge.theta2) / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_position((PIE_LABEL_DISTANCE * x, PIE_LABEL_DISTANCE * y))
+            label.set_horizontalalignment('left' if x > 0 else 'right')
+            percentage.set_position((PIE_PCT_DISTANCE * x, PIE_PCT_DISTANCE * y))
+            percentage.set_text(f"{fraction * 100:.1f}%")
+
+    # Bar graph
+
+    def _build_bar(self, names, values):
+        self._reset_axes()
+        self.bars = self.axes.bar(names, values)
+        self.axes.set_title('Expenses by Category (Bar Graph)')
+        self.axes.set_xlabel('Category')
+        self.axes.set_ylabel('Amount')
+        self.categories = names
+        self.figure.tight_layout()
+
+    def _update_bar(self, values):
+        for bar, value in zip(self.bars, values):
+            bar.set_height(value)
+        self.axes.relim()
+        self.axes.autoscale_view()
+
+    # Line chart
+
+    def _build_line(self):
+        self._reset_axes()
+        (self.line,) = self.axes.plot([], [], marker='o', markersize=3)
+        self.axes.set_ylabel('Amount')
+        self.axes.xaxis_date()
+        self.axes.xaxis.set_major_formatter(self.mdates.DateFormatter('%d %b, %Y'))
+        self.axes.xaxis.set_major_locator(self.mdates.AutoDateLocator())
+        self.categories = None
+        self.series_kind = None
+
+    def _update_line(self, days, amounts, series_kind):
+        offset = self._date_offset
+        self.line.set_data([day + offset for day in days], amounts)
+        if series_kind != self.series_kind:
+            label = SERIES_LABELS[series_kind]
+            self.axes.set_title(f'Expenses by {label} (Line Chart)')
+            self.axes.set_xlabel(label)
+            self.series_kind = series_kind
+            self.figure.tight_layout()
+        self.axes.relim()
+        self.axes.autoscale_view()
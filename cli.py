@@ -0,0 +1,158 @@
+"""Command-line tools for dashboard files, no display needed.
+
+    python cli.py import statement.csv dashboard.json --rules bank.json
+    python cli.py summary dashboard.json
+    python cli.py consolidate mine.json partner.json -o household.json --rate €=1.08
+
+``import`` appends the expenses in a CSV bank export to a dashboard file
+(any format the app opens; a new one is created if it does not exist), see
+csv_import.py for the rules file. Close the dashboard in the app first:
+the file is rewritten with a new revision, so changes the app has not
+saved yet would be left in a stale journal.
+
+``consolidate`` merges several dashboard files into one, loading them in
+parallel, and prints the combined totals per category and per month; see
+consolidate.py for how categories, currencies and duplicate entries are
+merged.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date
+
+from consolidate import consolidate
+from csv_import import CHUNK_ROWS, CSVImporter, DEFAULT_RULES, load_rules
+from engine import Dashboard
+from time_index import month_key
+
+
+def import_command(args):
+    if os.path.exists(args.dashboard):
+        dashboard = Dashboard.load(args.dashboard)
+    else:
+        dashboard = Dashboard(monthly_budget=args.budget, currency_symbol=args.currency)
+    rules = load_rules(args.rules) if args.rules else dict(DEFAULT_RULES)
+    importer = CSVImporter(rules, chunk_rows=args.chunk_rows)
+
+    def report(result):
+        if not args.quiet:
+            print(f"\r{result.imported:,} expenses imported", end='', file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    rows_before = len(dashboard.expenses)
+    result = importer.import_file(args.csv, dashboard, progress=report)
+    parsed = time.perf_counter()
+    dashboard.save(args.dashboard)
+    saved = time.perf_counter()
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    rate = result.imported / (parsed - start) if parsed > start else 0
+    print(f"Imported {result.imported:,} expenses ({rate:,.0f} rows/s), skipped {result.skipped:,} "
+          f"that were not spending and {result.invalid:,} invalid rows")
+    if result.new_categories:
+        print(f"New categories: {', '.join(result.new_categories)}")
+    print(f"Saved {rows_before + result.imported:,} expenses to {args.dashboard} in {saved - parsed:.2f} s")
+    return 0
+
+
+def summary_command(args):
+    dashboard = Dashboard.load(args.dashboard)
+    symbol = dashboard.currency_symbol
+    print(f"{len(dashboard.expenses):,} expenses")
+    for category, total in dashboard.expenses.sum_by_category().items():
+        print(f"  {category:<20} {symbol}{total:,.2f}")
+    print(f"Monthly Budget: {symbol}{dashboard.monthly_budget:.2f}")
+    print(f"Total Expenses: {symbol}{dashboard.total():.2f}")
+
+    today = date.today()
+    spent, budget, _ = dashboard.month_spending(today.year, today.month)
+    print(f"This Month ({month_key(today.year, today.month)}): {symbol}{spent:.2f} of {symbol}{budget:.2f}")
+    print(f"Remaining Budget: {symbol}{dashboard.remaining_budget(today):.2f}")
+    return 0
+
+
+def parse_rate(text):
+    symbol, separator, value = text.rpartition('=')
+    if not separator or not symbol:
+        raise argparse.ArgumentTypeError(f"expected SYMBOL=VALUE, not {text!r}")
+    try:
+        return symbol, float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number: {value!r}")
+
+
+def consolidate_command(args):
+    start = time.perf_counter()
+    result = consolidate(args.dashboards, args.currency, dict(args.rate), dedupe=not args.keep_duplicates,
+                         workers=args.workers)
+    merged = time.perf_counter()
+
+    symbol = result.currency_symbol
+    for source in result.sources:
+        rate = f" at {source.rate:g}" if source.rate != 1.0 else ""
+        print(f"{source.path}: {source.rows:,} expenses in {source.currency_symbol}{rate}, "
+              f"{source.duplicates:,} already in another dashboard")
+    print(f"Merged {len(result.ledger):,} expenses in {merged - start:.2f} s")
+
+    rollups = result.rollups()
+    print("By category:")
+    for category, total in rollups['by_category'].items():
+        print(f"  {category:<20} {symbol}{total:,.2f}")
+    print("By month:")
+    for key, total in rollups['by_month'].items():
+        print(f"  {key:<20} {symbol}{total:,.2f}")
+    print(f"Total Expenses: {symbol}{result.ledger.total():,.2f}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as file:
+            json.dump({'currency_symbol': symbol, **rollups}, file, indent=4)
+    if args.output:
+        result.write(args.output)
+        print(f"Saved the consolidated dashboard to {args.output}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help="append a CSV bank export to a dashboard file")
+    import_parser.add_argument('csv')
+    import_parser.add_argument('dashboard')
+    import_parser.add_argument('--rules', help="JSON import rules, see csv_import.py")
+    import_parser.add_argument('--budget', type=float, default=0, help="monthly budget of a new dashboard")
+    import_parser.add_argument('--currency', default="$", help="currency symbol of a new dashboard")
+    import_parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    import_parser.add_argument('--quiet', action='store_true')
+    import_parser.set_defaults(run=import_command)
+
+    summary_parser = commands.add_parser('summary', help="print the totals of a dashboard file")
+    summary_parser.add_argument('dashboard')
+    summary_parser.set_defaults(run=summary_command)
+
+    consolidate_parser = commands.add_parser('consolidate', help="merge several dashboard files into one")
+    consolidate_parser.add_argument('dashboards', nargs='+')
+    consolidate_parser.add_argument('-o', '--output', help="dashboard file to write the consolidation to")
+    consolidate_parser.add_argument('--report', help="JSON file to write the per-category and per-month totals to")
+    consolidate_parser.add_argument('--currency', help="currency to consolidate into (default: the one most expenses are in)")
+    consolidate_parser.add_argument('--rate', type=parse_rate, action='append', default=[], metavar='SYMBOL=VALUE',
+                                    help="value of one unit of a currency in the consolidated one, repeatable")
+    consolidate_parser.add_argument('--keep-duplicates', action='store_true',
+                                    help="keep entries found in several dashboards once per dashboard")
+    consolidate_parser.add_argument('--workers', type=int, help="processes loading the files (default: one per CPU)")
+    consolidate_parser.set_defaults(run=consolidate_command)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.run(args)
+    except (OSError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
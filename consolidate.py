@@ -0,0 +1,231 @@
+"""Consolidation of many dashboards into one, for household or company reports.
+
+``consolidate`` loads the dashboard files in a process pool (each with its
+journal replayed, like opening it in the app) and merges them in the order
+given:
+
+* Categories are merged by name, ignoring case and surrounding spaces; the
+  first spelling seen is kept.
+* Currency symbols are reconciled to one target currency, by default the
+  one most expenses are in. Common spellings of the same currency count as
+  one ('USD' and 'US$' are '$', see ``CURRENCY_ALIASES``); amounts in any
+  other currency are converted with a rate from ``rates`` ({symbol: value
+  of one unit in the target currency}), which must then be given.
+* Identical entries (same date, category and amount to the cent) found in
+  several dashboards, such as a shared bill both partners recorded, are
+  kept once, using a hash index of the entries merged so far. Repeats
+  within one dashboard are real expenses and are all kept: an entry is kept
+  as often as the dashboard with the most copies of it has it.
+
+The result holds a ledger with combined per-category and per-month rollups
+that the dashboard shows and charts like any other, and can be written out
+as a new dashboard.
+"""
+
+import multiprocessing
+import os
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import Dashboard, write_dashboard
+from ledger import Ledger
+
+# Spellings of a currency that are reconciled without a rate
+CURRENCY_ALIASES = {
+    'USD': '$', 'US$': '$',
+    'EUR': '€',
+    'GBP': '£',
+    'JPY': '¥', 'CNY': '¥', 'RMB': '¥',
+    'INR': '₹', 'RS': '₹', 'RS.': '₹',
+}
+
+
+def normalize_currency(symbol):
+    symbol = symbol.strip()
+    return CURRENCY_ALIASES.get(symbol.upper(), symbol)
+
+
+def load_for_merge(path):
+    """Loads a dashboard in a worker process and returns it as picklable columns."""
+    dashboard = Dashboard.load(path)
+    ledger = dashboard.expenses
+    ledger.detach()  # Snapshot columns are views of a mapped file
+    return {
+        'path': path,
+        'currency_symbol': dashboard.currency_symbol,
+        'monthly_budget': dashboard.monthly_budget,
+        'monthly_budgets': dashboard.monthly_budgets,
+        'categories': list(dashboard.categories),
+        'category_names': list(ledger.category_names),
+        'dates': ledger.dates,
+        'codes': ledger.codes,
+        'amounts': ledger.amounts,
+    }
+
+
+class SourceSummary:
+    """What one dashboard contributed to a consolidation."""
+
+    def __init__(self, path, currency_symbol, rate, rows):
+        self.path = path
+        self.currency_symbol = currency_symbol
+        self.rate = rate
+        self.rows = rows
+        self.duplicates = 0  # Entries already merged from another dashboard
+
+    @property
+    def merged(self):
+        return self.rows - self.duplicates
+
+
+class Consolidation:
+    """The merged expenses and settings of several dashboards."""
+
+    def __init__(self, currency_symbol):
+        self.ledger = Ledger()
+        self.currency_symbol = currency_symbol
+        self.categories = []
+        self.monthly_budget = 0.0
+        self.monthly_budgets = {}
+        self.sources = []
+        self._category_keys = {}  # Normalized name -> merged name
+
+    def merged_category(self, name):
+        """Returns the merged name of a category, adding it if it is new."""
+        key = name.strip().casefold()
+        merged = self._category_keys.get(key)
+        if merged is None:
+            merged = self._category_keys[key] = name.strip()
+            self.categories.append(merged)
+        return merged
+
+    def settings(self):
+        """Returns the settings of the consolidated dashboard, as the app saves them."""
+        settings = {
+            'monthly_budget': round(self.monthly_budget, 2),
+            'currency_symbol': self.currency_symbol,
+            'categories': list(self.categories)
+        }
+        if self.monthly_budgets:
+            settings['monthly_budgets'] = {key: round(value, 2) for key, value in sorted(self.monthly_budgets.items())}
+        return settings
+
+    def rollups(self):
+        """Returns the combined totals per category, per month and per category per month."""
+        ledger = self.ledger
+        return {
+            'by_category': ledger.sum_by_category(),
+            'by_month': ledger.sum_by_month(),
+            'by_category_month': {category: ledger.sum_by_month(category) for category in ledger.sum_by_category()},
+        }
+
+    def write(self, path, file_format=None):
+        """Writes the consolidation as a new dashboard file."""
+        write_dashboard(path, self.ledger, {**self.settings(), 'revision': 1}, file_format)
+
+    def to_dashboard(self):
+        settings = self.settings()
+        return Dashboard(self.ledger, settings['monthly_budget'], self.currency_symbol, settings['categories'],
+                         settings.get('monthly_budgets', {}))
+
+
+def target_currency(loaded, currency_symbol=None):
+    """Returns the currency to consolidate into: the one given, else the one most expenses are in."""
+    if currency_symbol:
+        return normalize_currency(currency_symbol)
+    rows = Counter()
+    for source in loaded:
+        rows[normalize_currency(source['currency_symbol'])] += len(source['amounts'])
+    return rows.most_common(1)[0][0] if rows else "$"
+
+
+def missing_rates(loaded, currency_symbol=None, rates=None):
+    """Returns the currencies of the loaded dashboards that have no rate to the target currency."""
+    target = target_currency(loaded, currency_symbol)
+    rates = {normalize_currency(symbol) for symbol in (rates or {})}
+    return sorted({normalize_currency(source['currency_symbol']) for source in loaded} - {target} - rates)
+
+
+def merge(loaded, currency_symbol=None, rates=None, dedupe=True):
+    """Merges dashboards returned by load_for_merge, in order, into a Consolidation."""
+    target = target_currency(loaded, currency_symbol)
+    rates = {normalize_currency(symbol): rate for symbol, rate in (rates or {}).items()}
+    missing = missing_rates(loaded, target, rates)
+    if missing:
+        raise ValueError(f"The dashboards are in {', '.join(missing)} as well as {target}; "
+                         f"give the exchange rates to {target} to consolidate them")
+
+    result = Consolidation(target)
+    seen = {}  # (day, category code, cents) -> copies merged so far, the hash index for deduplication
+    ledger = result.ledger
+    budget_months = set()
+
+    for source in loaded:
+        symbol = normalize_currency(source['currency_symbol'])
+        rate = 1.0 if symbol == target else rates[symbol]
+        summary = SourceSummary(source['path'], source['currency_symbol'], rate, len(source['amounts']))
+        result.sources.append(summary)
+
+        # Category codes of this dashboard -> codes in the merged ledger
+        for name in source['categories']:
+            result.merged_category(name)
+        code_map = array('H', (ledger.intern_category(result.merged_category(name)) for name in source['category_names']))
+
+        days, codes, amounts = array('i'), array('H'), array('d')
+        copies = Counter()  # Of each entry within this dashboard
+        for day, code, amount in zip(source['dates'], source['codes'], source['amounts']):
+            code = code_map[code]
+            amount = round(amount * rate, 2) if rate != 1.0 else amount
+            if dedupe:
+                key = (day, code, round(amount * 100))
+                copies[key] += 1
+                if copies[key] <= seen.get(key, 0):
+                    summary.duplicates += 1
+                    continue
+                seen[key] = copies[key]
+            days.append(day)
+            codes.append(code)
+            amounts.append(amount)
+        ledger.extend_columns(days, codes, amounts)
+
+        result.monthly_budget += source['monthly_budget'] * rate
+        budget_months.update(source['monthly_budgets'])
+
+    # A month with its own budget in any dashboard gets the sum of every dashboard's budget for it
+    for key in sorted(budget_months):
+        result.monthly_budgets[key] = sum(source['monthly_budgets'].get(key, source['monthly_budget']) * summary.rate
+                                          for source, summary in zip(loaded, result.sources))
+    return result
+
+
+def load_dashboards(paths, workers=None, progress=None):
+    """Loads dashboard files for merge, in a process pool unless there is one worker.
+
+    ``progress``, if given, is called with the fraction of files loaded.
+    """
+    if not paths:
+        raise ValueError("No dashboards to consolidate")
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+
+    loaded = []
+    if workers == 1:
+        # Starting a process would only add its start-up time
+        for path in paths:
+            loaded.append(load_for_merge(path))
+            if progress:
+                progress(len(loaded) / len(paths))
+        return loaded
+
+    # Spawned rather than forked, as the app's Tk and worker threads must not be copied into the children
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        for source in executor.map(load_for_merge, paths):
+            loaded.append(source)
+            if progress:
+                progress(len(loaded) / len(paths))
+    return loaded
+
+
+def consolidate(paths, currency_symbol=None, rates=None, dedupe=True, workers=None, progress=None):
+    """Loads dashboard files in parallel and merges them, see the module docstring."""
+    return merge(load_dashboards(paths, workers, progress), currency_symbol, rates, dedupe)
@@ -0,0 +1,204 @@
+"""Bulk import of CSV bank exports into a dashboard.
+
+The file is read in chunks of ``CHUNK_ROWS`` rows, so its size only
+matters for the ledger it ends up in. Each chunk is parsed a column at a
+time: date strings are parsed once per distinct value, amounts go through
+one ``str.translate`` and ``float``, and descriptions are categorised once
+per distinct value. The columns are then appended to the ledger with
+``Ledger.extend_columns`` without building a dict per row.
+
+How to read a bank's export is described by a JSON rules file, every key
+optional:
+
+    {
+        "delimiter": ";",
+        "encoding": "utf-8-sig",
+        "header": true,
+        "columns": {"date": "Booking date", "amount": "Amount",
+                    "description": "Payee", "category": "Category"},
+        "date_format": "%d.%m.%Y",
+        "decimal_separator": ",",
+        "thousands_separator": ".",
+        "expenses_negative": true,
+        "rules": [{"pattern": "rewe|lidl|aldi", "category": "Food"},
+                  {"pattern": "shell|aral", "category": "Car"}],
+        "category_map": {"Groceries": "Food"},
+        "default_category": "Uncategorized"
+    }
+
+Columns are header names, or 0-based positions when the file has no header.
+Dates are ISO (YYYY-MM-DD) unless ``date_format`` is given. Banks usually
+list spending as negative amounts, hence ``expenses_negative``; rows that
+are not spending after that (income, refunds) are skipped. A row is put in
+the category of the first rule whose pattern is found in its description
+(ignoring case), else in its category column's value (through
+``category_map``), else in ``default_category``.
+"""
+
+import csv
+import json
+import re
+from array import array
+from datetime import date, datetime
+from itertools import compress, islice
+from operator import itemgetter
+
+CHUNK_ROWS = 50000
+
+DEFAULT_RULES = {
+    'delimiter': ',',
+    'encoding': 'utf-8-sig',
+    'header': True,
+    'columns': {'date': 'Date', 'amount': 'Amount', 'description': 'Description'},
+    'date_format': None,
+    'decimal_separator': '.',
+    'thousands_separator': ',',
+    'expenses_negative': True,
+    'rules': [],
+    'category_map': {},
+    'default_category': 'Uncategorized',
+}
+
+# Removed from amounts before parsing, along with the thousands separator
+_AMOUNT_NOISE = '  \'$€£¥'
+
+
+def load_rules(path):
+    """Reads an import rules file, filling in defaults for missing keys."""
+    with open(path, 'r', encoding='utf-8') as file:
+        return {**DEFAULT_RULES, **json.load(file)}
+
+
+class ImportResult:
+    def __init__(self):
+        self.imported = 0
+        self.skipped = 0  # Income and refunds
+        self.invalid = 0  # Rows whose date or amount could not be read
+        self.new_categories = []
+
+    def __repr__(self):
+        return f"ImportResult(imported={self.imported}, skipped={self.skipped}, invalid={self.invalid})"
+
+
+class CSVImporter:
+    def __init__(self, rules=None, chunk_rows=CHUNK_ROWS):
+        self.rules = {**DEFAULT_RULES, **(rules or {})}
+        self.chunk_rows = chunk_rows
+        self.patterns = [(re.compile(rule['pattern'], re.IGNORECASE), rule['category'])
+                         for rule in self.rules['rules']]
+        self.category_map = self.rules['category_map']
+        self.default_category = self.rules['default_category']
+        self.sign = -1.0 if self.rules['expenses_negative'] else 1.0
+
+        noise = _AMOUNT_NOISE + (self.rules['thousands_separator'] or '')
+        self._amount_table = str.maketrans({**{char: None for char in noise}, self.rules['decimal_separator']: '.'})
+        self._days = {}
+        self._categories = {}
+
+    def day_number(self, text):
+        """Returns the day number of a date string, or None if it is not a date."""
+        day = self._days.get(text, 0)
+        if day == 0:
+            try:
+                date_format = self.rules['date_format']
+                if date_format:
+                    day = datetime.strptime(text.strip(), date_format).toordinal()
+                else:
+                    day = date.fromisoformat(text.strip()[:10]).toordinal()
+            except ValueError:
+                day = None
+            self._days[text] = day
+        return day
+
+    def amount(self, text):
+        """Returns an amount as a positive expense, 0.0 for rows that are not spending, or None if invalid."""
+        try:
+            value = float(text.translate(self._amount_table)) * self.sign
+        except ValueError:
+            return None
+        return value if value > 0 else 0.0
+
+    def categorize(self, description):
+        """Returns the category of the first rule matching a description, or None."""
+        category = self._categories.get(description, 0)
+        if category == 0:
+            category = next((name for pattern, name in self.patterns if pattern.search(description)), None)
+            self._categories[description] = category
+        return category
+
+    def _column_indices(self, header):
+        columns = self.rules['columns']
+        indices = {}
+        for key in ('date', 'amount', 'description', 'category'):
+            column = columns.get(key)
+            if column is None:
+                continue
+            if isinstance(column, int):
+                indices[key] = column
+            elif header is None:
+                raise ValueError(f"Column {column!r} is given by name but the rules say the file has no header")
+            elif column not in header:
+                raise ValueError(f"Column {column!r} is not in the CSV header: {', '.join(header)}")
+            else:
+                indices[key] = header.index(column)
+        for key in ('date', 'amount'):
+            if key not in indices:
+                raise ValueError(f"The rules do not name the {key} column")
+        return indices
+
+    def parse_chunk(self, rows, indices, result):
+        """Returns (days, category names, amounts) columns for the expenses in a chunk of CSV rows."""
+        width = max(indices.values()) + 1
+        complete = [row for row in rows if len(row) >= width]
+        result.invalid += len(rows) - len(complete)
+
+        days = list(map(self.day_number, map(itemgetter(indices['date']), complete)))
+        amounts = list(map(self.amount, map(itemgetter(indices['amount']), complete)))
+
+        # Categorise only rows worth keeping, by rule, then by the bank's category, then the default
+        valid = [day is not None and amount is not None for day, amount in zip(days, amounts)]
+        keep = [is_valid and amount > 0 for is_valid, amount in zip(valid, amounts)]
+        result.invalid += valid.count(False)
+        result.skipped += keep.count(False) - valid.count(False)
+
+        kept_rows = list(compress(complete, keep))
+        categories = [None] * len(kept_rows)
+        if self.patterns and 'description' in indices:
+            categories = list(map(self.categorize, map(itemgetter(indices['description']), kept_rows)))
+        if 'category' in indices:
+            bank_categories = map(itemgetter(indices['category']), kept_rows)
+            categories = [category or self.category_map.get(bank.strip(), bank.strip()) or self.default_category
+                          for category, bank in zip(categories, bank_categories)]
+        else:
+            categories = [category or self.default_category for category in categories]
+
+        return list(compress(days, keep)), categories, list(compress(amounts, keep))
+
+    def import_file(self, path, dashboard, progress=None):
+        """Appends the expenses in a CSV file to a Dashboard and returns an ImportResult.
+
+        ``progress``, if given, is called with the result after every chunk.
+        """
+        result = ImportResult()
+        ledger = dashboard.expenses
+        with open(path, 'r', encoding=self.rules['encoding'], newline='') as file:
+            reader = csv.reader(file, delimiter=self.rules['delimiter'])
+            header = [name.strip() for name in next(reader, [])] if self.rules['header'] else None
+            indices = self._column_indices(header)
+
+            while True:
+                rows = list(islice(reader, self.chunk_rows))
+                if not rows:
+                    break
+
+                days, categories, amounts = self.parse_chunk(rows, indices, result)
+                for name in set(categories):
+                    if dashboard.add_category(name):
+                        result.new_categories.append(name)
+                intern_category = ledger.intern_category
+                ledger.extend_columns(array('i', days), array('H', map(intern_category, categories)), array('d', amounts))
+
+                result.imported += len(days)
+                if progress:
+                    progress(result)
+        return result
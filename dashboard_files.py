@@ -0,0 +1,267 @@
+"""Reading and writing dashboard files without holding the whole file in memory.
+
+Two formats are supported:
+
+* ``.json``: the original format, a single object with ``monthly_budget``,
+  ``currency_symbol``, ``expenses`` and ``categories`` keys, and optionally
+  ``monthly_budgets`` ({'YYYY-MM': budget}, overriding ``monthly_budget``). It is parsed
+  incrementally, one expense at a time, so the keys may come in any order.
+* ``.jsonl``: JSON Lines, a header object with everything except the
+  expenses on the first line, then one expense object per line.
+"""
+
+import codecs
+import json
+import math
+import os
+import queue
+import re
+import threading
+
+READ_SIZE = 1 << 20
+CHUNK_ROWS = 10000
+
+_decoder = json.JSONDecoder()
+_SKIP_WHITESPACE = re.compile(r'[ \t\n\r]*').match
+_DELIMITERS = ' \t\n\r,:]}'
+
+
+class _Reader:
+    """A growable text buffer over a binary file, tracking bytes read."""
+
+    def __init__(self, file):
+        self.file = file
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.bytes_read = 0
+        self.eof = False
+
+    def read_more(self):
+        if self.eof:
+            return False
+        data = self.file.read(READ_SIZE)
+        self.bytes_read += len(data)
+        if not data:
+            self.eof = True
+        self.buffer = self.buffer[self.pos:] + self.decoder.decode(data, final=not data)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Skips whitespace and returns the next character, or '' at the end of the file."""
+        while True:
+            self.pos = _SKIP_WHITESPACE(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read_more():
+                return ''
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} at byte {self.bytes_read}, found {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decodes the next JSON value, reading more of the file if it is cut off."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.read_more():
+                    raise
+                continue
+            # A number cut off by the read ("12" of "12.5") still decodes, so insist on a delimiter after it
+            if (end == len(self.buffer) or self.buffer[end] not in _DELIMITERS) and self.read_more():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json(file, chunk_rows=CHUNK_ROWS):
+    """Yields ('meta', (key, value), bytes_read) and ('rows', [expense, ...], bytes_read) from a .json dashboard."""
+    reader = _Reader(file)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key == 'expenses':
+            reader.expect('[')
+            rows = []
+            if reader.peek() != ']':
+                while True:
+                    rows.append(reader.value())
+                    if len(rows) >= chunk_rows:
+                        yield 'rows', rows, reader.bytes_read
+                        rows = []
+                    if reader.expect(',]') == ']':
+                        break
+            else:
+                reader.pos += 1
+            if rows:
+                yield 'rows', rows, reader.bytes_read
+        else:
+            yield 'meta', (key, reader.value()), reader.bytes_read
+
+        if reader.expect(',}') == '}':
+            break
+
+
+def iter_jsonl(file, chunk_rows=CHUNK_ROWS):
+    """Same events as iter_json, from a .jsonl dashboard."""
+    bytes_read = 0
+    header = None
+    rows = []
+    for line in file:
+        bytes_read += len(line)
+        if not line.strip():
+            continue
+        if header is None:
+            header = json.loads(line)
+            for key, value in header.items():
+                yield 'meta', (key, value), bytes_read
+            continue
+        rows.append(json.loads(line))
+        if len(rows) >= chunk_rows:
+            yield 'rows', rows, bytes_read
+            rows = []
+    if rows:
+        yield 'rows', rows, bytes_read
+
+
+def iter_dashboard(path, chunk_rows=CHUNK_ROWS):
+    """Yields (kind, payload, bytes_read) events for a dashboard file of either format."""
+    with open(path, 'rb') as file:
+        if path.endswith('.jsonl'):
+            yield from iter_jsonl(file, chunk_rows)
+        else:
+            yield from iter_json(file, chunk_rows)
+
+
+def _json_value(value):
+    """Encodes a value as json.dump(..., indent=4) would one level down."""
+    return json.dumps(value, indent=4).replace('\n', '\n    ')
+
+
+def _json_number(amount):
+    return repr(amount) if math.isfinite(amount) else json.dumps(amount)
+
+
+def write_json(file, settings, rows, batch_rows=CHUNK_ROWS):
+    """Writes a dashboard in the .json format, byte for byte as json.dump(..., indent=4) lays it out.
+
+    Rows are (date, category, amount) tuples. Only categories are encoded
+    with the json module, once each, which makes this many times faster
+    than dumping a list of expense dicts.
+    """
+    file.write('{\n')
+    file.write(f'    "monthly_budget": {_json_value(settings["monthly_budget"])},\n')
+    file.write(f'    "currency_symbol": {_json_value(settings["currency_symbol"])},\n')
+    file.write('    "expenses": [')
+
+    encoded_categories = {}
+    separator = '\n'
+    batch = []
+    for date_str, category, amount in rows:
+        encoded = encoded_categories.get(category)
+        if encoded is None:
+            encoded = encoded_categories[category] = json.dumps(category)
+        batch.append(f'        {{\n            "date": "{date_str}",\n            "category": {encoded},\n'
+                     f'            "amount": {_json_number(amount)}\n        }}')
+        if len(batch) >= batch_rows:
+            file.write(separator + ',\n'.join(batch))
+            separator = ',\n'
+            batch = []
+    if batch:
+        file.write(separator + ',\n'.join(batch))
+        separator = ',\n'
+    file.write('\n    ],\n' if separator == ',\n' else '],\n')
+
+    file.write(f'    "categories": {_json_value(settings["categories"])}')
+    if settings.get('monthly_budgets'):
+        file.write(f',\n    "monthly_budgets": {_json_value(settings["monthly_budgets"])}')
+    if 'revision' in settings:
+        file.write(f',\n    "revision": {_json_value(settings["revision"])}')
+    file.write('\n}')
+
+
+def write_jsonl(file, header, rows, batch_rows=CHUNK_ROWS):
+    """Writes a dashboard as JSON Lines: the header object, then one expense per line.
+
+    Rows are (date, category, amount) tuples, written as json.dumps would
+    write the expense dicts.
+    """
+    file.write(json.dumps(header) + '\n')
+    encoded_categories = {}
+    batch = []
+    for date_str, category, amount in rows:
+        encoded = encoded_categories.get(category)
+        if encoded is None:
+            encoded = encoded_categories[category] = json.dumps(category)
+        batch.append(f'{{"date": "{date_str}", "category": {encoded}, "amount": {_json_number(amount)}}}\n')
+        if len(batch) >= batch_rows:
+            file.write(''.join(batch))
+            batch = []
+    file.write(''.join(batch))
+
+
+class StreamingLoader:
+    """Parses a dashboard file on a background thread, or in a worker of an executor.
+
+    The Tk thread calls ``poll()`` (from ``root.after``) to collect events;
+    the worker never touches the ledger or any widget. Events are
+    ('meta', (key, value)), ('rows', [expense, ...]), ('progress', fraction),
+    ('done', None) and ('error', exception).
+    """
+
+    def __init__(self, path, chunk_rows=CHUNK_ROWS):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.total_bytes = os.path.getsize(path) or 1
+        # Bounded, so a slow UI applies back-pressure instead of buffering the whole file
+        self.events = queue.Queue(maxsize=8)
+        self.cancelled = threading.Event()
+
+    def start(self, executor=None):
+        if executor:
+            executor.submit(self._run)
+        else:
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _put(self, event):
+        while not self.cancelled.is_set():
+            try:
+                self.events.put(event, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _run(self):
+        try:
+            for kind, payload, bytes_read in iter_dashboard(self.path, self.chunk_rows):
+                if self.cancelled.is_set():
+                    return
+                self._put((kind, payload))
+                self._put(('progress', min(1.0, bytes_read / self.total_bytes)))
+            self._put(('done', None))
+        except Exception as error:
+            self._put(('error', error))
+
+    def poll(self, max_events=4):
+        """Returns up to max_events pending events without blocking."""
+        events = []
+        while len(events) < max_events:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return events
@@ -0,0 +1,127 @@
+"""Window showing the statistics recorded by instrumentation.Instrumentation.
+
+Opened and closed with F12. It lists every operation recorded so far with
+its latency percentiles, rows and bytes, draws the latency histogram of the
+selected one, and refreshes itself while it is open.
+"""
+
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from instrumentation import ANY_OPERATION
+
+REFRESH_MS = 1000
+HISTOGRAM_WIDTH = 40  # Characters of the longest histogram bar
+
+# Operations the app records, offered for profiling
+OPERATIONS = ('add_expense', 'update_expense_list', 'sort_by_column', 'load_data', 'save_data', 'generate_chart', 'chart_draw')
+
+
+def format_bytes(count):
+    for unit in ('B', 'KB', 'MB'):
+        if count < 1024:
+            return f"{count:.0f} {unit}"
+        count /= 1024
+    return f"{count:.1f} GB"
+
+
+class DebugPanel:
+    COLUMNS = ('Operation', 'Count', 'p50 ms', 'p95 ms', 'Max ms', 'Rows', 'Read', 'Written')
+
+    def __init__(self, root, instruments):
+        self.instruments = instruments
+        self.window = tk.Toplevel(root)
+        self.window.title("Instrumentation")
+        self.window.geometry("720x420")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        # Controls
+        controls = ttk.Frame(self.window, padding="5")
+        controls.pack(side=tk.TOP, fill=tk.X)
+
+        self.enabled = tk.BooleanVar(value=instruments.enabled)
+        ttk.Checkbutton(controls, text="Record", variable=self.enabled, command=self.toggle).pack(side=tk.LEFT, padx=2)
+
+        self.profile_choice = ttk.Combobox(controls, values=(ANY_OPERATION,) + OPERATIONS, width=20, state='readonly')
+        self.profile_choice.set(ANY_OPERATION)
+        self.profile_choice.pack(side=tk.LEFT, padx=(10, 2))
+        ttk.Button(controls, text="Profile Next", command=self.profile_next).pack(side=tk.LEFT, padx=2)
+
+        ttk.Button(controls, text="Dump", command=self.dump).pack(side=tk.RIGHT, padx=2)
+        ttk.Button(controls, text="Reset", command=self.reset).pack(side=tk.RIGHT, padx=2)
+
+        self.status_label = ttk.Label(self.window, padding=(5, 0))
+        self.status_label.pack(side=tk.BOTTOM, fill=tk.X)
+
+        # Operations table
+        self.tree = ttk.Treeview(self.window, columns=self.COLUMNS, show='headings', height=8)
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=150 if column == 'Operation' else 75, anchor=tk.W if column == 'Operation' else tk.E)
+        self.tree.pack(side=tk.TOP, fill=tk.X, padx=5)
+        self.tree.bind('<<TreeviewSelect>>', lambda event: self.show_histogram())
+
+        # Histogram of the selected operation
+        self.histogram = tk.Text(self.window, height=12, font=('Courier', 9), state=tk.DISABLED)
+        self.histogram.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        self.refresh()
+
+    def toggle(self):
+        self.instruments.enabled = self.enabled.get()
+
+    def profile_next(self):
+        self.instruments.profile_next(self.profile_choice.get())
+        self.enabled.set(True)
+        self.status_label.config(text=f"Profiling the next {self.profile_choice.get()} operation")
+
+    def reset(self):
+        self.instruments.reset()
+        self.refresh()
+
+    def dump(self):
+        try:
+            path = self.instruments.dump()
+        except OSError as error:
+            messagebox.showerror("Dump Failed", f"Could not write the statistics:\n{error}", parent=self.window)
+            return
+        self.status_label.config(text=f"Written to {path}")
+
+    def refresh(self):
+        """Updates the table from the recorded statistics, keeping the selection."""
+        selected = self.tree.selection()
+        self.tree.delete(*self.tree.get_children())
+        for name, stats in sorted(self.instruments.stats.items()):
+            latency = stats.latency
+            self.tree.insert('', 'end', iid=name, values=(
+                name, latency.count, f"{latency.percentile(0.5):g}", f"{latency.percentile(0.95):g}", f"{latency.max:.1f}",
+                f"{stats.rows:,}", format_bytes(stats.bytes_read), format_bytes(stats.bytes_written)))
+        selected = [item for item in selected if self.tree.exists(item)]
+        if selected:
+            self.tree.selection_set(selected)
+        self.show_histogram()
+
+        if self.instruments.profiles and not self.instruments.profile_armed:
+            self.status_label.config(text=f"Last profile: {self.instruments.profiles[-1]}")
+        self.refresh_job = self.window.after(REFRESH_MS, self.refresh)
+
+    def show_histogram(self):
+        selected = self.tree.selection()
+        lines = []
+        if selected and selected[0] in self.instruments.stats:
+            buckets = self.instruments.stats[selected[0]].latency.buckets()
+            largest = max(count for label, count in buckets)
+            lines = [f"{label:>14} {'#' * (max(1, round(count / largest * HISTOGRAM_WIDTH)) if count else 0):<{HISTOGRAM_WIDTH}} {count}"
+                     for label, count in buckets]
+        elif not self.instruments.enabled:
+            lines = ["Recording is off. Tick Record, then use the dashboard."]
+
+        self.histogram.config(state=tk.NORMAL)
+        self.histogram.delete('1.0', tk.END)
+        self.histogram.insert('1.0', "\n".join(lines))
+        self.histogram.config(state=tk.DISABLED)
+
+    def close(self):
+        self.window.after_cancel(self.refresh_job)
+        self.window.destroy()
+        self.window = None
@@ -0,0 +1,144 @@
+"""Dashboard engine that works without Tk.
+
+``Dashboard`` holds everything a dashboard file stores (the expense ledger,
+categories, monthly budget and currency symbol) and loads, changes and
+saves it the way the app does, replaying the change journal on load. The
+app uses the file functions here from its worker jobs and ``cli.py`` uses
+the whole class, so batch jobs produce exactly the files the app reads.
+"""
+
+from datetime import date
+
+from dashboard_files import iter_dashboard, write_json, write_jsonl
+from journal import read_journal, replay, write_atomic
+from ledger import DEFAULT_CATEGORIES, Ledger
+from snapshot import is_snapshot, load_snapshot, write_snapshot
+from sqlite_ledger import SQLiteLedger
+from time_index import month_key
+
+
+def write_dashboard(file_path, ledger, settings, file_format=None):
+    """Writes the dashboard as a 'snapshot', 'jsonl' or 'json' file, by default chosen by the file."""
+    if file_format is None:
+        file_format = 'snapshot' if is_snapshot(file_path) else 'jsonl' if file_path.endswith('.jsonl') else 'json'
+
+    if file_format == 'snapshot':
+        write_atomic(file_path, lambda file: write_snapshot(file, ledger, settings), binary=True)
+    elif file_format == 'jsonl':
+        write_atomic(file_path, lambda file: write_jsonl(file, settings, ledger.rows()))
+    else:
+        write_atomic(file_path, lambda file: write_json(file, settings, ledger.rows()))
+
+
+def export_dashboard(open_ledger, file_path, settings, file_format):
+    """Writes a dashboard from a ledger opened on the calling thread, see ExpenseTrackerApp.ledger_for_worker."""
+    ledger = open_ledger()
+    try:
+        write_dashboard(file_path, ledger, settings, file_format)
+    finally:
+        if isinstance(ledger, SQLiteLedger):
+            ledger.close()
+
+
+def read_dashboard(path):
+    """Reads a dashboard file of any format into (ledger, settings), without replaying its journal."""
+    if is_snapshot(path):
+        return load_snapshot(path)
+
+    ledger = Ledger()
+    settings = {}
+    for kind, payload, bytes_read in iter_dashboard(path):
+        if kind == 'rows':
+            ledger.extend(payload)
+        else:
+            key, value = payload
+            settings[key] = value
+    return ledger, settings
+
+
+class Dashboard:
+    def __init__(self, expenses=None, monthly_budget=0, currency_symbol="$", categories=None, monthly_budgets=None):
+        self.expenses = Ledger() if expenses is None else expenses
+        self.monthly_budget = monthly_budget
+        self.monthly_budgets = {} if monthly_budgets is None else monthly_budgets  # 'YYYY-MM' -> budget
+        self.currency_symbol = currency_symbol
+        self.categories = list(DEFAULT_CATEGORIES) if categories is None else categories
+        self.path = None
+        self.revision = 0
+
+    @classmethod
+    def from_settings(cls, ledger, settings, path=None):
+        """Returns the dashboard of a ledger and the settings stored with it, without replaying its journal."""
+        dashboard = cls(ledger, settings.get('monthly_budget', 0), settings.get('currency_symbol', "$"),
+                        settings.get('categories', list(DEFAULT_CATEGORIES)), settings.get('monthly_budgets', {}))
+        dashboard.path = path
+        dashboard.revision = settings.get('revision', 0)
+        return dashboard
+
+    @classmethod
+    def load(cls, path):
+        """Loads a dashboard file, including the changes recorded in its journal."""
+        dashboard = cls.from_settings(*read_dashboard(path), path)
+        dashboard.replay_journal()
+        return dashboard
+
+    def replay_journal(self):
+        """Applies the changes recorded since the file was saved and returns them."""
+        events = read_journal(self.path, self.revision)
+        replay(self, events)
+        return events
+
+    def settings(self, revision=None):
+        """Returns the settings stored with the expenses."""
+        settings = {
+            'monthly_budget': self.monthly_budget,
+            'currency_symbol': self.currency_symbol,
+            'categories': list(self.categories)
+        }
+        if self.monthly_budgets:
+            settings['monthly_budgets'] = dict(self.monthly_budgets)
+        if revision is not None:
+            settings['revision'] = revision
+        return settings
+
+    def add_category(self, name):
+        """Adds a category if it is new, returning whether it was."""
+        if name in self.categories:
+            return False
+        self.categories.append(name)
+        return True
+
+    def add_expense(self, date_str, category, amount):
+        """Adds an expense, and its category if that is new, returning the expense ID."""
+        self.add_category(category)
+        return self.expenses.append(date_str, category, amount)
+
+    def total(self):
+        return self.expenses.total()
+
+    def remaining_budget(self, today=None):
+        """Returns what is left of this month's budget, or of the month of ``today`` if given."""
+        today = today or date.today()
+        return self.month_spending(today.year, today.month)[2]
+
+    def budget_for(self, year, month):
+        """Returns the budget of a month, its own if it has one, else the monthly budget."""
+        return self.monthly_budgets.get(month_key(year, month), self.monthly_budget)
+
+    def month_spending(self, year, month):
+        """Returns (spent, budget, remaining) for a month."""
+        spent = self.expenses.month_total(year, month)
+        budget = self.budget_for(year, month)
+        return spent, budget, budget - spent
+
+    def save(self, path=None, file_format=None):
+        """Writes the dashboard with a new revision, which leaves any journal of the old one stale."""
+        path = path or self.path
+        if path is None:
+            raise ValueError("The dashboard has no file to save to")
+
+        revision = self.revision + 1
+        self.expenses.detach()  # The columns may still be mapped from this very file
+        write_dashboard(path, self.expenses, self.settings(revision), file_format)
+        self.path = path
+        self.revision = revision
@@ -0,0 +1,211 @@
+"""Filtering of a ledger's expenses by category, date, amount and text.
+
+Every criterion of an ``ExpenseFilter`` maps to rows through an index the
+ledger already keeps: categories to its per-category posting lists, date
+and amount ranges to slices of its cached sort orders (found by bisecting),
+and the search text to the categories whose names contain it, the dates it
+is a prefix of (e.g. '2026-03') and, if it is a number, that amount.
+
+``filter_rows`` starts from the criterion matching the fewest rows, which
+costs O(log n) to find, and only checks the remaining criteria on those
+rows, so a query costs about the size of its most selective criterion
+rather than of the ledger. The indexes are built on the first query (for a
+million rows, about a second each) and then kept up to date by the ledger.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import date
+from itertools import chain, compress, repeat
+
+from time_index import month_bounds, parse_month_key
+
+# Results with more than 1/BROAD_FRACTION of the rows are put in order with a mask instead of by sorting,
+# in ledger order by filter_rows and in sorted order by FilterResult.order
+BROAD_FRACTION = 8
+
+
+class ExpenseFilter:
+    """Criteria expenses must all meet; None (or '' for text) leaves one out."""
+
+    def __init__(self, categories=None, first_day=None, last_day=None, min_amount=None, max_amount=None, text=''):
+        self.categories = None if categories is None else frozenset(categories)
+        self.first_day = first_day
+        self.last_day = last_day
+        self.min_amount = min_amount
+        self.max_amount = max_amount
+        self.text = text.strip()
+
+    def __bool__(self):
+        return (self.categories is not None or self.first_day is not None or self.last_day is not None or
+                self.min_amount is not None or self.max_amount is not None or bool(self.text))
+
+    def __eq__(self, other):
+        return isinstance(other, ExpenseFilter) and vars(self) == vars(other)
+
+
+def date_prefix_range(text):
+    """Returns the first and last day number of the dates starting with text ('2026', '2026-03', '2026-03-14'), or None."""
+    try:
+        if len(text) == 4 and text.isdigit():
+            return month_bounds(int(text), 1)[0], month_bounds(int(text), 12)[1]
+        if len(text) == 7:
+            return month_bounds(*parse_month_key(text))
+        if len(text) == 10:
+            day = date.fromisoformat(text).toordinal()
+            return day, day
+    except ValueError:
+        pass
+    return None
+
+
+class _Criterion:
+    """The rows meeting one criterion, as a count and a way to list or test them."""
+
+    def __init__(self, size, rows, test):
+        self.size = size
+        self.rows = rows  # Returns the matching row indices, in any order
+        self.test = test  # Returns the rows of a list that match
+
+
+def _sorted_range(ledger, column, low, high):
+    """Returns a criterion for rows whose date or amount column is within [low, high]."""
+    values = ledger.dates if column == 'date' else ledger.amounts
+    order = ledger.sort_order((column,))
+    key = values.__getitem__
+    start = 0 if low is None else bisect_left(order, low, key=key)
+    end = len(order) if high is None else bisect_right(order, high, key=key)
+    low = -float('inf') if low is None else low
+    high = float('inf') if high is None else high
+    return _Criterion(max(end - start, 0), lambda: order[start:end],
+                      lambda rows: [index for index in rows if low <= values[index] <= high])
+
+
+def _category_criterion(ledger, codes):
+    postings = ledger.postings()
+    lists = [postings[code] for code in codes if code < len(postings)]
+    allowed = bytearray(len(ledger.category_names))
+    for code in codes:
+        allowed[code] = 1
+    row_codes = ledger.codes
+    return _Criterion(sum(map(len, lists)), lambda: list(chain.from_iterable(lists)),
+                      lambda rows: list(compress(rows, map(allowed.__getitem__, map(row_codes.__getitem__, rows)))))
+
+
+def _text_criterion(ledger, text):
+    """Returns a criterion for rows whose category contains text, whose date starts with it or whose amount it is."""
+    needle = text.casefold()
+    codes = [code for code, name in enumerate(ledger.category_names) if needle in name.casefold()]
+    parts = [_category_criterion(ledger, codes)]
+
+    days = date_prefix_range(text)
+    if days:
+        parts.append(_sorted_range(ledger, 'date', *days))
+    try:
+        amount = float(text)
+    except ValueError:
+        pass
+    else:
+        parts.append(_sorted_range(ledger, 'amount', amount, amount))
+
+    if len(parts) == 1:
+        return parts[0]
+    # The parts can overlap, so rows are listed once each
+    return _Criterion(sum(part.size for part in parts),
+                      lambda: list(set(chain.from_iterable(part.rows() for part in parts))),
+                      lambda rows: list(set(chain.from_iterable(part.test(rows) for part in parts))))
+
+
+def filter_rows(ledger, expense_filter):
+    """Returns the ascending row indices of the expenses meeting a filter, as an array('q')."""
+    criteria = []
+    if expense_filter.categories is not None:
+        codes = [ledger.category_codes[name] for name in expense_filter.categories if name in ledger.category_codes]
+        criteria.append(_category_criterion(ledger, codes))
+    if expense_filter.first_day is not None or expense_filter.last_day is not None:
+        criteria.append(_sorted_range(ledger, 'date', expense_filter.first_day, expense_filter.last_day))
+    if expense_filter.min_amount is not None or expense_filter.max_amount is not None:
+        criteria.append(_sorted_range(ledger, 'amount', expense_filter.min_amount, expense_filter.max_amount))
+    if expense_filter.text:
+        criteria.append(_text_criterion(ledger, expense_filter.text))
+    if not criteria:
+        return array('q', range(len(ledger)))
+
+    # Start from the most selective criterion and narrow its rows down with the others
+    criteria.sort(key=lambda criterion: criterion.size)
+    rows = criteria[0].rows()
+    for criterion in criteria[1:]:
+        rows = criterion.test(rows)
+
+    if len(rows) > len(ledger) // BROAD_FRACTION:
+        # Cheaper to mark this many rows and read the marks back in order than to sort them
+        selected = bytearray(len(ledger))
+        deque(map(selected.__setitem__, rows, repeat(1)), maxlen=0)
+        return array('q', compress(range(len(ledger)), selected))
+    return array('q', sorted(rows))
+
+
+class FilterResult:
+    """The rows of a ledger meeting a filter, with their sorted orders and totals worked out on demand.
+
+    Only valid until the ledger changes; the app filters again after every change.
+    """
+
+    def __init__(self, ledger, expense_filter, rows=None):
+        self.ledger = ledger
+        self.expense_filter = expense_filter
+        self.rows = filter_rows(ledger, expense_filter) if rows is None else rows
+        self._orders = {}
+        self._totals = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def order(self, sort_keys=None):
+        """Returns the rows in ascending order of the given columns, or in ledger order for None."""
+        if sort_keys is None:
+            return self.rows
+        sort_keys = tuple(sort_keys)
+        order = self._orders.get(sort_keys)
+        if order is None:
+            ledger = self.ledger
+            if len(self.rows) > len(ledger) // BROAD_FRACTION:
+                # Read the marked rows out of the ledger's cached order, as filter_rows does
+                selected = bytearray(len(ledger))
+                deque(map(selected.__setitem__, self.rows, repeat(1)), maxlen=0)
+                full_order = ledger.sort_order(sort_keys)
+                order = array('q', compress(full_order, map(selected.__getitem__, full_order)))
+            else:
+                # The rows are in ledger order, so the stable sort breaks ties as the cached order does
+                order = array('q', sorted(self.rows, key=ledger.sort_key(sort_keys)))
+            self._orders[sort_keys] = order
+        return order
+
+    def window(self, start, count, sort_keys=None, descending=False):
+        """Returns [(id, date, category, amount)] for view positions start..start+count, like Ledger.window."""
+        order = self.order(sort_keys)
+        total = len(order)
+        end = min(start + count, total)
+        if descending:
+            indices = [order[total - 1 - position] for position in range(start, end)]
+        else:
+            indices = order[start:end]
+        ledger = self.ledger
+        return [(ledger.ids[index], *ledger.record(index)) for index in indices]
+
+    def totals(self):
+        """Returns (total, {category: total}, {day number: total}) of the rows."""
+        if self._totals is None:
+            ledger = self.ledger
+            amounts, codes, dates = ledger.amounts, ledger.codes, ledger.dates
+            category_totals = [0.0] * len(ledger.category_names)
+            day_totals = {}
+            for index in self.rows:
+                amount = amounts[index]
+                category_totals[codes[index]] += amount
+                day = dates[index]
+                day_totals[day] = day_totals.get(day, 0.0) + amount
+            by_category = {ledger.category_names[code]: total for code, total in enumerate(category_totals) if total}
+            self._totals = (sum(map(amounts.__getitem__, self.rows)), by_category, day_totals)
+        return self._totals
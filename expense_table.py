@@ -0,0 +1,255 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class ExpenseTable:
+    """Treeview of expenses whose rows are keyed by ledger expense ID.
+
+    Adding, editing or deleting an expense only touches the affected Treeview
+    item, instead of clearing and reinserting the whole ledger. While the app
+    has a filter result, the table shows its rows and is rebuilt on changes.
+    """
+
+    COLUMNS = ('Date', 'Category', 'Amount')
+    REFORMAT_BATCH_SIZE = 500
+
+    def __init__(self, parent, app, sort_command):
+        self.app = app
+        self._reformat_generation = 0
+        self.sort_keys = None  # Tuple of ledger columns, None for ledger order
+        self.descending = False
+
+        self.tree = ttk.Treeview(parent, columns=self.COLUMNS, show='headings')
+        for col in self.COLUMNS:
+            self.tree.heading(col, text=col, command=lambda col=col: sort_command(col))
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.tree.yview)
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+
+    def _values(self, index):
+        date, category, amount = self.app.expenses.record(index)
+        return (date, category, f"{self.app.currency_symbol}{amount:.2f}")
+
+    def _ordered_indices(self):
+        ledger = self.app.expenses
+        if self.app.filter_result is not None:
+            order = self.app.filter_result.order(self.sort_keys)
+        elif self.sort_keys is None:
+            return range(len(ledger))
+        else:
+            order = ledger.sort_order(self.sort_keys)
+        return reversed(order) if self.descending else order
+
+    def _position(self, index):
+        """Returns the Treeview position of a row index in the current order of the whole ledger.
+
+        Only used without a filter result: the app rebuilds a filtered table instead of patching it.
+        """
+        if self.sort_keys is None:
+            return index
+        ledger = self.app.expenses
+        position = ledger.sorted_position(self.sort_keys, index)
+        return len(ledger) - 1 - position if self.descending else position
+
+    def rebuild(self):
+        """Clears the table and inserts every expense in the ledger."""
+        self._reformat_generation += 1
+        self.tree.delete(*self.tree.get_children())
+        ledger = self.app.expenses
+        for index in self._ordered_indices():
+            self.tree.insert('', 'end', iid=str(ledger.ids[index]), values=self._values(index))
+
+    def sort(self, keys, descending=False):
+        """Orders the rows by the given ledger columns using the ledger's cached permutation."""
+        self.sort_keys = tuple(keys)
+        self.descending = descending
+        ids = self.app.expenses.ids
+        self.tree.set_children('', *[str(ids[index]) for index in self._ordered_indices()])
+
+    def row_added(self, expense_id):
+        """Inserts the row for a newly added expense."""
+        index = self.app.expenses.index_of(expense_id)
+        self.tree.insert('', self._position(index), iid=str(expense_id), values=self._values(index))
+
+    def row_changed(self, expense_id):
+        """Refreshes the row of an edited expense."""
+        index = self.app.expenses.index_of(expense_id)
+        self.tree.item(str(expense_id), values=self._values(index))
+        if self.sort_keys is not None:
+            self.tree.move(str(expense_id), '', self._position(index))
+
+    def row_removed(self, expense_id):
+        """Removes the row of a deleted expense."""
+        self.tree.delete(str(expense_id))
+
+    def selected_ids(self):
+        """Returns the expense IDs of the selected rows."""
+        return [int(item) for item in self.tree.selection()]
+
+    def visible_items(self):
+        """Returns the Treeview items currently on screen."""
+        items = []
+        item = self.tree.identify_row(1)
+        while item and self.tree.bbox(item):
+            items.append(item)
+            item = self.tree.next(item)
+        return items
+
+    def reformat(self):
+        """Re-formats the rows after a currency symbol change.
+
+        The visible rows are updated immediately; the rest are updated in
+        small batches from the Tk event loop so the window stays responsive.
+        Only the values change, so the rows keep their places.
+        """
+        self._reformat_generation += 1
+        generation = self._reformat_generation
+
+        visible = self.visible_items()
+        for item in visible:
+            self._reformat_row(item)
+
+        done = set(visible)
+        pending = [item for item in self.tree.get_children() if item not in done]
+        self.tree.after_idle(self._reformat_batch, pending, 0, generation)
+
+    def _reformat_row(self, item):
+        self.tree.item(item, values=self._values(self.app.expenses.index_of(int(item))))
+
+    def _reformat_batch(self, pending, start, generation):
+        if generation != self._reformat_generation:
+            return  # Superseded by a newer reformat or rebuild
+
+        end = min(start + self.REFORMAT_BATCH_SIZE, len(pending))
+        for item in pending[start:end]:
+            if self.tree.exists(item):
+                self._reformat_row(item)
+        if end < len(pending):
+            self.tree.after(1, self._reformat_batch, pending, end, generation)
+
+
+class VirtualExpenseTable:
+    """Expense table that only materializes the rows on screen.
+
+    The Treeview holds the visible window of rows plus a small buffer; the
+    scrollbar and mouse wheel move that window over the ledger, or over the
+    app's filter result if it has one. Memory and rebuild cost depend on the
+    window size, not on the ledger size.
+    """
+
+    COLUMNS = ExpenseTable.COLUMNS
+    BUFFER_ROWS = 5
+    DEFAULT_ROW_HEIGHT = 20
+
+    def __init__(self, parent, app, sort_command):
+        self.app = app
+        self.offset = 0  # View position of the first materialized row
+        self.page_size = 30
+        self.sort_keys = None  # Tuple of ledger columns, None for ledger order
+        self.descending = False
+
+        self.tree = ttk.Treeview(parent, columns=self.COLUMNS, show='headings')
+        for col in self.COLUMNS:
+            self.tree.heading(col, text=col, command=lambda col=col: sort_command(col))
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+
+        self.tree.bind('<Configure>', self.on_resize)
+        self.tree.bind('<MouseWheel>', lambda event: self.scroll_rows(-1 if event.delta > 0 else 1) or 'break')
+        self.tree.bind('<Button-4>', lambda event: self.scroll_rows(-1) or 'break')
+        self.tree.bind('<Button-5>', lambda event: self.scroll_rows(1) or 'break')
+
+    def _rows(self):
+        """Returns what the table shows, the filter result or the whole ledger."""
+        return self.app.expenses if self.app.filter_result is None else self.app.filter_result
+
+    def __len__(self):
+        return len(self._rows())
+
+    def _visible_rows(self):
+        row_height = ttk.Style().lookup('Treeview', 'rowheight') or self.DEFAULT_ROW_HEIGHT
+        return max(1, self.tree.winfo_height() // int(row_height))
+
+    def on_resize(self, event=None):
+        page_size = self._visible_rows() + self.BUFFER_ROWS
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.render()
+
+    def on_scrollbar(self, action, *args):
+        """Handles 'moveto' and 'scroll' commands from the scrollbar."""
+        visible = max(1, self.page_size - self.BUFFER_ROWS)
+        if action == 'moveto':
+            self.scroll_to(int(float(args[0]) * len(self)))
+        elif action == 'scroll':
+            step = int(args[0])
+            self.scroll_rows(step * visible if args[1] == 'pages' else step)
+
+    def scroll_rows(self, count):
+        self.scroll_to(self.offset + count)
+
+    def scroll_to(self, offset):
+        visible = max(1, self.page_size - self.BUFFER_ROWS)
+        offset = max(0, min(offset, len(self) - visible))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def render(self):
+        """Materializes the rows of the current window into the Treeview."""
+        symbol = self.app.currency_symbol
+        total = len(self)
+        rows = self._rows().window(self.offset, self.page_size, self.sort_keys, self.descending)
+        wanted = [(str(expense_id), (date, category, f"{symbol}{amount:.2f}")) for expense_id, date, category, amount in rows]
+
+        wanted_items = {item for item, values in wanted}
+        stale = [item for item in self.tree.get_children() if item not in wanted_items]
+        if stale:
+            self.tree.delete(*stale)
+
+        for position, (item, values) in enumerate(wanted):
+            if self.tree.exists(item):
+                self.tree.item(item, values=values)
+                self.tree.move(item, '', position)
+            else:
+                self.tree.insert('', position, iid=item, values=values)
+
+        if total:
+            visible = max(1, self.page_size - self.BUFFER_ROWS)
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def sort(self, keys, descending=False):
+        """Orders the table by the given ledger columns using the ledger's cached permutation."""
+        self.sort_keys = tuple(keys)
+        self.descending = descending
+        self.render()
+
+    def rebuild(self):
+        """Resets the window to the top of the ledger."""
+        self.offset = 0
+        self.render()
+
+    # The ledger patches its cached orders, so every change is just a window re-render
+    def row_added(self, expense_id):
+        self.render()
+
+    def row_changed(self, expense_id):
+        self.render()
+
+    def row_removed(self, expense_id):
+        self.scroll_to(self.offset)
+        self.render()
+
+    def selected_ids(self):
+        """Returns the expense IDs of the selected rows."""
+        return [int(item) for item in self.tree.selection()]
+
+    def reformat(self):
+        """Re-formats the materialized rows, which are the only ones that exist."""
+        self.render()
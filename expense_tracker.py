@@ -1,10 +1,69 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog, filedialog
-from tkcalendar import DateEntry
-import json
+import os
+import sqlite3
+import time
 from datetime import datetime
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+from expense_table import ExpenseTable, VirtualExpenseTable
+from dashboard_files import StreamingLoader
+from journal import Journal
+from sqlite_ledger import SQLiteLedger, convert_dashboard
+from snapshot import is_snapshot, load_snapshot
+from tasks import TaskScheduler
+from engine import Dashboard, export_dashboard
+from charts import ChartPanel, import_matplotlib, line_series
+from time_index import month_bounds, month_key, parse_month_key
+from instrumentation import Instrumentation, instrumented
+from debug_panel import DebugPanel
+from expense_filter import ExpenseFilter, FilterResult
+
+# Ledgers at least this big open with the virtual-scrolling table
+VIRTUAL_TABLE_THRESHOLD = 50000
+
+# How often the UI collects parsed chunks from the background loader, and for how long
+LOAD_POLL_MS = 20
+LOAD_POLL_BUDGET = 0.03
+
+# matplotlib and tkcalendar are imported on first use, or in the background this long after startup
+PREWARM_MS = 500
+
+# The filter is applied once typing in the filter bar has paused this long
+FILTER_DELAY_MS = 150
+
+# Journal entries are flushed this often; past COMPACT_EVENTS the dashboard file is rewritten
+AUTOSAVE_MS = 10000
+COMPACT_EVENTS = 5000
+
+DASHBOARD_FILETYPES = [("Dashboard Files", "*.spendo *.json *.jsonl"), ("Binary Snapshots", "*.spendo"),
+                       ("JSON Files", "*.json"), ("JSON Lines Files", "*.jsonl")]
+JSON_FILETYPES = [("JSON Files", "*.json"), ("JSON Lines Files", "*.jsonl")]
+SQLITE_FILETYPES = [("SQLite Ledgers", "*.db *.sqlite"), ("All Files", "*.*")]
+
+# Functions below run on worker threads, so they only touch what they are handed
+
+
+def import_deferred_libraries():
+    """Imports the libraries the dashboard needs but the home screen does not."""
+    import_matplotlib()
+    import tkcalendar
+
+
+def prepare_chart_data(read_totals, max_points):
+    """Returns the per-category totals and the line series (see charts.line_series) for ChartPanel.show."""
+    expenses_by_category, expenses_by_day = read_totals()
+    sorted_days = sorted(expenses_by_day)
+    sorted_amounts = [expenses_by_day[day] for day in sorted_days]
+    return (expenses_by_category, *line_series(sorted_days, sorted_amounts, max_points))
+
+
+def read_sqlite_totals(path):
+    """Reads chart totals through a connection of the worker's own, as SQLite connections are per thread."""
+    ledger = SQLiteLedger(path)
+    try:
+        return ledger.sum_by_category(), ledger.sum_by_day()
+    finally:
+        ledger.close()
+
 
 class ExpenseTrackerApp:
     def __init__(self, root):
@@ -12,19 +71,58 @@ class ExpenseTrackerApp:
         self.root.title("Expense Tracker & Budget Planner")
         self.root.geometry("1366x720")
 
-        self.expenses = []
-        self.categories = ["Rent", "Food", "Entertainment", "Car", "Credit Cards"]
-        self.monthly_budget = 0
+        self.dashboard = Dashboard()  # Expenses and settings, with the file they are saved to and its revision
         self.data_loaded = False
         self.unsaved_changes = False
-        self.loaded_file_path = None  # Track the loaded file path for saving later
+        self.loader = None  # Background loader while a file is being opened
+        self.journal = None  # Change journal of the loaded file
+        self.save_requested = False  # Save again once the running background save finishes
+        self.save_notify = False
+
+        # Timings of the main operations, off unless enabled from the debug panel (F12) or SPENDO_INSTRUMENT
+        self.instruments = Instrumentation.from_environment()
+        self.debug_panel = None
+        self.load_span = None  # Load being timed, from starting it to showing the dashboard
+        self.filter_result = None  # Expenses meeting the filter bar, None to show them all
+        self.filter_job = None
+        self.root.bind('<F12>', self.toggle_debug_panel)
+
+        # Loading, saving, conversion and chart data run in the background
+        self.scheduler = TaskScheduler(self.root, on_busy_change=self.show_busy)
+        self.create_status_bar()
 
         # Display the home screen with two options: create or load
         self.show_home_screen()
 
+        # Warm up the slow imports once the home screen is up, so opening a dashboard does not wait for them
+        self.root.after(PREWARM_MS, self.scheduler.executor.submit, import_deferred_libraries)
+
+        # Flush the journal periodically and when the window is closed
+        self.root.after(AUTOSAVE_MS, self.autosave)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    @property
+    def expenses(self):
+        """The dashboard's ledger, which the expense tables and instrumentation read from the app."""
+        return self.dashboard.expenses
+
+    @property
+    def currency_symbol(self):
+        return self.dashboard.currency_symbol
+
+    def toggle_debug_panel(self, event=None):
+        """Opens the instrumentation window, or closes it if it is open."""
+        if self.debug_panel and self.debug_panel.window:
+            self.debug_panel.close()
+            self.debug_panel = None
+        else:
+            self.debug_panel = DebugPanel(self.root, self.instruments)
+
     def show_home_screen(self):
         """Shows the initial home screen to choose between creating a new dashboard or loading one."""
-        if self.unsaved_changes:
+        if self.journal:
+            self.journal.flush()  # Changes are already safe in the journal
+        elif self.unsaved_changes:
             save_prompt = messagebox.askyesno("Unsaved Changes", "You have unsaved changes. Do you want to save before returning to the home screen?")
             if save_prompt:
                 self.save_data()  # Save the data if the user chooses to save
@@ -33,15 +131,14 @@ class ExpenseTrackerApp:
         self.reset_data()
 
         # Clear existing widgets before showing the home screen
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.clear_screen()
 
         # Home frame
         home_frame = ttk.Frame(self.root, padding="20")
         home_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
 
         # Title
-        ttk.Label(home_frame, text="Welcome to the Expense Tracker", font=("Arial", 18)).grid(row=0, column=0, columnspan=2, pady=20, padx=10, sticky=tk.N)
+        ttk.Label(home_frame, text="Welcome to the Expense Tracker", font=("Arial", 18)).grid(row=0, column=0, columnspan=3, pady=20, padx=10, sticky=tk.N)
 
         # Create new dashboard button
         ttk.Button(home_frame, text="Create New Dashboard", command=self.create_new_dashboard).grid(row=1, column=0, pady=10, padx=10, sticky=tk.N)
@@ -49,11 +146,22 @@ class ExpenseTrackerApp:
         # Load existing dashboard button
         ttk.Button(home_frame, text="Load Dashboard", command=self.load_data).grid(row=1, column=1, pady=10, padx=10, sticky=tk.N)
 
+        # SQLite ledger buttons, for dashboards too large to load into memory
+        sqlite_frame = ttk.Frame(home_frame)
+        sqlite_frame.grid(row=1, column=2, pady=10, padx=10, sticky=tk.N)
+        ttk.Button(sqlite_frame, text="Open SQLite Ledger", command=self.open_sqlite_ledger).pack(fill=tk.X)
+        ttk.Button(sqlite_frame, text="Convert JSON to SQLite", command=self.convert_to_sqlite).pack(fill=tk.X, pady=(5, 0))
+
+        # Consolidate dashboards button, merging several into a new one
+        ttk.Button(home_frame, text="Consolidate Dashboards", command=self.consolidate_dashboards).grid(row=2, column=1, pady=10, padx=10, sticky=tk.N)
+
         # Centering horizontally and vertically
         home_frame.columnconfigure(0, weight=1)
         home_frame.columnconfigure(1, weight=1)
+        home_frame.columnconfigure(2, weight=1)
         home_frame.rowconfigure(0, weight=1)
         home_frame.rowconfigure(1, weight=1)
+        home_frame.rowconfigure(2, weight=1)
 
         # Center the home_frame in the root window
         self.root.columnconfigure(0, weight=1)
@@ -61,12 +169,51 @@ class ExpenseTrackerApp:
 
 
 
+    def create_status_bar(self):
+        """Creates the status bar that shows background tasks, kept across screen changes."""
+        self.status_bar = ttk.Frame(self.root, padding=(5, 2))
+        self.status_bar.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.status_label = ttk.Label(self.status_bar)
+        self.status_label.pack(side=tk.LEFT)
+        self.status_progress = ttk.Progressbar(self.status_bar, orient=tk.HORIZONTAL, length=200, maximum=100)
+        self.status_progress.pack(side=tk.RIGHT)
+        self.status_animating = False
+        self.status_bar.grid_remove()  # Shown only while something is running
+
+    def show_busy(self, tasks):
+        """Shows the most recent background task in the status bar, or hides it when there are none."""
+        if not tasks:
+            self.status_progress.stop()
+            self.status_animating = False
+            self.status_bar.grid_remove()
+            return
+
+        task = tasks[-1]
+        more = f" (+{len(tasks) - 1} more)" if len(tasks) > 1 else ""
+        self.status_label.config(text=f"{task.description}...{more}")
+        if task.progress is None:
+            if not self.status_animating:
+                self.status_progress.config(mode='indeterminate')
+                self.status_progress.start(15)
+                self.status_animating = True
+        else:
+            if self.status_animating:
+                self.status_progress.stop()
+                self.status_animating = False
+            self.status_progress.config(mode='determinate', value=task.progress * 100)
+        self.status_bar.grid()
+
+    def clear_screen(self):
+        """Destroys the widgets of the current screen, keeping the status bar."""
+        for widget in self.root.winfo_children():
+            if widget is not self.status_bar:
+                widget.destroy()
+
     def create_new_dashboard(self):
         """Clears the home screen and prompts the user to enter a budget and currency symbol, then creates a new dashboard."""
         self.reset_data()  # Reset data when creating a new dashboard
 
-        for widget in self.root.winfo_children():
-            widget.destroy()
+        self.clear_screen()
 
         # Create a centered frame for user inputs
         center_frame = ttk.Frame(self.root, padding="20")
@@ -99,21 +246,20 @@ class ExpenseTrackerApp:
         """Confirms the creation of a new dashboard and initializes categories and other settings."""
         budget = self.budget_entry.get()
         if budget:
-            self.monthly_budget = float(budget)
+            self.dashboard.monthly_budget = float(budget)
         else:
             messagebox.showerror("Invalid Input", "Please enter a valid budget.")
             return
 
         currency_symbol = self.currency_symbol_entry.get()
         if currency_symbol:
-            self.currency_symbol = currency_symbol
+            self.dashboard.currency_symbol = currency_symbol
         else:
             messagebox.showerror("Invalid Input", "Please enter a valid currency symbol.")
             return
 
-        # Initialize default categories
-        self.categories = ["Rent", "Food", "Entertainment", "Car", "Credit Cards"]
         self.create_widgets()  # Create the main widgets including the dropdown
+        self.update_budget_info()
 
     def get_currency_symbol(self):
         """Prompts the user to enter a currency symbol."""
@@ -127,12 +273,26 @@ class ExpenseTrackerApp:
 
     def reset_data(self):
         """Resets all data when creating a new dashboard or returning to the home screen."""
-        self.expenses = []
-        self.categories = []  # Reset categories
-        self.monthly_budget = 0
+        self.scheduler.wait('save')  # Let a running save finish with the journal it rotates
+        self.scheduler.cancel_all()
+        self.save_requested = self.save_notify = False
+        if self.loader:
+            self.loader.cancel()
+            self.loader = None
+        self.instruments.abandon(self.load_span)  # A load that was cancelled or failed
+        self.load_span = None
+        self.filter_result = None
+        if self.filter_job is not None:
+            self.root.after_cancel(self.filter_job)
+            self.filter_job = None
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        if isinstance(self.expenses, SQLiteLedger):
+            self.expenses.close()
+        self.dashboard = Dashboard()
         self.data_loaded = False
         self.unsaved_changes = False
-        self.loaded_file_path = None
 
         # Reset additional fields if any
         self.additional_fields = {}
@@ -153,13 +313,50 @@ class ExpenseTrackerApp:
         new_symbol = simpledialog.askstring("Change Currency Symbol", "Enter new currency symbol:", initialvalue=self.currency_symbol)
 
         if new_symbol is not None:  # Check if the user didn't cancel
-            self.currency_symbol = new_symbol
+            self.dashboard.currency_symbol = new_symbol
+            self.record_change({'op': 'currency', 'symbol': new_symbol})
+            self.update_budget_info()
+            self.expense_table.reformat()  # Refresh the expense list with the new symbol
+
+    def change_budget(self):
+        """Prompts the user to change the monthly budget."""
+        new_budget = simpledialog.askfloat("Change Monthly Budget", "Enter new monthly budget:", initialvalue=self.dashboard.monthly_budget, minvalue=0)
+
+        if new_budget is not None:  # Check if the user didn't cancel
+            self.dashboard.monthly_budget = new_budget
+            self.record_change({'op': 'budget', 'value': new_budget})
             self.update_budget_info()
-            self.update_expense_list()  # Refresh the expense list with the new symbol
 
-            # Update the monthly budget display with the new currency symbol
-            if hasattr(self, 'budget_label'):
-                self.budget_label.config(text=f"Monthly Budget: {self.currency_symbol}{self.monthly_budget:.2f}")
+    def change_month_budget(self):
+        """Prompts the user for a month and a budget for just that month."""
+        today = datetime.now()
+        key = simpledialog.askstring("Change Month Budget", "Enter the month (YYYY-MM):", initialvalue=month_key(today.year, today.month))
+        if key is None:
+            return
+        try:
+            year, month = parse_month_key(key.strip())
+        except ValueError:
+            messagebox.showerror("Invalid Input", "Please enter the month as YYYY-MM.")
+            return
+        key = month_key(year, month)
+
+        current = self.dashboard.budget_for(year, month)
+        new_budget = simpledialog.askfloat("Change Month Budget", f"Enter the budget for {key}:", initialvalue=current, minvalue=0)
+        if new_budget is not None:
+            self.dashboard.monthly_budgets[key] = new_budget
+            self.record_change({'op': 'month_budget', 'month': key, 'value': new_budget})
+            self.update_budget_info()
+
+    def record_change(self, event):
+        """Marks the dashboard as changed and appends the change to the journal, if there is one."""
+        if isinstance(self.expenses, SQLiteLedger):
+            # Expense rows are committed by the ledger itself, only settings need writing
+            if event['op'] in ('category', 'budget', 'month_budget', 'currency'):
+                self.expenses.save_meta(self.dashboard.monthly_budget, self.dashboard.currency_symbol, self.dashboard.categories, self.dashboard.monthly_budgets)
+        elif self.journal:
+            self.journal.record(event)
+        else:
+            self.unsaved_changes = True
 
     def create_widgets(self):
         """Creates the main interface for adding expenses and viewing the dashboard."""
@@ -177,6 +374,18 @@ class ExpenseTrackerApp:
         # Currency Symbol Change Button
         ttk.Button(header_frame, text="Change Currency Symbol", command=self.change_currency_symbol).pack(side=tk.RIGHT, padx=2)
 
+        # Budget Change Button
+        ttk.Button(header_frame, text="Change Budget", command=self.change_budget).pack(side=tk.RIGHT, padx=2)
+
+        # Budget of a Single Month
+        ttk.Button(header_frame, text="Change Month Budget", command=self.change_month_budget).pack(side=tk.RIGHT, padx=2)
+
+        # Virtual Scrolling Toggle, on by default for large ledgers and always on for SQLite ones
+        on_disk = isinstance(self.expenses, SQLiteLedger)
+        self.virtual_table = tk.BooleanVar(value=on_disk or len(self.expenses) >= VIRTUAL_TABLE_THRESHOLD)
+        ttk.Checkbutton(header_frame, text="Virtual Scrolling", variable=self.virtual_table, command=self.create_expense_table,
+                        state=tk.DISABLED if on_disk else tk.NORMAL).pack(side=tk.RIGHT, padx=2)
+
         # Budget Information Frame
         budget_info_frame = ttk.LabelFrame(main_frame, text="Budget Information", padding="5")
         budget_info_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), padx=2, pady=(1, 1))
@@ -184,15 +393,18 @@ class ExpenseTrackerApp:
         # Font Size Adjustment
         font_size = ('Helvetica', 12)
 
-        self.budget_label = ttk.Label(budget_info_frame, text=f"Monthly Budget: {self.currency_symbol}{self.monthly_budget:.2f}", font=font_size)
+        self.budget_label = ttk.Label(budget_info_frame, text=f"Monthly Budget: {self.currency_symbol}{self.dashboard.monthly_budget:.2f}", font=font_size)
         self.budget_label.grid(row=0, column=0, sticky=tk.W, pady=1)
 
         self.total_expenses_label = ttk.Label(budget_info_frame, text=f"Total Expenses: {self.currency_symbol}0.00", font=font_size)
         self.total_expenses_label.grid(row=1, column=0, sticky=tk.W, pady=1)
 
-        self.remaining_budget_label = ttk.Label(budget_info_frame, text=f"Remaining Budget: {self.currency_symbol}{self.monthly_budget:.2f}", font=font_size)
+        self.remaining_budget_label = ttk.Label(budget_info_frame, text=f"Remaining Budget: {self.currency_symbol}{self.dashboard.monthly_budget:.2f}", font=font_size)
         self.remaining_budget_label.grid(row=2, column=0, sticky=tk.W, pady=1)
 
+        self.month_budget_label = ttk.Label(budget_info_frame, text="", font=font_size)
+        self.month_budget_label.grid(row=3, column=0, sticky=tk.W, pady=1)
+
         # Expense Input Frame (Increased Height)
         input_frame = ttk.LabelFrame(main_frame, text="Add Expense", padding="5")
         input_frame.grid(row=2, column=0, padx=2, pady=2)
@@ -200,12 +412,14 @@ class ExpenseTrackerApp:
         # Font size for inputs
         input_font = ('Helvetica', 10)
 
+        from tkcalendar import DateEntry  # Imported here as the home screen does not need it
+
         ttk.Label(input_frame, text="Date:", font=input_font).grid(row=0, column=0, sticky=tk.W)
         self.date_entry = DateEntry(input_frame, date_pattern='y-mm-dd')
         self.date_entry.grid(row=0, column=1, padx=2, pady=1)
 
         ttk.Label(input_frame, text="Category:", font=input_font).grid(row=1, column=0, sticky=tk.W)
-        self.category_combobox = ttk.Combobox(input_frame, values=self.categories, font=input_font)
+        self.category_combobox = ttk.Combobox(input_frame, values=self.dashboard.categories, font=input_font)
         self.category_combobox.grid(row=1, column=1, padx=2, pady=1)
 
         ttk.Label(input_frame, text="Amount:", font=input_font).grid(row=2, column=0, sticky=tk.W)
@@ -213,6 +427,8 @@ class ExpenseTrackerApp:
         self.amount_entry.grid(row=2, column=1, padx=2, pady=1)
 
         ttk.Button(input_frame, text="Add Expense", command=self.add_expense).grid(row=3, column=0, columnspan=2, pady=2)
+        ttk.Button(input_frame, text="Update Selected", command=self.edit_expense).grid(row=4, column=0, pady=2)
+        ttk.Button(input_frame, text="Delete Selected", command=self.delete_expense).grid(row=4, column=1, pady=2)
 
         # Category Management Frame
         category_frame = ttk.LabelFrame(main_frame, text="Manage Categories", padding="5")
@@ -226,28 +442,37 @@ class ExpenseTrackerApp:
         display_frame = ttk.LabelFrame(main_frame, text="Expenses and Budget", padding="5")
         display_frame.grid(row=1, column=1, rowspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), padx=2, pady=(5, 2))
 
-        self.expense_tree = ttk.Treeview(display_frame, columns=('Date', 'Category', 'Amount'), show='headings')
-        self.expense_tree.heading('Date', text='Date', command=lambda: self.sort_by_column('Date'))
-        self.expense_tree.heading('Category', text='Category', command=lambda: self.sort_by_column('Category'))
-        self.expense_tree.heading('Amount', text='Amount', command=lambda: self.sort_by_column('Amount'))
-        self.expense_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        # Filter Bar
+        self.create_filter_bar(display_frame, disabled=on_disk)
 
-        scrollbar = ttk.Scrollbar(display_frame, orient=tk.VERTICAL, command=self.expense_tree.yview)
-        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        self.expense_tree.configure(yscrollcommand=scrollbar.set)
+        # Expense table, rebuilt in its own frame when the table mode changes
+        self.table_frame = ttk.Frame(display_frame)
+        self.table_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.table_frame.columnconfigure(0, weight=1)
+        self.table_frame.rowconfigure(0, weight=1)
+        self.create_expense_table(populate=False)
 
         # Generate Chart Frame
         chart_frame = ttk.LabelFrame(display_frame, text="Generate Chart", padding="5")
-        chart_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=2)
+        chart_frame.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=2)
 
+        chart_controls = ttk.Frame(chart_frame)
+        chart_controls.pack(side=tk.LEFT, anchor=tk.N)
         self.chart_type = tk.StringVar(value="pie")
-        ttk.Radiobutton(chart_frame, text="Pie Chart", variable=self.chart_type, value="pie").pack(anchor=tk.W, padx=2)
-        ttk.Radiobutton(chart_frame, text="Bar Graph", variable=self.chart_type, value="bar").pack(anchor=tk.W, padx=2)
-        ttk.Radiobutton(chart_frame, text="Line Chart", variable=self.chart_type, value="line").pack(anchor=tk.W, padx=2)
-        ttk.Button(chart_frame, text="Generate Chart", command=self.generate_chart).pack(pady=5)
+        for text, value in (("Pie Chart", "pie"), ("Bar Graph", "bar"), ("Line Chart", "line")):
+            ttk.Radiobutton(chart_controls, text=text, variable=self.chart_type, value=value,
+                            command=self.refresh_chart).pack(anchor=tk.W, padx=2)
+        ttk.Button(chart_controls, text="Generate Chart", command=self.generate_chart).pack(pady=5)
 
-        # Save Data Button (at the bottom-right corner of the display_frame)
-        ttk.Button(display_frame, text="Save Data", command=self.save_data).grid(row=2, column=0, sticky=(tk.E, tk.S), padx=5, pady=(5, 2))
+        # The chart panel, which imports matplotlib, is made when the first chart is generated
+        self.chart_frame = chart_frame
+        self.chart_panel = None
+
+        # Save Data and Export JSON Buttons (at the bottom-right corner of the display_frame)
+        file_frame = ttk.Frame(display_frame)
+        file_frame.grid(row=3, column=0, sticky=(tk.E, tk.S), padx=5, pady=(5, 2))
+        ttk.Button(file_frame, text="Save Data", command=self.save_data).pack(side=tk.RIGHT)
+        ttk.Button(file_frame, text="Export JSON", command=self.export_json).pack(side=tk.RIGHT, padx=5)
 
         # Configure grid weights
         self.root.columnconfigure(0, weight=1)
@@ -255,54 +480,187 @@ class ExpenseTrackerApp:
         main_frame.columnconfigure(1, weight=1)
         main_frame.rowconfigure(1, weight=1)
         display_frame.columnconfigure(0, weight=1)
-        display_frame.rowconfigure(0, weight=1)
-        display_frame.rowconfigure(1, weight=0)
-        display_frame.rowconfigure(2, weight=0)
+        display_frame.rowconfigure(0, weight=0)
+        display_frame.rowconfigure(1, weight=1)
+        display_frame.rowconfigure(2, weight=1)
+        display_frame.rowconfigure(3, weight=0)
 
         # Increase height of input_frame
         input_frame.configure(height=150)  # Adjust this height value as needed 
 
-        # Initialize sorting state
-        self.sort_column = None
-        self.sort_order = 1  # 1 for ascending, -1 for descending
-
-    def sort_by_column(self, col):
-        """Sort the treeview by a given column."""
-        data = [(self.expense_tree.set(child, col), child) for child in self.expense_tree.get_children('')]
-    
-        # Determine if the column is numeric
-        if col == 'Amount':
-            data.sort(key=lambda x: float(x[0].replace(self.currency_symbol, '').replace(',', '')), reverse=(self.sort_order == -1))
+    def create_filter_bar(self, parent, disabled=False):
+        """Creates the bar that filters the expense table by category, date, amount and text."""
+        filter_frame = ttk.Frame(parent)
+        filter_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 2))
+        self.filter_result = None
+        self.filter_category_vars = {}  # Category name -> BooleanVar of its item in the categories menu
+
+        # Categories, several can be ticked
+        self.filter_categories_button = ttk.Menubutton(filter_frame, text="All Categories")
+        self.filter_categories_menu = tk.Menu(self.filter_categories_button, tearoff=False,
+                                              postcommand=self.update_filter_categories_menu)
+        self.filter_categories_button['menu'] = self.filter_categories_menu
+        self.filter_categories_button.grid(row=0, column=0, padx=2)
+
+        # Date range, amount range and search text
+        self.filter_entries = {}
+        for column, (key, label, width) in enumerate((('from', "From:", 11), ('to', "To:", 11), ('min', "Min:", 8),
+                                                      ('max', "Max:", 8), ('text', "Search:", 16)), start=1):
+            field = ttk.Frame(filter_frame)
+            field.grid(row=0, column=column, padx=2)
+            ttk.Label(field, text=label).pack(side=tk.LEFT)
+            entry = ttk.Entry(field, width=width)
+            entry.pack(side=tk.LEFT)
+            entry.bind('<KeyRelease>', self.schedule_filter)
+            self.filter_entries[key] = entry
+
+        ttk.Button(filter_frame, text="Clear", command=self.clear_filter).grid(row=0, column=6, padx=2)
+
+        # Whether the budget labels and charts show the filtered expenses or all of them
+        self.filter_budget = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filter_frame, text="Budget and chart use filter", variable=self.filter_budget,
+                        command=self.update_budget_info).grid(row=1, column=0, columnspan=3, sticky=tk.W, padx=2)
+
+        self.filter_status_label = ttk.Label(filter_frame, text="")
+        self.filter_status_label.grid(row=1, column=3, columnspan=4, sticky=tk.W, padx=2)
+
+        # The filter indexes need the in-memory ledger
+        if disabled:
+            for widget in (self.filter_categories_button, *self.filter_entries.values()):
+                widget.state(['disabled'])
+            self.filter_status_label.config(text="Filtering is not available for SQLite ledgers")
+
+    def update_filter_categories_menu(self):
+        """Fills the categories menu with the current categories, keeping their ticks."""
+        self.filter_categories_menu.delete(0, tk.END)
+        for name in self.dashboard.categories:
+            variable = self.filter_category_vars.setdefault(name, tk.BooleanVar(value=False))
+            self.filter_categories_menu.add_checkbutton(label=name, variable=variable, command=self.schedule_filter)
+
+    def read_filter_bar(self):
+        """Returns an ExpenseFilter from the filter bar, or None if a field is invalid."""
+        fields = {key: entry.get().strip() for key, entry in self.filter_entries.items()}
+        categories = [name for name, variable in self.filter_category_vars.items() if variable.get()]
+        self.filter_categories_button.config(text=", ".join(categories) if 0 < len(categories) <= 2 else
+                                             f"{len(categories)} Categories" if categories else "All Categories")
+        try:
+            first_day = datetime.strptime(fields['from'], '%Y-%m-%d').toordinal() if fields['from'] else None
+            last_day = datetime.strptime(fields['to'], '%Y-%m-%d').toordinal() if fields['to'] else None
+        except ValueError:
+            self.filter_status_label.config(text="Enter dates as YYYY-MM-DD")
+            return None
+        try:
+            min_amount = float(fields['min']) if fields['min'] else None
+            max_amount = float(fields['max']) if fields['max'] else None
+        except ValueError:
+            self.filter_status_label.config(text="Enter amounts as numbers")
+            return None
+        return ExpenseFilter(categories or None, first_day, last_day, min_amount, max_amount, fields['text'])
+
+    def schedule_filter(self, event=None):
+        """Applies the filter once typing pauses, so every key press does not filter the whole ledger."""
+        if self.filter_job is not None:
+            self.root.after_cancel(self.filter_job)
+        self.filter_job = self.root.after(FILTER_DELAY_MS, self.apply_filter)
+
+    def apply_filter(self):
+        """Shows only the expenses meeting the filter bar, or all of them if it is empty."""
+        self.filter_job = None
+        expense_filter = self.read_filter_bar()
+        if expense_filter is None:
+            return
+        if not expense_filter:
+            changed = self.filter_result is not None
+            self.filter_result = None
+            self.filter_status_label.config(text="")
         else:
-            data.sort(key=lambda x: x[0], reverse=(self.sort_order == -1))
-    
-        # Rearrange items in the sorted order
-        for index, (value, item) in enumerate(data):
-            self.expense_tree.move(item, '', index)
-    
-        # Toggle sort order
-        if self.sort_column == col:
-            self.sort_order *= -1
+            changed = self.filter_result is None or self.filter_result.expense_filter != expense_filter
+            if changed:
+                self.filter_result = FilterResult(self.expenses, expense_filter)
+            self.show_filter_status()
+        if changed:
+            self.update_expense_list()
+            self.update_budget_info()
+
+    def refresh_filter(self):
+        """Filters again after the expenses changed, as a filter result only holds row indices."""
+        self.filter_result = FilterResult(self.expenses, self.filter_result.expense_filter)
+        self.show_filter_status()
+        self.update_expense_list()
+
+    def show_filter_status(self):
+        self.filter_status_label.config(text=f"Showing {len(self.filter_result):,} of {len(self.expenses):,} expenses")
+
+    def clear_filter(self):
+        for entry in self.filter_entries.values():
+            entry.delete(0, tk.END)
+        for variable in self.filter_category_vars.values():
+            variable.set(False)
+        self.apply_filter()
+
+    def create_expense_table(self, populate=True):
+        """Creates the expense table, virtual-scrolling or one Treeview item per expense."""
+        for widget in self.table_frame.winfo_children():
+            widget.destroy()
+
+        # Rows are keyed by expense ID so updates only touch the affected rows
+        table_class = VirtualExpenseTable if self.virtual_table.get() else ExpenseTable
+        self.expense_table = table_class(self.table_frame, self, self.sort_by_column)
+        self.expense_tree = self.expense_table.tree
+        self.expense_tree.bind('<<TreeviewSelect>>', self.on_expense_selected)
+        self.expense_tree.bind('<Shift-Button-1>', self.on_heading_shift_click)
+
+        # Initialize sorting state
+        self.sort_columns = []  # Column headings, primary key first
+        self.sort_descending = False
+
+        if populate:
+            self.update_expense_list()
+
+    @instrumented('sort_by_column')
+    def sort_by_column(self, col, add_key=False):
+        """Sort the table by a given column, or add it as a further sort key."""
+        if col in self.sort_columns and (add_key or self.sort_columns == [col]):
+            # Same keys again, the table just reads the cached order backwards
+            self.sort_descending = not self.sort_descending
+        elif add_key:
+            self.sort_columns.append(col)
         else:
-            self.sort_column = col
-            self.sort_order = 1
-    
-        # Update column header to reflect the current sort order
-        self.expense_tree.heading(col, command=lambda: self.sort_by_column(col))
+            self.sort_columns = [col]
+            self.sort_descending = False
+
+        self.expense_table.sort([column.lower() for column in self.sort_columns], descending=self.sort_descending)
+
+        # Update column headers to reflect the current sort order
+        arrow = "\u25bc" if self.sort_descending else "\u25b2"
+        for column in self.expense_table.COLUMNS:
+            if column not in self.sort_columns:
+                self.expense_tree.heading(column, text=column)
+            elif len(self.sort_columns) == 1:
+                self.expense_tree.heading(column, text=f"{column} {arrow}")
+            else:
+                self.expense_tree.heading(column, text=f"{column} {arrow}{self.sort_columns.index(column) + 1}")
 
+    def on_heading_shift_click(self, event):
+        """Shift-clicking a column header adds it as a secondary sort key."""
+        if self.expense_tree.identify_region(event.x, event.y) != 'heading':
+            return None
+        column_number = int(self.expense_tree.identify_column(event.x).lstrip('#'))
+        self.sort_by_column(self.expense_table.COLUMNS[column_number - 1], add_key=True)
+        return 'break'
 
     def add_category(self):
         """Adds a new category to the list of categories."""
         new_category = self.new_category_entry.get().strip()
-        if new_category and new_category not in self.categories:
-            self.categories.append(new_category)
-            self.category_combobox['values'] = self.categories
+        if new_category and self.dashboard.add_category(new_category):
+            self.record_change({'op': 'category', 'name': new_category})
+            self.category_combobox['values'] = self.dashboard.categories
             self.new_category_entry.delete(0, tk.END)
         else:
             messagebox.showwarning("Invalid Category", "Category is either empty or already exists.")
 
-    def add_expense(self):
-        """Adds an expense to the list."""
+    def read_expense_form(self):
+        """Returns (date, category, amount) from the input form, or None if the amount is invalid."""
         date = self.date_entry.get_date()
         category = self.category_combobox.get()
         try:
@@ -311,94 +669,171 @@ class ExpenseTrackerApp:
                 raise ValueError
         except ValueError:
             messagebox.showerror("Invalid Amount", "Please enter a valid amount.")
+            return None
+
+        return date.strftime('%Y-%m-%d'), category, amount
+
+    @instrumented('add_expense')
+    def add_expense(self):
+        """Adds an expense to the list."""
+        expense = self.read_expense_form()
+        if expense is None:
             return
 
-        self.expenses.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'category': category,
-            'amount': amount
-        })
+        expense_id = self.expenses.append(*expense)
+        date, category, amount = expense
+        self.record_change({'op': 'add', 'date': date, 'category': category, 'amount': amount})
 
-        self.update_expense_list()
+        if self.filter_result is not None:
+            self.refresh_filter()
+        else:
+            self.expense_table.row_added(expense_id)
+        self.update_budget_info()
+
+    def on_expense_selected(self, event=None):
+        """Fills the input form with the selected expense so it can be edited."""
+        selected = self.expense_table.selected_ids()
+        if len(selected) != 1:
+            return
+
+        date, category, amount = self.expenses.record(self.expenses.index_of(selected[0]))
+        self.date_entry.set_date(datetime.strptime(date, '%Y-%m-%d').date())
+        self.category_combobox.set(category)
+        self.amount_entry.delete(0, tk.END)
+        self.amount_entry.insert(0, f"{amount:.2f}")
+
+    def edit_expense(self):
+        """Replaces the selected expense with the values in the input form."""
+        selected = self.expense_table.selected_ids()
+        if len(selected) != 1:
+            messagebox.showwarning("No Selection", "Please select a single expense to update.")
+            return
+
+        expense = self.read_expense_form()
+        if expense is None:
+            return
+
+        index = self.expenses.index_of(selected[0])
+        self.expenses.edit(index, *expense)
+        date, category, amount = expense
+        self.record_change({'op': 'edit', 'index': index, 'date': date, 'category': category, 'amount': amount})
+
+        if self.filter_result is not None:
+            self.refresh_filter()
+        else:
+            self.expense_table.row_changed(selected[0])
+        self.update_budget_info()
+
+    def delete_expense(self):
+        """Deletes the selected expenses."""
+        selected = self.expense_table.selected_ids()
+        if not selected:
+            messagebox.showwarning("No Selection", "Please select an expense to delete.")
+            return
+
+        # Deleted in one batch; journaled from the last row up, so each index is still valid when replayed
+        indices = sorted((self.expenses.index_of(expense_id) for expense_id in selected), reverse=True)
+        self.expenses.delete_rows(indices)
+        for index in indices:
+            self.record_change({'op': 'delete', 'index': index})
+        if self.filter_result is None:
+            for expense_id in selected:
+                self.expense_table.row_removed(expense_id)
+
+        if self.filter_result is not None:
+            self.refresh_filter()
         self.update_budget_info()
-        self.unsaved_changes = True
 
     def update_budget_info(self):
         """Updates the budget information display."""
-        total_expenses = sum(expense['amount'] for expense in self.expenses)
-        remaining_budget = self.monthly_budget - total_expenses
+        # The remaining budget is this month's, against its own budget
+        today = datetime.now()
+        key = month_key(today.year, today.month)
+        month_budget = self.dashboard.budget_for(today.year, today.month)
+        if self.filter_result is not None and self.filter_budget.get():
+            total_expenses, _, day_totals = self.filter_result.totals()
+            first_day, last_day = month_bounds(today.year, today.month)
+            month_spent = sum(total for day, total in day_totals.items() if first_day <= day <= last_day)
+            total_text = "Total Expenses (filtered)"
+        else:
+            total_expenses = self.expenses.total()
+            month_spent = self.expenses.month_total(today.year, today.month)  # From the time index
+            total_text = "Total Expenses"
+        remaining_budget = month_budget - month_spent
 
-        self.total_expenses_label.config(text=f"Total Expenses: {self.currency_symbol}{total_expenses:.2f}")
+        self.budget_label.config(text=f"Monthly Budget: {self.currency_symbol}{self.dashboard.monthly_budget:.2f}")
+        self.total_expenses_label.config(text=f"{total_text}: {self.currency_symbol}{total_expenses:.2f}")
         self.remaining_budget_label.config(text=f"Remaining Budget: {self.currency_symbol}{remaining_budget:.2f}")
+        self.month_budget_label.config(text=f"This Month ({key}): {self.currency_symbol}{month_spent:.2f} of "
+                                            f"{self.currency_symbol}{month_budget:.2f}")
+        self.refresh_chart()
 
+    @instrumented('update_expense_list')
     def update_expense_list(self):
-        """Updates the expense list display."""
-        for item in self.expense_tree.get_children():
-            self.expense_tree.delete(item)
-        for expense in self.expenses:
-            self.expense_tree.insert('', 'end', values=(
-                expense['date'],
-                expense['category'],
-                f"{self.currency_symbol}{expense['amount']:.2f}"
-            ))
+        """Rebuilds the expense list display from the whole ledger."""
+        self.expense_table.rebuild()
 
     def generate_chart(self):
         """Generates a chart based on selected chart type."""
-        if not self.expenses:
+        if not self.chart_has_data():
             messagebox.showwarning("No Data", "No expenses to display.")
             return
 
-        # Prepare data for charting
-        expenses_by_category = {}
-        expenses_by_date = {}
-        dates = []
-        amounts = []
-
-        for expense in self.expenses:
-            date = expense['date']
-            category = expense['category']
-            amount = expense['amount']
-
-            if category not in expenses_by_category:
-                expenses_by_category[category] = 0
-            expenses_by_category[category] += amount
-
-            if date not in expenses_by_date:
-                expenses_by_date[date] = 0
-            expenses_by_date[date] += amount
-
-        # Sort data for line chart
-        sorted_dates = sorted(expenses_by_date.keys())
-        sorted_amounts = [expenses_by_date[date] for date in sorted_dates]
-
-        # Convert string dates to datetime objects
-        sorted_dates = [datetime.strptime(date, '%Y-%m-%d') for date in sorted_dates]
+        if self.chart_panel is None:
+            # Drawn in place and kept up to date from now on
+            self.chart_panel = ChartPanel(self.chart_frame)
+            self.chart_panel.widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(5, 0))
 
+        # Prepare data for charting in the background, replacing a chart that is still being prepared
         chart_type = self.chart_type.get()
-
-        plt.figure(figsize=(10, 6))
-        if chart_type == "pie":
-            plt.pie(expenses_by_category.values(), labels=expenses_by_category.keys(), autopct='%1.1f%%')
-            plt.title('Expenses by Category (Pie Chart)')
-        elif chart_type == "bar":
-            plt.bar(expenses_by_category.keys(), expenses_by_category.values())
-            plt.title('Expenses by Category (Bar Graph)')
-            plt.xlabel('Category')
-            plt.ylabel('Amount')
-        elif chart_type == "line":
-            plt.plot(sorted_dates, sorted_amounts, marker='o')
-            plt.title('Expenses by Date (Line Chart)')
-            plt.xlabel('Date')
-            plt.ylabel('Amount')
-            # Set date format for x-axis
-            plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%d %b, %Y'))
-            plt.gca().xaxis.set_major_locator(mdates.AutoDateLocator())
-        else:
-            messagebox.showwarning("Invalid Chart Type", "Invalid chart type selected.")
+        span = self.instruments.start('generate_chart')
+        self.scheduler.submit('chart', prepare_chart_data, self.chart_totals_reader(), self.chart_panel.plot_width(),
+                              description="Preparing chart",
+                              on_done=lambda data: self.show_chart(chart_type, data, span),
+                              on_error=lambda error: self.chart_failed(error, span),
+                              on_cancel=lambda: self.instruments.abandon(span))
+
+    def show_chart(self, chart_type, data, span=None):
+        """Shows prepared chart data, finishing the timing of generate_chart if it is recorded."""
+        draw_span = self.instruments.start('chart_draw')
+        try:
+            self.chart_panel.show(chart_type, *data)
+            if draw_span is not None:
+                self.chart_panel.widget.update_idletasks()  # Draw now, so the timing includes matplotlib
+        finally:
+            self.instruments.finish(draw_span, rows=len(self.expenses))
+            self.instruments.finish(span, rows=len(self.expenses))
+
+    def chart_failed(self, error, span=None):
+        """Drops the timing of a chart whose data could not be prepared, and passes the error on."""
+        self.instruments.abandon(span)
+        raise error
+
+    def refresh_chart(self):
+        """Brings the chart up to date after a change, if one has been generated."""
+        if self.chart_panel is None or self.chart_panel.chart_type is None:
             return
-
-        plt.tight_layout()
-        plt.show()
+        if self.chart_has_data():
+            self.generate_chart()
+        else:
+            self.chart_panel.clear()
+
+    def chart_has_data(self):
+        if self.filter_result is not None and self.filter_budget.get():
+            return len(self.filter_result) > 0
+        return bool(self.expenses)
+
+    def chart_totals_reader(self):
+        """Returns a function a worker can call for the per-category and per-day totals."""
+        if isinstance(self.expenses, SQLiteLedger):
+            return lambda path=self.expenses.path: read_sqlite_totals(path)
+        if self.filter_result is not None and self.filter_budget.get():
+            # A new result is made on every change, so its totals can be handed over as they are
+            total, by_category, by_day = self.filter_result.totals()
+            return lambda: (by_category, by_day)
+        # The rollups are kept up to date as expenses change, so copying them is cheap
+        totals = self.expenses.sum_by_category(), self.expenses.sum_by_day()
+        return lambda: totals
 
     def save_data(self):
         """Saves the data to a JSON file."""
@@ -406,44 +841,323 @@ class ExpenseTrackerApp:
             messagebox.showwarning("No Data", "No data to save.")
             return
 
-        if not self.loaded_file_path:
-            file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")])
+        if not self.dashboard.path:
+            file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=DASHBOARD_FILETYPES)
             if not file_path:
                 return
-            self.loaded_file_path = file_path
+            self.dashboard.path = file_path
 
-        with open(self.loaded_file_path, 'w') as file:
-            json.dump({
-                'monthly_budget': self.monthly_budget,
-                'currency_symbol': self.currency_symbol,
-                'expenses': self.expenses,
-                'categories': self.categories  # Save categories
-            }, file, indent=4)
+        if isinstance(self.expenses, SQLiteLedger):
+            span = self.instruments.start('save_data')
+            self.expenses.save_meta(self.dashboard.monthly_budget, self.dashboard.currency_symbol, self.dashboard.categories, self.dashboard.monthly_budgets)  # Rows are already committed
+            self.instruments.finish(span, rows=len(self.expenses))
+            messagebox.showinfo("Save Data", "Data saved successfully.")
+        else:
+            self.write_snapshot(notify=True)
+
+    def ledger_for_worker(self):
+        """Returns a function that gives a worker thread a ledger of its own to read."""
+        if isinstance(self.expenses, SQLiteLedger):
+            return lambda path=self.expenses.path: SQLiteLedger(path)
+        ledger = self.expenses.copy()  # Also stops borrowing columns from a file about to be replaced
+        return lambda: ledger
+
+    def write_snapshot(self, notify=False):
+        """Rewrites the dashboard file with a new revision in the background.
+
+        Changes made while it is written go to a journal for the new
+        revision as well, which takes over once the file is in place.
+        """
+        if self.scheduler.is_running('save'):
+            self.save_requested = True
+            self.save_notify = self.save_notify or notify
+            return
 
+        revision = self.dashboard.revision + 1
+        if self.journal:
+            self.journal.begin_rotation(revision)
+        else:
+            self.journal = Journal(self.dashboard.path, revision)
         self.unsaved_changes = False
-        messagebox.showinfo("Save Data", "Data saved successfully.")
+
+        file_path = self.dashboard.path
+        span = self.instruments.start('save_data')
+        self.scheduler.submit('save', export_dashboard, self.ledger_for_worker(), file_path, self.dashboard.settings(revision), None,
+                              description=f"Saving {os.path.basename(file_path)}",
+                              on_done=lambda result: self.snapshot_written(revision, notify, span),
+                              on_error=lambda error: self.snapshot_failed(error, span),
+                              on_cancel=lambda: self.instruments.abandon(span))
+
+    def snapshot_written(self, revision, notify, span=None):
+        """Switches to the new revision's journal once its snapshot is on disk."""
+        self.dashboard.revision = revision
+        if span is not None:
+            self.instruments.finish(span, rows=len(self.expenses), bytes_written=os.path.getsize(self.dashboard.path))
+        if self.journal.next:
+            self.journal.finish_rotation()
+        if notify:
+            messagebox.showinfo("Save Data", "Data saved successfully.")
+
+        if self.save_requested:
+            notify, self.save_requested, self.save_notify = self.save_notify, False, False
+            self.write_snapshot(notify)
+
+    def snapshot_failed(self, error, span=None):
+        """Keeps the old snapshot and its journal after a failed save."""
+        self.instruments.abandon(span)
+        if self.journal.next:
+            self.journal.abort_rotation()
+        elif self.dashboard.revision == 0:
+            # The dashboard was never saved, so its changes are only in memory
+            self.journal.close()
+            os.remove(self.journal.path)
+            self.journal = None
+            self.unsaved_changes = True
+        self.save_requested = self.save_notify = False
+        messagebox.showerror("Save Failed", f"Could not save {os.path.basename(self.dashboard.path)}:\n{error}")
+
+    def export_json(self):
+        """Writes a copy of the dashboard in the JSON format, e.g. from a binary snapshot."""
+        file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=JSON_FILETYPES)
+        if not file_path:
+            return
+
+        self.scheduler.submit('export', export_dashboard, self.ledger_for_worker(), file_path, self.dashboard.settings(),
+                              'jsonl' if file_path.endswith('.jsonl') else 'json',
+                              description=f"Exporting {os.path.basename(file_path)}",
+                              on_done=lambda result: messagebox.showinfo("Export JSON", "Data exported successfully."),
+                              on_error=lambda error: messagebox.showerror("Export Failed", f"Could not export {os.path.basename(file_path)}:\n{error}"))
+
+    def autosave(self):
+        """Writes new journal entries, compacting them into the dashboard file once there are many."""
+        if self.journal:
+            self.journal.flush()
+            if self.journal.event_count >= COMPACT_EVENTS and not self.scheduler.is_running('save'):
+                self.write_snapshot()
+        self.root.after(AUTOSAVE_MS, self.autosave)
+
+    def on_close(self):
+        """Finishes a running save and flushes the journal before the window closes."""
+        self.scheduler.wait('save')
+        self.scheduler.shutdown()
+        if self.loader:
+            self.loader.cancel()
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        if isinstance(self.expenses, SQLiteLedger):
+            self.expenses.close()
+        if self.instruments.stats:
+            try:
+                self.instruments.dump()
+            except OSError as error:
+                messagebox.showerror("Instrumentation", f"Could not write the statistics:\n{error}")
+        self.root.destroy()
 
     def load_data(self):
-        """Loads data from a JSON file."""
-        file_path = filedialog.askopenfilename(filetypes=[("JSON Files", "*.json")])
+        """Loads data from a binary snapshot, or from a JSON or JSON Lines file on a background thread."""
+        file_path = filedialog.askopenfilename(filetypes=DASHBOARD_FILETYPES)
         if not file_path:
             return
 
-        with open(file_path, 'r') as file:
-            data = json.load(file)
-            self.monthly_budget = data.get('monthly_budget', 0)
-            self.currency_symbol = data.get('currency_symbol', "$")
-            self.expenses = data.get('expenses', [])
-            self.categories = data.get('categories', ["Rent", "Food", "Entertainment", "Car", "Credit Cards"])  # Default categories if not present
+        self.reset_data()
+        self.load_span = self.instruments.start('load_data')
+
+        # Binary snapshots are detected by their magic bytes and mapped in place, no parsing needed
+        if is_snapshot(file_path):
+            try:
+                self.dashboard.expenses, self.loaded_meta = load_snapshot(file_path)
+            except (OSError, ValueError) as error:
+                self.instruments.abandon(self.load_span)
+                self.load_span = None
+                messagebox.showerror("Load Failed", f"Could not load {os.path.basename(file_path)}:\n{error}")
+                return
+            self.finish_loading(file_path)
+            return
+
+        self.loaded_meta = {}
+        self.show_loading_screen(file_path)
+
+        self.loader = StreamingLoader(file_path)
+        self.loader.start(self.scheduler.executor)
+        self.root.after(LOAD_POLL_MS, self.poll_loader, self.loader)
+
+    def show_loading_screen(self, file_path):
+        """Shows load progress with a button to cancel it."""
+        self.clear_screen()
+
+        loading_frame = ttk.Frame(self.root, padding="20")
+        loading_frame.place(relx=0.5, rely=0.5, anchor=tk.CENTER)
+
+        ttk.Label(loading_frame, text=f"Loading {os.path.basename(file_path)}...", font=("Arial", 14)).grid(row=0, column=0, pady=10)
+
+        self.load_progress = ttk.Progressbar(loading_frame, orient=tk.HORIZONTAL, length=400, mode='determinate', maximum=100)
+        self.load_progress.grid(row=1, column=0, pady=5)
+
+        self.load_status_label = ttk.Label(loading_frame, text="0 expenses loaded")
+        self.load_status_label.grid(row=2, column=0, pady=5)
+
+        ttk.Button(loading_frame, text="Cancel", command=self.cancel_loading).grid(row=3, column=0, pady=10)
+
+    def poll_loader(self, loader):
+        """Moves parsed chunks from the background loader into the ledger, a few at a time."""
+        if loader is not self.loader:
+            return  # Cancelled or superseded by another load
+
+        deadline = time.perf_counter() + LOAD_POLL_BUDGET
+        while time.perf_counter() < deadline:
+            events = loader.poll(max_events=1)
+            if not events:
+                break
+
+            kind, payload = events[0]
+            if kind == 'rows':
+                self.expenses.extend(payload)
+            elif kind == 'meta':
+                key, value = payload
+                self.loaded_meta[key] = value
+            elif kind == 'progress':
+                self.load_progress['value'] = payload * 100
+            elif kind == 'error':
+                self.loader = None
+                messagebox.showerror("Load Failed", f"Could not load {os.path.basename(loader.path)}:\n{payload}")
+                self.show_home_screen()
+                return
+            elif kind == 'done':
+                self.loader = None
+                self.finish_loading(loader.path)
+                return
+
+        self.load_status_label.config(text=f"{len(self.expenses):,} expenses loaded")
+        self.root.after(LOAD_POLL_MS, self.poll_loader, loader)
+
+    def cancel_loading(self):
+        """Stops the background loader and returns to the home screen."""
+        self.reset_data()
+        self.show_home_screen()
+
+    def finish_loading(self, file_path):
+        """Shows the dashboard once the whole file has been loaded."""
+        self.dashboard = Dashboard.from_settings(self.expenses, self.loaded_meta, file_path)
 
-        self.loaded_file_path = file_path
+        # Recover changes made since the file was last saved
+        events = self.dashboard.replay_journal()
+        self.journal = Journal(file_path, self.dashboard.revision, events)
         self.data_loaded = True
+
+        self.clear_screen()
         self.create_widgets()
 
         # Update the budget info and expense list with loaded data
         self.update_budget_info()
         self.update_expense_list()
 
+        if self.load_span is not None:
+            self.instruments.finish(self.load_span, rows=len(self.expenses), bytes_read=os.path.getsize(file_path))
+            self.load_span = None
+
+    def open_sqlite_ledger(self, file_path=None):
+        """Opens a SQLite ledger, which keeps its expenses on disk instead of loading them."""
+        if file_path is None:
+            file_path = filedialog.askopenfilename(filetypes=SQLITE_FILETYPES)
+            if not file_path:
+                return
+
+        self.reset_data()
+        try:
+            ledger = SQLiteLedger(file_path)
+        except sqlite3.Error as error:
+            messagebox.showerror("Open Failed", f"Could not open {os.path.basename(file_path)}:\n{error}")
+            return
+
+        self.dashboard = Dashboard.from_settings(ledger, ledger.load_meta(), file_path)
+        self.data_loaded = True
+
+        self.clear_screen()
+        self.create_widgets()
+
+        self.update_budget_info()
+        self.update_expense_list()
+
+    def convert_to_sqlite(self):
+        """Converts a dashboard file into a new SQLite ledger and opens it."""
+        source_path = filedialog.askopenfilename(filetypes=DASHBOARD_FILETYPES)
+        if not source_path:
+            return
+
+        initial_name = os.path.splitext(os.path.basename(source_path))[0] + ".db"
+        sqlite_path = filedialog.asksaveasfilename(defaultextension=".db", filetypes=SQLITE_FILETYPES, initialfile=initial_name)
+        if not sqlite_path:
+            return
+
+        self.scheduler.submit('convert', lambda task: convert_dashboard(source_path, sqlite_path, progress=task.report).close(),
+                              description=f"Converting {os.path.basename(source_path)}", pass_task=True,
+                              on_done=lambda result: self.open_sqlite_ledger(sqlite_path),
+                              on_error=lambda error: self.conversion_failed(source_path, error))
+
+    def conversion_failed(self, source_path, error):
+        """Reports a dashboard that could not be converted, and passes other errors on."""
+        if not isinstance(error, (OSError, ValueError, sqlite3.Error)):
+            raise error
+        messagebox.showerror("Conversion Failed", f"Could not convert {os.path.basename(source_path)}:\n{error}")
+
+    def consolidate_dashboards(self):
+        """Loads several dashboard files in parallel, to merge them into a new dashboard."""
+        paths = filedialog.askopenfilenames(filetypes=DASHBOARD_FILETYPES)
+        if not paths:
+            return
+        if len(paths) < 2:
+            messagebox.showwarning("Consolidate Dashboards", "Choose at least two dashboards to consolidate.")
+            return
+
+        from consolidate import load_dashboards  # Imported here as it pulls in multiprocessing, which most sessions never use
+
+        paths = list(paths)
+        self.scheduler.submit('consolidate', lambda task: load_dashboards(paths, progress=task.report),
+                              description=f"Loading {len(paths)} dashboards", pass_task=True,
+                              on_done=self.merge_dashboards, on_error=self.consolidation_failed)
+
+    def merge_dashboards(self, loaded):
+        """Asks for the exchange rates the loaded dashboards need, then merges them in the background."""
+        from consolidate import merge, missing_rates, target_currency
+
+        target = target_currency(loaded)
+        rates = {}
+        for symbol in missing_rates(loaded, target):
+            rate = simpledialog.askfloat("Exchange Rate", f"Some dashboards are in {symbol}.\n"
+                                         f"Enter the value of 1 {symbol} in {target}:", minvalue=0)
+            if not rate:
+                return
+            rates[symbol] = rate
+
+        self.scheduler.submit('consolidate', merge, loaded, target, rates, description="Merging dashboards",
+                              on_done=self.open_consolidation, on_error=self.consolidation_failed)
+
+    def open_consolidation(self, result):
+        """Shows a consolidation as a new dashboard, saved to a new file when the user saves it."""
+        self.reset_data()
+        self.dashboard = result.to_dashboard()
+        self.data_loaded = True
+        self.unsaved_changes = True
+
+        self.clear_screen()
+        self.create_widgets()
+
+        self.update_budget_info()
+        self.update_expense_list()
+
+        duplicates = sum(source.duplicates for source in result.sources)
+        messagebox.showinfo("Consolidate Dashboards",
+                            f"Merged {len(self.expenses):,} expenses from {len(result.sources)} dashboards "
+                            f"in {self.currency_symbol}, leaving out {duplicates:,} already in another dashboard.\n"
+                            f"Save to write the consolidation to a new file.")
+
+    def consolidation_failed(self, error):
+        """Reports dashboards that could not be consolidated, and passes other errors on."""
+        if not isinstance(error, (OSError, ValueError)):
+            raise error
+        messagebox.showerror("Consolidation Failed", f"Could not consolidate the dashboards:\n{error}")
+
     def run(self):
         """Runs the application."""
         self.root.mainloop()
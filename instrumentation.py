@@ -0,0 +1,207 @@
+"""Opt-in timings of the app's main operations.
+
+``Instrumentation`` records, per operation, a latency histogram and the
+rows and bytes it handled. Synchronous methods are wrapped with
+``instrumented``; operations that finish later on the Tk thread (loading,
+saving, charts) call ``start`` when they begin and ``finish`` when they are
+done, or ``abandon`` if they are cancelled or fail. While it is disabled
+these cost one attribute check, so it can stay in place.
+
+One operation can also be run under cProfile: ``profile_next`` arms it,
+and the next matching operation writes its profile to a ``.prof`` file
+next to the dump file (``python -m pstats`` reads it). Only the Tk thread
+is profiled, not the worker jobs an operation waits for.
+
+It is enabled from the debug panel (F12), or at startup with the
+``SPENDO_INSTRUMENT`` environment variable set to the file the statistics
+are dumped to as JSON when the app closes.
+"""
+
+import cProfile
+import functools
+import json
+import os
+import time
+from datetime import datetime
+
+ENV_VARIABLE = 'SPENDO_INSTRUMENT'
+DEFAULT_DUMP_PATH = 'spendo_instrumentation.json'
+
+# Upper bounds of the histogram buckets in milliseconds, doubling; the last bucket has no bound
+BUCKET_BOUNDS_MS = tuple(0.25 * 2 ** power for power in range(16))
+
+# Armed by profile_next to profile whichever operation comes next
+ANY_OPERATION = '*'
+
+
+class LatencyHistogram:
+    """Counts of latencies in doubling buckets, from 0.25 ms to about 8 s."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, milliseconds):
+        bucket = 0
+        while bucket < len(BUCKET_BOUNDS_MS) and milliseconds > BUCKET_BOUNDS_MS[bucket]:
+            bucket += 1
+        self.counts[bucket] += 1
+        self.count += 1
+        self.total += milliseconds
+        self.max = max(self.max, milliseconds)
+
+    def percentile(self, fraction):
+        """Returns the upper bound of the bucket holding the given fraction of latencies, at most the maximum."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return min(BUCKET_BOUNDS_MS[bucket], self.max) if bucket < len(BUCKET_BOUNDS_MS) else self.max
+        return self.max
+
+    def buckets(self):
+        """Returns [(label, count)] for the buckets from the first to the last non-empty one."""
+        used = [bucket for bucket, count in enumerate(self.counts) if count]
+        if not used:
+            return []
+        labels = [f"<= {bound:g} ms" for bound in BUCKET_BOUNDS_MS] + [f"> {BUCKET_BOUNDS_MS[-1]:g} ms"]
+        return [(labels[bucket], self.counts[bucket]) for bucket in range(used[0], used[-1] + 1)]
+
+
+class OperationStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.rows = 0  # Rows of the ledger when it last ran
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def to_dict(self):
+        latency = self.latency
+        return {
+            'count': latency.count,
+            'mean_ms': latency.total / latency.count if latency.count else 0.0,
+            'p50_ms': latency.percentile(0.5),
+            'p95_ms': latency.percentile(0.95),
+            'max_ms': latency.max,
+            'histogram': dict(latency.buckets()),
+            'rows': self.rows,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+        }
+
+
+class Span:
+    """One running operation, from start to finish."""
+
+    __slots__ = ('name', 'start', 'profile')
+
+    def __init__(self, name, profile):
+        self.name = name
+        self.profile = profile
+        self.start = time.perf_counter()
+
+
+class Instrumentation:
+    def __init__(self, enabled=False, dump_path=DEFAULT_DUMP_PATH):
+        self.enabled = enabled
+        self.dump_path = dump_path
+        self.stats = {}  # Operation name -> OperationStats
+        self.profile_armed = None  # Operation name or ANY_OPERATION to profile next
+        self.profiles = []  # Profile files written
+
+    @classmethod
+    def from_environment(cls):
+        """Returns an instance enabled if SPENDO_INSTRUMENT names a dump file."""
+        path = os.environ.get(ENV_VARIABLE)
+        return cls(enabled=True, dump_path=path) if path else cls()
+
+    def start(self, name):
+        """Returns a Span for an operation that finishes later, or None while disabled."""
+        if not self.enabled:
+            return None
+        profile = None
+        if self.profile_armed in (name, ANY_OPERATION):
+            self.profile_armed = None
+            profile = cProfile.Profile()
+            profile.enable()
+        return Span(name, profile)
+
+    def finish(self, span, rows=None, bytes_read=0, bytes_written=0):
+        """Records a finished operation; spans of None (started while disabled) are ignored."""
+        if span is None:
+            return
+        milliseconds = (time.perf_counter() - span.start) * 1000
+        if span.profile is not None:
+            span.profile.disable()
+            self._write_profile(span)
+
+        stats = self.stats.get(span.name)
+        if stats is None:
+            stats = self.stats[span.name] = OperationStats()
+        stats.latency.record(milliseconds)
+        if rows is not None:
+            stats.rows = rows
+        stats.bytes_read += bytes_read
+        stats.bytes_written += bytes_written
+
+    def abandon(self, span):
+        """Drops an operation that will not finish (cancelled, superseded or failed) without recording it.
+
+        Its profile, if it had one, is discarded and armed again for the next run of the operation.
+        """
+        if span is None or span.profile is None:
+            return
+        span.profile.disable()
+        span.profile = None
+        if self.profile_armed is None:
+            self.profile_armed = span.name
+
+    def profile_next(self, name=ANY_OPERATION):
+        """Profiles the next run of an operation (of any, by default), enabling instrumentation."""
+        self.enabled = True
+        self.profile_armed = name
+
+    def _write_profile(self, span):
+        directory = os.path.dirname(os.path.abspath(self.dump_path))
+        path = os.path.join(directory, f"spendo_{span.name}_{datetime.now():%Y%m%d_%H%M%S}.prof")
+        span.profile.dump_stats(path)
+        self.profiles.append(path)
+
+    def reset(self):
+        self.stats.clear()
+
+    def to_dict(self):
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'operations': {name: stats.to_dict() for name, stats in sorted(self.stats.items())},
+            'profiles': list(self.profiles),
+        }
+
+    def dump(self, path=None):
+        """Writes the statistics as JSON, returning the path written."""
+        path = path or self.dump_path
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=4)
+        return path
+
+
+def instrumented(name):
+    """Decorates an app method to be recorded as an operation by its self.instruments."""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            instruments = self.instruments
+            if not instruments.enabled:
+                return method(self, *args, **kwargs)
+            span = instruments.start(name)
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                instruments.finish(span, rows=len(self.expenses))
+        return wrapper
+    return decorate
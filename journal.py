@@ -0,0 +1,193 @@
+"""Append-only change journal kept next to a dashboard file.
+
+Every change made in the dashboard is appended to ``<dashboard>.journal`` as
+one JSON line; saving rewrites the dashboard (the snapshot) and starts an
+empty journal. Opening a dashboard replays its journal on top of the
+snapshot, so changes survive a crash even if they were never saved.
+
+The first line of the journal names the snapshot ``revision`` it applies
+to. Saving bumps the revision in the snapshot before the journal is reset,
+so a crash between the two leaves a journal that is recognisably stale and
+is not replayed twice.
+
+Snapshots are written in the background, so while one is being written
+new events go both to the journal and to ``<dashboard>.journal.next``,
+which is headed with the new revision and replaces the journal once the
+snapshot is in place. Whichever of the two matches the snapshot on disk
+is replayed.
+
+Events:
+
+    {"op": "add", "date": "2024-01-31", "category": "Food", "amount": 12.5}
+    {"op": "edit", "index": 3, "date": ..., "category": ..., "amount": ...}
+    {"op": "delete", "index": 3}
+    {"op": "category", "name": "Travel"}
+    {"op": "budget", "value": 1500.0}
+    {"op": "month_budget", "month": "2026-03", "value": 1200.0}   (a null value removes it)
+    {"op": "currency", "symbol": "€"}
+
+Row indices are positions in the ledger at the time of the change, which
+replay reproduces exactly because it applies the same changes in order.
+"""
+
+import json
+import os
+
+# Pending events are fsynced once this many have been recorded, or on autosave
+FSYNC_BATCH = 64
+
+
+def journal_path(dashboard_path, next_revision=False):
+    return dashboard_path + ('.journal.next' if next_revision else '.journal')
+
+
+def _read_events(path, revision):
+    """Returns the events of a journal file, or None if it is missing or for another revision."""
+    if not os.path.exists(path):
+        return None
+
+    events = []
+    with open(path, 'r', encoding='utf-8') as file:
+        header = None
+        for line in file:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                break  # A line cut off by a crash, everything before it is intact
+            if header is None:
+                header = entry
+                if header.get('revision') != revision:
+                    return None  # Written against another snapshot
+                continue
+            events.append(entry)
+    return events
+
+
+def read_journal(dashboard_path, revision):
+    """Returns the events recorded against a snapshot revision, or [] if there are none."""
+    for path in (journal_path(dashboard_path), journal_path(dashboard_path, next_revision=True)):
+        events = _read_events(path, revision)
+        if events is not None:
+            return events
+    return []
+
+
+def apply_event(state, event):
+    """Applies one journal event to anything with expenses, categories, monthly_budget(s) and currency_symbol."""
+    op = event['op']
+    if op == 'add':
+        state.expenses.append(event['date'], event['category'], event['amount'])
+    elif op == 'edit':
+        state.expenses.edit(event['index'], event['date'], event['category'], event['amount'])
+    elif op == 'delete':
+        state.expenses.delete(event['index'])
+    elif op == 'category':
+        if event['name'] not in state.categories:
+            state.categories.append(event['name'])
+    elif op == 'budget':
+        state.monthly_budget = event['value']
+    elif op == 'month_budget':
+        if event['value'] is None:
+            state.monthly_budgets.pop(event['month'], None)
+        else:
+            state.monthly_budgets[event['month']] = event['value']
+    elif op == 'currency':
+        state.currency_symbol = event['symbol']
+    else:
+        raise ValueError(f"Unknown journal event: {op}")
+
+
+def replay(state, events):
+    for event in events:
+        apply_event(state, event)
+
+
+def write_atomic(path, write, binary=False):
+    """Writes a file through a temporary file and fsync, so the old copy survives a crash."""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') if binary else open(temp_path, 'w', encoding='utf-8') as file:
+        write(file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+class Journal:
+    """Buffers change events and appends them to the journal file in fsynced batches."""
+
+    def __init__(self, dashboard_path, revision, events=(), fsync_batch=FSYNC_BATCH, next_revision=False):
+        """Starts the journal of a snapshot revision, keeping events already replayed onto it.
+
+        The file is rewritten rather than appended to, which drops a stale
+        journal or a line left half-written by a crash.
+        """
+        self.dashboard_path = dashboard_path
+        self.path = journal_path(dashboard_path, next_revision)
+        self.fsync_batch = fsync_batch
+        self.pending = []
+        self.file = None
+        self.next = None  # Journal of the snapshot being written, see begin_rotation
+        self._start(revision, events)
+
+        if not next_revision and os.path.exists(journal_path(dashboard_path, next_revision=True)):
+            os.remove(journal_path(dashboard_path, next_revision=True))  # Left over from a crash
+
+    def _start(self, revision, events=()):
+        header = {'journal': 1, 'revision': revision}
+        write_atomic(self.path, lambda file: file.writelines(json.dumps(entry) + '\n' for entry in [header, *events]))
+        self.revision = revision
+        self.event_count = len(events)  # Events since the snapshot, written or not
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def record(self, event):
+        self.pending.append(event)
+        self.event_count += 1
+        if self.next:
+            self.next.record(event)
+        if len(self.pending) >= self.fsync_batch:
+            self.flush()
+
+    def flush(self):
+        """Appends and fsyncs the pending events, returning how many were written."""
+        if self.next:
+            self.next.flush()
+        if not self.pending:
+            return 0
+        self.file.write(''.join(json.dumps(event) + '\n' for event in self.pending))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        written = len(self.pending)
+        self.pending = []
+        return written
+
+    def begin_rotation(self, revision):
+        """Starts recording events for a snapshot revision that is being written, as well as this one."""
+        self.abort_rotation()
+        self.next = Journal(self.dashboard_path, revision, fsync_batch=self.fsync_batch, next_revision=True)
+
+    def finish_rotation(self):
+        """Switches to the journal of the new snapshot once that is safely on disk."""
+        next_journal = self.next
+        self.next = None
+        next_journal.flush()
+        next_journal.file.close()
+        self.file.close()
+        os.replace(next_journal.path, self.path)
+
+        self.pending = []
+        self.revision = next_journal.revision
+        self.event_count = next_journal.event_count
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def abort_rotation(self):
+        """Drops the journal of a snapshot that failed to write."""
+        if self.next:
+            self.next.file.close()
+            os.remove(self.next.path)
+            self.next = None
+
+    def close(self):
+        self.flush()
+        self.file.close()
+        if self.next:
+            self.next.file.close()
@@ -0,0 +1,124 @@
+"""Compact binary snapshot format for dashboards.
+
+Layout (little-endian):
+
+    header          8s magic, H version, H reserved, Q row count, I settings length
+    settings        UTF-8 JSON: monthly_budget, currency_symbol, categories, [monthly_budgets,] revision
+    category table  I count, then per category H length + UTF-8 name, in code order
+    padding         to an 8-byte boundary
+    dates           int32[row count]    day numbers
+    codes           uint16[row count]   category codes
+    padding         to an 8-byte boundary
+    amounts         float64[row count]
+
+The loader memory-maps the file and hands the columns to the ledger as
+memoryviews, so opening a snapshot does not parse or copy the expenses;
+the ledger copies them into arrays the first time it is changed.
+"""
+
+from array import array
+import json
+import mmap
+import os
+import struct
+import sys
+
+from ledger import Ledger
+
+MAGIC = b'SPNDSNAP'
+VERSION = 1
+EXTENSION = '.spendo'
+
+_HEADER = struct.Struct('<8sHHQI')
+_COUNT = struct.Struct('<I')
+_LENGTH = struct.Struct('<H')
+
+
+def _padding(offset):
+    return -offset % 8
+
+
+def is_snapshot(path):
+    """Returns True if the file is a binary snapshot, or would be written as one."""
+    if not os.path.exists(path):
+        return path.endswith(EXTENSION)
+    with open(path, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def write_snapshot(file, ledger, settings):
+    """Writes the ledger and dashboard settings to a binary file object."""
+    settings_bytes = json.dumps(settings).encode('utf-8')
+    count = len(ledger)
+
+    parts = [_HEADER.pack(MAGIC, VERSION, 0, count, len(settings_bytes)), settings_bytes,
+             _COUNT.pack(len(ledger.category_names))]
+    for name in ledger.category_names:
+        encoded = name.encode('utf-8')
+        parts.append(_LENGTH.pack(len(encoded)))
+        parts.append(encoded)
+    offset = sum(len(part) for part in parts)
+    parts.append(b'\0' * _padding(offset))
+    file.write(b''.join(parts))
+
+    dates, codes, amounts = ledger.dates, ledger.codes, ledger.amounts
+    if sys.byteorder == 'big':
+        dates, codes, amounts = (_swapped(column) for column in (dates, codes, amounts))
+
+    file.write(dates)
+    file.write(codes)
+    file.write(b'\0' * _padding(count * 6))
+    file.write(amounts)
+
+
+def _swapped(column):
+    swapped = array(column.format if isinstance(column, memoryview) else column.typecode, column)
+    swapped.byteswap()
+    return swapped
+
+
+def load_snapshot(path):
+    """Memory-maps a snapshot and returns (ledger, settings) without copying the columns."""
+    with open(path, 'rb') as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapping)
+
+    if len(view) < _HEADER.size:
+        raise ValueError(f"{path} is too short to be a snapshot")
+    magic, version, _, count, settings_length = _HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a snapshot file")
+    if version != VERSION:
+        raise ValueError(f"{path} has unsupported snapshot version {version}")
+
+    offset = _HEADER.size
+    settings = json.loads(bytes(view[offset:offset + settings_length]).decode('utf-8'))
+    offset += settings_length
+
+    (category_count,) = _COUNT.unpack_from(view, offset)
+    offset += _COUNT.size
+    category_names = []
+    for _ in range(category_count):
+        (length,) = _LENGTH.unpack_from(view, offset)
+        offset += _LENGTH.size
+        category_names.append(bytes(view[offset:offset + length]).decode('utf-8'))
+        offset += length
+    offset += _padding(offset)
+
+    expected_size = offset + count * 6 + _padding(count * 6) + count * 8
+    if len(view) < expected_size:
+        raise ValueError(f"{path} is truncated")
+
+    dates = view[offset:offset + count * 4].cast('i')
+    offset += count * 4
+    codes = view[offset:offset + count * 2].cast('H')
+    offset += count * 2 + _padding(count * 6)
+    amounts = view[offset:offset + count * 8].cast('d')
+
+    if sys.byteorder == 'big':
+        # The columns are stored little-endian, so big-endian machines pay for a copy
+        dates, codes, amounts = (_swapped(column) for column in (dates, codes, amounts))
+        mapping = None
+
+    ledger = Ledger.from_columns(dates, codes, amounts, category_names, mapping)
+    return ledger, settings
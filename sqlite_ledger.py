@@ -0,0 +1,271 @@
+"""SQLite-backed ledger for dashboards too large to keep in memory.
+
+It offers the parts of the ``Ledger`` interface the dashboard uses, but the
+expenses stay on disk: the table pages rows in with ``window`` (ORDER BY /
+LIMIT / OFFSET over indexed columns) and the budget labels and charts use
+SQL aggregates. Every change is committed straight away, so there is no
+journal.
+
+Rows are addressed by expense ID, so ``index_of`` returns the ID itself and
+``record``, ``edit`` and ``delete`` take IDs.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import date
+from itertools import islice
+
+from dashboard_files import CHUNK_ROWS, iter_dashboard
+from journal import read_journal
+from ledger import DEFAULT_CATEGORIES
+from snapshot import is_snapshot, load_snapshot
+from time_index import month_bounds
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS expenses (
+    id INTEGER PRIMARY KEY,
+    date INTEGER NOT NULL,  -- day number, date.toordinal()
+    category TEXT NOT NULL,
+    amount REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# An index ends in the rowid, so "ORDER BY <columns>, id" only walks an index
+# whose columns are exactly <columns>: each sort of the table gets its own.
+# expenses_category covers the per-category totals and date ranges.
+INDEXES = """
+CREATE INDEX IF NOT EXISTS expenses_date ON expenses (date);
+CREATE INDEX IF NOT EXISTS expenses_category ON expenses (category, date, amount);
+CREATE INDEX IF NOT EXISTS expenses_amount ON expenses (amount);
+CREATE INDEX IF NOT EXISTS expenses_sort_category ON expenses (category);
+CREATE INDEX IF NOT EXISTS expenses_sort_category_date ON expenses (category, date);
+"""
+DROP_INDEXES = """
+DROP INDEX IF EXISTS expenses_date;
+DROP INDEX IF EXISTS expenses_category;
+DROP INDEX IF EXISTS expenses_amount;
+DROP INDEX IF EXISTS expenses_sort_category;
+DROP INDEX IF EXISTS expenses_sort_category_date;
+"""
+
+SORT_COLUMNS = {'date': 'date', 'category': 'category', 'amount': 'amount'}
+
+
+def _day_string(day):
+    return date.fromordinal(day).strftime('%Y-%m-%d')
+
+
+class SQLiteLedger:
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self.connection.executescript(INDEXES)
+        self._count = self.connection.execute("SELECT COUNT(*) FROM expenses").fetchone()[0]
+        self._total = None  # Computed on first use, then kept up to date
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for day, category, amount in self.connection.execute("SELECT date, category, amount FROM expenses ORDER BY id"):
+            yield {'date': _day_string(day), 'category': category, 'amount': amount}
+
+    def rows(self):
+        """Yields (date, category, amount) tuples in ID order."""
+        for day, category, amount in self.connection.execute("SELECT date, category, amount FROM expenses ORDER BY id"):
+            yield _day_string(day), category, amount
+
+    def to_records(self):
+        return list(self)
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+    # Dashboard settings
+
+    def load_meta(self):
+        """Returns the budget, currency symbol and categories stored with the ledger."""
+        meta = {key: json.loads(value) for key, value in self.connection.execute("SELECT key, value FROM meta")}
+        return {
+            'monthly_budget': meta.get('monthly_budget', 0),
+            'currency_symbol': meta.get('currency_symbol', "$"),
+            'categories': meta.get('categories', list(DEFAULT_CATEGORIES)),
+            'monthly_budgets': meta.get('monthly_budgets', {}),
+        }
+
+    def save_meta(self, monthly_budget, currency_symbol, categories, monthly_budgets=None):
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", [
+                ('monthly_budget', json.dumps(monthly_budget)),
+                ('currency_symbol', json.dumps(currency_symbol)),
+                ('categories', json.dumps(categories)),
+                ('monthly_budgets', json.dumps(monthly_budgets or {})),
+            ])
+
+    # Rows
+
+    def index_of(self, expense_id):
+        return expense_id
+
+    def record(self, expense_id):
+        """Returns (date, category, amount) for an expense ID."""
+        row = self.connection.execute("SELECT date, category, amount FROM expenses WHERE id = ?", (expense_id,)).fetchone()
+        if row is None:
+            raise KeyError(expense_id)
+        day, category, amount = row
+        return _day_string(day), category, amount
+
+    def append(self, date_str, category, amount):
+        """Appends a single expense and returns its ID."""
+        amount = float(amount)
+        with self.connection:
+            cursor = self.connection.execute("INSERT INTO expenses (date, category, amount) VALUES (?, ?, ?)",
+                                             (date.fromisoformat(date_str).toordinal(), category, amount))
+        self._count += 1
+        if self._total is not None:
+            self._total += amount
+        return cursor.lastrowid
+
+    def extend(self, records):
+        """Appends many expense dicts in one transaction."""
+        rows = [(date.fromisoformat(record['date']).toordinal(), record['category'], float(record['amount'])) for record in records]
+        with self.connection:
+            self.connection.executemany("INSERT INTO expenses (date, category, amount) VALUES (?, ?, ?)", rows)
+        self._count += len(rows)
+        self._total = None
+
+    def edit(self, expense_id, date_str, category, amount):
+        old_amount = self.record(expense_id)[2]
+        amount = float(amount)
+        with self.connection:
+            self.connection.execute("UPDATE expenses SET date = ?, category = ?, amount = ? WHERE id = ?",
+                                    (date.fromisoformat(date_str).toordinal(), category, amount, expense_id))
+        if self._total is not None:
+            self._total += amount - old_amount
+
+    def delete(self, expense_id):
+        old_amount = self.record(expense_id)[2]
+        with self.connection:
+            self.connection.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
+        self._count -= 1
+        if self._total is not None:
+            self._total -= old_amount
+
+    def delete_rows(self, expense_ids):
+        """Deletes several expenses in one transaction."""
+        expense_ids = list(expense_ids)
+        old_amounts = [self.record(expense_id)[2] for expense_id in expense_ids]
+        with self.connection:
+            self.connection.executemany("DELETE FROM expenses WHERE id = ?", [(expense_id,) for expense_id in expense_ids])
+        self._count -= len(expense_ids)
+        if self._total is not None:
+            self._total -= sum(old_amounts)
+
+    def window(self, start, count, sort_keys=None, descending=False):
+        """Returns [(id, date, category, amount)] for view positions start..start+count."""
+        direction = " DESC" if descending else ""
+        order_by = [SORT_COLUMNS[key] + direction for key in (sort_keys or ())]
+        order_by.append("id" + direction)
+        rows = self.connection.execute(
+            f"SELECT id, date, category, amount FROM expenses ORDER BY {', '.join(order_by)} LIMIT ? OFFSET ?",
+            (count, start))
+        return [(expense_id, _day_string(day), category, amount) for expense_id, day, category, amount in rows]
+
+    # Aggregates
+
+    def total(self):
+        if self._total is None:
+            self._total = self.connection.execute("SELECT TOTAL(amount) FROM expenses").fetchone()[0]
+        return self._total
+
+    def sum_by_category(self):
+        """Returns a {category: total} dict in order of first use."""
+        return dict(self.connection.execute(
+            "SELECT category, TOTAL(amount) FROM expenses GROUP BY category ORDER BY MIN(id)"))
+
+    def range_total(self, first_day, last_day, category=None):
+        """Returns the total spent from first_day to last_day (day numbers, inclusive), in one category or all."""
+        if category is None:
+            query, parameters = "SELECT TOTAL(amount) FROM expenses WHERE date BETWEEN ? AND ?", (first_day, last_day)
+        else:
+            query = "SELECT TOTAL(amount) FROM expenses WHERE category = ? AND date BETWEEN ? AND ?"
+            parameters = (category, first_day, last_day)
+        return self.connection.execute(query, parameters).fetchone()[0]
+
+    def month_total(self, year, month, category=None):
+        return self.range_total(*month_bounds(year, month), category)
+
+    def sum_by_day(self):
+        """Returns a {day number: total} dict sorted by date."""
+        return dict(self.connection.execute("SELECT date, TOTAL(amount) FROM expenses GROUP BY date ORDER BY date"))
+
+    def sum_by_date(self):
+        """Returns a {'YYYY-MM-DD': total} dict sorted by date."""
+        return {_day_string(day): total for day, total in self.connection.execute(
+            "SELECT date, TOTAL(amount) FROM expenses GROUP BY date ORDER BY date")}
+
+
+def _snapshot_events(path, chunk_rows=CHUNK_ROWS):
+    """Yields the events iter_dashboard would for a binary snapshot, reading rows from its mapped columns."""
+    source, settings = load_snapshot(path)
+    for key, value in settings.items():
+        yield 'meta', (key, value), 0
+    total_bytes = os.path.getsize(path)
+    rows = source.rows()
+    for start in range(0, len(source), chunk_rows):
+        chunk = [{'date': day, 'category': category, 'amount': amount}
+                 for day, category, amount in islice(rows, chunk_rows)]
+        yield 'rows', chunk, total_bytes * (start + len(chunk)) // len(source)
+
+
+def convert_dashboard(path, sqlite_path, progress=None):
+    """Streams a dashboard file of any format into a new SQLite ledger and returns it.
+
+    ``progress``, if given, is called with the fraction of the file read so far.
+
+    The journal is checked only after the expenses are copied, because the
+    revision it must match is stored in the dashboard file itself. A ledger
+    file created here is removed again if the conversion fails.
+    """
+    created = not os.path.exists(sqlite_path)
+    total_bytes = os.path.getsize(path) or 1
+    events = _snapshot_events(path) if is_snapshot(path) else iter_dashboard(path)
+    ledger = SQLiteLedger(sqlite_path)
+    try:
+        if len(ledger):
+            raise ValueError(f"{sqlite_path} already contains expenses")
+
+        # Building the indexes once at the end is much faster than updating them per row
+        ledger.connection.executescript(DROP_INDEXES)
+        meta = {}
+        for kind, payload, bytes_read in events:
+            if kind == 'rows':
+                ledger.extend(payload)
+                if progress:
+                    progress(min(1.0, bytes_read / total_bytes))
+            else:
+                key, value = payload
+                meta[key] = value
+        ledger.connection.executescript(INDEXES)
+
+        if read_journal(path, meta.get('revision', 0)):
+            raise ValueError(f"{path} has unsaved journal changes, open and save it before converting")
+
+        defaults = ledger.load_meta()
+        ledger.save_meta(meta.get('monthly_budget', defaults['monthly_budget']),
+                         meta.get('currency_symbol', defaults['currency_symbol']),
+                         meta.get('categories', defaults['categories']),
+                         meta.get('monthly_budgets', defaults['monthly_budgets']))
+    except Exception:
+        ledger.close()
+        if created:
+            os.remove(sqlite_path)
+        raise
+    return ledger
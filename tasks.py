@@ -0,0 +1,133 @@
+"""Background jobs for the Tk app.
+
+``TaskScheduler`` runs functions on a thread pool and delivers their
+results back on the Tk thread by polling with ``root.after``; Tk widgets
+must only ever be touched from there. Jobs are named: submitting a job
+under a name that is still pending supersedes the old one, which is
+cancelled if it has not started and has its result dropped if it has.
+"""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+POLL_MS = 30
+
+
+class Task:
+    """Handed to a job so it can check for cancellation and report progress."""
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self._cancelled = threading.Event()
+        self.progress = None  # None for indeterminate, else a fraction
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def report(self, fraction):
+        self.progress = fraction
+
+
+class TaskScheduler:
+    def __init__(self, root, max_workers=4, on_busy_change=None):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='spendo')
+        self.on_busy_change = on_busy_change  # Called with the pending tasks whenever they change
+        self.jobs = {}  # name -> (task, future, on_done, on_error, on_cancel)
+        self._polling = False
+
+    def submit(self, name, function, *args, description=None, on_done=None, on_error=None, on_cancel=None,
+               pass_task=False):
+        """Runs function(*args) in the pool, or function(task, *args) if pass_task is set.
+
+        ``on_done(result)`` or ``on_error(exception)`` is called on the Tk
+        thread, unless the job was cancelled or superseded first, in which
+        case ``on_cancel()`` is.
+        """
+        self.cancel(name)
+
+        task = Task(name, description or name)
+        if pass_task:
+            future = self.executor.submit(function, task, *args)
+        else:
+            future = self.executor.submit(function, *args)
+        self.jobs[name] = (task, future, on_done, on_error, on_cancel)
+        self._busy_changed()
+
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_MS, self._poll)
+        return task
+
+    def is_running(self, name):
+        return name in self.jobs
+
+    def cancel(self, name):
+        job = self.jobs.pop(name, None)
+        if job:
+            task, future, on_done, on_error, on_cancel = job
+            task.cancel()
+            future.cancel()
+            self._busy_changed()
+            if on_cancel:
+                on_cancel()
+
+    def cancel_all(self):
+        for name in list(self.jobs):
+            self.cancel(name)
+
+    def pending(self):
+        return [job[0] for job in self.jobs.values()]
+
+    def _busy_changed(self):
+        if self.on_busy_change:
+            self.on_busy_change(self.pending())
+
+    def wait(self, name):
+        """Blocks until a job has finished and runs its callback straight away."""
+        job = self.jobs.get(name)
+        if job:
+            job[1].exception()  # Waits for the job without raising its error
+            self._finish(name, job)
+            self._busy_changed()
+
+    def _finish(self, name, job):
+        if self.jobs.get(name) is not job:
+            return  # Superseded by a callback of another finished job
+        del self.jobs[name]
+        task, future, on_done, on_error, on_cancel = job
+        error = future.exception()
+        try:
+            if error is None:
+                if on_done:
+                    on_done(future.result())
+            elif on_error:
+                on_error(error)
+            else:
+                raise error
+        except Exception:
+            # Reported like an error in any other Tk callback, without stopping the polling
+            self.root.report_callback_exception(*sys.exc_info())
+
+    def _poll(self):
+        finished = [(name, job) for name, job in self.jobs.items() if job[1].done()]
+        for name, job in finished:
+            self._finish(name, job)
+
+        if finished or any(task.progress is not None for task in self.pending()):
+            self._busy_changed()
+
+        if self.jobs:
+            self.root.after(POLL_MS, self._poll)
+        else:
+            self._polling = False
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,60 @@
+"""Running aggregates of the ledger against a full recompute, through appends, edits and deletes."""
+
+import random
+
+import pytest
+
+from ledger import Ledger
+
+CATEGORIES = ["Rent", "Food", "Entertainment", "Car", "Credit Cards"]
+
+
+def random_ledger(rng, rows):
+    return Ledger.from_records([{'date': f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                                 'category': rng.choice(CATEGORIES), 'amount': round(rng.uniform(0, 500), 2)}
+                                for _ in range(rows)])
+
+
+def random_change(rng, ledger):
+    action = rng.random()
+    if action < 0.4 or not len(ledger):
+        ledger.append(f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                      rng.choice(CATEGORIES + ["Travel"]), round(rng.uniform(0, 500), 2))
+    elif action < 0.7:
+        ledger.edit(rng.randrange(len(ledger)), f"2026-{rng.randint(1, 12):02d}-01", rng.choice(CATEGORIES),
+                    round(rng.uniform(0, 500), 2))
+    else:
+        ledger.delete(rng.randrange(len(ledger)))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_aggregates_follow_changes(seed):
+    rng = random.Random(seed)
+    ledger = random_ledger(rng, 200)
+    ledger.month_total(2026, 3)  # Builds the time index, which is checked too
+    for _ in range(300):
+        random_change(rng, ledger)
+    ledger.check_aggregates()
+
+    total, by_category, by_date = ledger.recompute_aggregates()
+    assert ledger.total() == pytest.approx(total)
+    assert ledger.sum_by_category() == pytest.approx(by_category)
+    assert ledger.sum_by_date() == pytest.approx(by_date)
+
+
+def test_check_aggregates_detects_drift():
+    ledger = random_ledger(random.Random(0), 50)
+    ledger.check_aggregates()
+    ledger._category_totals[0] += 1.0
+    with pytest.raises(ValueError):
+        ledger.check_aggregates()
+
+
+def test_delete_everything():
+    ledger = random_ledger(random.Random(1), 20)
+    while len(ledger):
+        ledger.delete(len(ledger) // 2)
+    assert ledger.total() == pytest.approx(0.0, abs=1e-6)
+    assert ledger.sum_by_category() == {}
+    assert ledger.sum_by_date() == {}
+    ledger.check_aggregates()
@@ -0,0 +1,83 @@
+"""The import and summary commands run against dashboard files in a temporary directory."""
+
+import json
+from datetime import date
+
+import pytest
+
+from cli import main
+from engine import Dashboard
+from journal import Journal, read_journal
+
+TODAY = date.today().isoformat()
+
+
+def write_statement(tmp_path, rows, name='statement.csv'):
+    path = tmp_path / name
+    path.write_text("Date,Amount,Description\n" + "".join(f"{day},{amount},{text}\n" for day, amount, text in rows),
+                    encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('file_name', ['dashboard.json', 'dashboard.jsonl', 'dashboard.spendo'])
+def test_import_creates_and_appends(tmp_path, capsys, file_name):
+    dashboard_path = str(tmp_path / file_name)
+    rules_path = tmp_path / 'rules.json'
+    rules_path.write_text(json.dumps({'rules': [{'pattern': "market", 'category': "Groceries"}]}), encoding='utf-8')
+
+    first = write_statement(tmp_path, [('2026-01-03', -12.5, "Market"), ('2026-01-04', 100, "Salary"),
+                                       ('not a date', -1, "Typo")])
+    assert main(['import', first, dashboard_path, '--rules', str(rules_path), '--budget', '500', '--currency', "€",
+                 '--quiet']) == 0
+    output = capsys.readouterr().out
+    assert "skipped 1 that were not spending and 1 invalid rows" in output
+    assert "New categories: Groceries" in output
+
+    second = write_statement(tmp_path, [('2026-01-05', -3, "Kiosk")], name='second.csv')
+    assert main(['import', second, dashboard_path, '--quiet']) == 0
+    output = capsys.readouterr().out
+    assert "New categories: Uncategorized" in output
+    assert "Saved 2 expenses" in output
+
+    dashboard = Dashboard.load(dashboard_path)
+    assert dashboard.expenses.to_records() == [
+        {'date': '2026-01-03', 'category': "Groceries", 'amount': 12.5},
+        {'date': '2026-01-05', 'category': "Uncategorized", 'amount': 3.0},
+    ]
+    assert (dashboard.monthly_budget, dashboard.currency_symbol, dashboard.revision) == (500.0, "€", 2)
+
+
+def test_summary(tmp_path, capsys):
+    path = str(tmp_path / 'dashboard.json')
+    dashboard = Dashboard(monthly_budget=1000.0, currency_symbol="€", monthly_budgets={TODAY[:7]: 400.0})
+    dashboard.add_expense('2020-05-01', "Rent", 900.0)
+    dashboard.add_expense(TODAY, "Food", 150.0)
+    dashboard.save(path)
+    # A change the app has only journaled is part of the summary too
+    journal = Journal(path, dashboard.revision)
+    journal.record({'op': 'add', 'date': TODAY, 'category': "Food", 'amount': 25.0})
+    journal.close()
+    assert read_journal(path, dashboard.revision)
+
+    assert main(['summary', path]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "3 expenses"
+    assert lines[1].split() == ["Rent", "€900.00"]
+    assert lines[2].split() == ["Food", "€175.00"]
+    assert lines[3:] == [
+        "Monthly Budget: €1000.00",
+        "Total Expenses: €1075.00",
+        f"This Month ({TODAY[:7]}): €175.00 of €400.00",
+        "Remaining Budget: €225.00",
+    ]
+
+
+def test_errors_exit_with_1(tmp_path, capsys):
+    assert main(['summary', str(tmp_path / 'missing.json')]) == 1
+    assert capsys.readouterr().err.startswith("error: ")
+
+    statement = tmp_path / 'statement.csv'
+    statement.write_text("Day,Value\n2026-01-03,-1\n", encoding='utf-8')
+    assert main(['import', str(statement), str(tmp_path / 'dashboard.json'), '--quiet']) == 1
+    assert "not in the CSV header" in capsys.readouterr().err
+    assert not (tmp_path / 'dashboard.json').exists()
@@ -0,0 +1,121 @@
+"""Merging small dashboards: duplicates, categories, currencies, rates and budgets."""
+
+import pytest
+
+from consolidate import consolidate, load_for_merge, merge, missing_rates, target_currency
+from engine import Dashboard
+from journal import Journal
+
+
+def save(tmp_path, name, expenses, currency_symbol="$", monthly_budget=100.0, monthly_budgets=None, categories=None):
+    dashboard = Dashboard(monthly_budget=monthly_budget, currency_symbol=currency_symbol, categories=categories,
+                          monthly_budgets=monthly_budgets)
+    for day, category, amount in expenses:
+        dashboard.add_expense(day, category, amount)
+    path = str(tmp_path / name)
+    dashboard.save(path)
+    return path
+
+
+def load(*paths):
+    return [load_for_merge(path) for path in paths]
+
+
+def records(result):
+    return [(record['date'], record['category'], record['amount']) for record in result.ledger.to_records()]
+
+
+LUNCH = ('2026-01-03', "Food", 12.5)
+RENT = ('2026-01-01', "Rent", 900.0)
+
+
+@pytest.mark.parametrize('mine, theirs', [(1, 1), (2, 1), (1, 2), (2, 3), (3, 0)])
+def test_duplicates_kept_as_often_as_the_most_copies(tmp_path, mine, theirs):
+    first = save(tmp_path, 'mine.json', [RENT] + [LUNCH] * mine)
+    second = save(tmp_path, 'theirs.spendo', [LUNCH] * theirs + [('2026-01-04', "Food", 3.0)])
+    result = merge(load(first, second))
+
+    assert records(result).count(LUNCH) == max(mine, theirs)
+    assert records(result).count(RENT) == 1
+    assert [source.duplicates for source in result.sources] == [0, min(mine, theirs)]
+    assert len(result.ledger) == sum(source.merged for source in result.sources)
+    result.ledger.check_aggregates()
+
+
+def test_keep_duplicates(tmp_path):
+    first = save(tmp_path, 'mine.json', [RENT, LUNCH])
+    second = save(tmp_path, 'theirs.json', [RENT, LUNCH, LUNCH])
+    result = merge(load(first, second), dedupe=False)
+    assert len(result.ledger) == 5
+    assert all(source.duplicates == 0 for source in result.sources)
+
+
+def test_categories_merged_by_name(tmp_path):
+    first = save(tmp_path, 'mine.json', [('2026-01-03', "Food", 1.0)], categories=["Food", "Car"])
+    second = save(tmp_path, 'theirs.json', [('2026-01-03', " food ", 1.0), ('2026-01-05', "Pets", 2.0)],
+                  categories=[" food ", "car", "Pets"])
+    result = merge(load(first, second))
+
+    assert result.categories == ["Food", "Car", "Pets"]
+    assert records(result) == [('2026-01-03', "Food", 1.0), ('2026-01-05', "Pets", 2.0)]
+
+
+def test_currency_aliases_need_no_rate(tmp_path):
+    paths = [save(tmp_path, 'dollars.json', [LUNCH], currency_symbol="$"),
+             save(tmp_path, 'usd.json', [LUNCH, RENT], currency_symbol=" usd"),
+             save(tmp_path, 'us.json', [RENT], currency_symbol="US$")]
+    loaded = load(*paths)
+
+    assert missing_rates(loaded) == []
+    result = merge(loaded)
+    assert result.currency_symbol == "$"
+    assert sorted(records(result)) == [RENT, LUNCH]
+    assert [source.rate for source in result.sources] == [1.0, 1.0, 1.0]
+
+
+def test_rates(tmp_path):
+    dollars = save(tmp_path, 'dollars.json', [RENT, LUNCH], currency_symbol="$", monthly_budget=1000.0,
+                   monthly_budgets={'2026-01': 1200.0})
+    pounds = save(tmp_path, 'pounds.json', [('2026-01-03', "Food", 10.0), ('2026-01-03', "Food", 0.333)],
+                  currency_symbol="GBP", monthly_budget=400.0)
+    loaded = load(dollars, pounds)
+
+    # The currency most expenses are in is the default target
+    assert target_currency(loaded) == "$"
+    assert missing_rates(loaded) == ["£"]
+    with pytest.raises(ValueError):
+        merge(loaded)
+
+    result = merge(loaded, rates={"£": 1.25})
+    # 10 £ comes to the dollar lunch already merged, and converted amounts are rounded to the cent
+    assert sorted(records(result)) == [RENT, ('2026-01-03', "Food", 0.42), LUNCH]
+    assert result.sources[1].duplicates == 1
+    assert result.monthly_budget == pytest.approx(1500.0)
+    assert result.monthly_budgets == pytest.approx({'2026-01': 1700.0})
+
+    # Into pounds instead, the dollar dashboard needs the rate
+    assert missing_rates(loaded, "£") == ["$"]
+    result = merge(loaded, "GBP", rates={"USD": 0.8})
+    assert result.currency_symbol == "£"
+    assert ('2026-01-01', "Rent", 720.0) in records(result)
+
+
+def test_consolidate_replays_journals_and_writes(tmp_path):
+    first = save(tmp_path, 'mine.json', [RENT])
+    journal = Journal(first, 1)
+    journal.record({'op': 'add', 'date': LUNCH[0], 'category': LUNCH[1], 'amount': LUNCH[2]})
+    journal.close()
+    second = save(tmp_path, 'theirs.spendo', [LUNCH], currency_symbol="€")
+
+    progress = []
+    result = consolidate([first, second], currency_symbol="$", rates={"EUR": 1.0}, workers=1, progress=progress.append)
+    assert progress == [0.5, 1.0]
+    assert records(result) == [RENT, LUNCH]
+    assert result.rollups()['by_category'] == {"Rent": 900.0, "Food": 12.5}
+
+    output = str(tmp_path / 'household.json')
+    result.write(output)
+    merged = Dashboard.load(output)
+    assert merged.expenses.to_records() == result.ledger.to_records()
+    assert merged.monthly_budget == 200.0
+    assert merged.revision == 1
@@ -0,0 +1,91 @@
+"""CSV bank exports imported into a dashboard: signs, number formats, categories and row counts."""
+
+import pytest
+
+from csv_import import CSVImporter
+from engine import Dashboard
+
+GERMAN_RULES = {
+    'delimiter': ';',
+    'columns': {'date': "Buchungstag", 'amount': "Betrag", 'description': "Empfänger", 'category': "Kategorie"},
+    'date_format': '%d.%m.%Y',
+    'decimal_separator': ',',
+    'thousands_separator': '.',
+    'rules': [{'pattern': "rewe|lidl", 'category': "Food"}, {'pattern': "shell", 'category': "Car"}],
+    'category_map': {"Miete": "Rent"},
+    'default_category': "Other",
+}
+
+GERMAN_CSV = """Buchungstag;Betrag;Empfänger;Kategorie
+03.01.2026;-1.234,56;Hausverwaltung;Miete
+04.01.2026;-12,50 €;REWE Markt;Lebensmittel
+04.01.2026;-40,00;Shell Tankstelle;
+05.01.2026;2.500,00;Arbeitgeber;Gehalt
+05.01.2026;0,00;Bank;
+06.01.2026;-7,99;Kiosk;
+31.02.2026;-5,00;Nowhere;
+07.01.2026;-abc;Typo;
+08.01.2026;-1,00
+09.01.2026;-3,20;lidl;Miete
+"""
+
+
+def import_text(tmp_path, text, rules, chunk_rows=50000):
+    path = tmp_path / 'statement.csv'
+    path.write_text(text, encoding='utf-8')
+    dashboard = Dashboard(categories=["Food", "Rent"])
+    result = CSVImporter(rules, chunk_rows=chunk_rows).import_file(str(path), dashboard)
+    return dashboard, result
+
+
+@pytest.mark.parametrize('chunk_rows', [1, 3, 50000])
+def test_german_export(tmp_path, chunk_rows):
+    dashboard, result = import_text(tmp_path, GERMAN_CSV, GERMAN_RULES, chunk_rows)
+
+    assert dashboard.expenses.to_records() == [
+        {'date': '2026-01-03', 'category': "Rent", 'amount': 1234.56},          # category_map
+        {'date': '2026-01-04', 'category': "Food", 'amount': 12.5},             # Rule, ignoring case
+        {'date': '2026-01-04', 'category': "Car", 'amount': 40.0},
+        {'date': '2026-01-06', 'category': "Other", 'amount': 7.99},            # Default category
+        {'date': '2026-01-09', 'category': "Food", 'amount': 3.2},              # Rules come before the bank's category
+    ]
+    # The salary and the zero row are not spending; a bad date, a bad amount and a short row are invalid
+    assert (result.imported, result.skipped, result.invalid) == (5, 2, 3)
+    assert sorted(result.new_categories) == ["Car", "Other"]
+    assert dashboard.categories == ["Food", "Rent"] + result.new_categories
+    dashboard.expenses.check_aggregates()
+
+
+def test_bank_category_without_rules(tmp_path):
+    rules = dict(GERMAN_RULES, rules=[])
+    dashboard, result = import_text(tmp_path, GERMAN_CSV, rules)
+    assert [record['category'] for record in dashboard.expenses.to_records()] == \
+        ["Rent", "Lebensmittel", "Other", "Other", "Rent"]
+
+
+def test_expenses_positive(tmp_path):
+    text = "Date,Amount,Description\n2026-01-03,12.50,Lunch\n2026-01-04,-20,Refund\n2026-01-05,\"1,250.00\",Laptop\n"
+    dashboard, result = import_text(tmp_path, text, {'expenses_negative': False})
+    assert [record['amount'] for record in dashboard.expenses.to_records()] == [12.5, 1250.0]
+    assert [record['category'] for record in dashboard.expenses.to_records()] == ["Uncategorized"] * 2
+    assert (result.imported, result.skipped, result.invalid) == (2, 1, 0)
+
+
+def test_columns_by_position(tmp_path):
+    text = 'x,2026-01-03T10:15:00,-$4.20\nx,2026-01-04,"-$1,000.00"\n'
+    rules = {'header': False, 'columns': {'date': 1, 'amount': 2}}
+    dashboard, result = import_text(tmp_path, text, rules)
+    assert dashboard.expenses.to_records() == [
+        {'date': '2026-01-03', 'category': "Uncategorized", 'amount': 4.2},
+        {'date': '2026-01-04', 'category': "Uncategorized", 'amount': 1000.0},
+    ]
+
+
+@pytest.mark.parametrize('rules', [
+    {'columns': {'date': "Date", 'amount': "Betrag"}},
+    {'columns': {'date': "Date"}},
+    {'header': False},
+])
+def test_bad_columns_raise(tmp_path, rules):
+    with pytest.raises(ValueError):
+        import_text(tmp_path, "Date,Amount\n2026-01-03,-1\n", rules)
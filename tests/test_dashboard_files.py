@@ -0,0 +1,129 @@
+"""The incremental .json reader against the json module, with values split across reads."""
+
+import io
+import json
+
+import pytest
+
+import dashboard_files
+from dashboard_files import iter_json, iter_jsonl, write_json, write_jsonl
+
+DASHBOARD = {
+    'monthly_budget': 1234.5,
+    'currency_symbol': "€",
+    'expenses': [
+        {'date': '2026-01-03', 'category': "Rent", 'amount': 950},
+        {'date': '2026-01-04', 'category': 'Quote " and back\\slash', 'amount': 12.5},
+        {'date': '2026-01-05', 'category': "Tab\tnew\nline éè ☃ \U0001f600", 'amount': -3e-2},
+        {'date': '2026-01-06', 'category': "食費", 'amount': 1E+3},
+        {'date': '2026-01-07', 'category': "Rent", 'amount': 0},
+        {'date': '2026-01-08', 'category': "Rent", 'amount': 123456789.0123},
+    ],
+    'categories': ["Rent", "食費", 'Quote " and back\\slash'],
+    'monthly_budgets': {'2026-01': 1000, '2026-02': 2000.75},
+    'revision': 12,
+}
+
+ENCODINGS = {
+    'indented': json.dumps(DASHBOARD, indent=4),
+    'compact': json.dumps(DASHBOARD, separators=(',', ':')),
+    'ascii escapes': json.dumps(DASHBOARD, ensure_ascii=True),
+    'unicode': json.dumps(DASHBOARD, ensure_ascii=False),
+    'keys reordered': json.dumps(dict(reversed(list(DASHBOARD.items()))), ensure_ascii=False),
+    'number literals': json.dumps(DASHBOARD).replace('1000.0', '1.0e3').replace('1234.5', '12345E-1'),
+}
+
+
+def read(text, chunk_rows=2):
+    """Returns the settings and expenses iter_json reads from text, as json.load would."""
+    result = {}
+    for kind, payload, bytes_read in iter_json(io.BytesIO(text.encode('utf-8')), chunk_rows):
+        if kind == 'rows':
+            result.setdefault('expenses', []).extend(payload)
+        else:
+            key, value = payload
+            result[key] = value
+    return result
+
+
+@pytest.mark.parametrize('read_size', range(1, 65))
+@pytest.mark.parametrize('name', ENCODINGS)
+def test_values_split_across_reads(monkeypatch, name, read_size):
+    monkeypatch.setattr(dashboard_files, 'READ_SIZE', read_size)
+    text = ENCODINGS[name]
+    assert read(text) == json.loads(text)
+
+
+def test_empty_dashboard_and_expenses():
+    assert read('{}') == {}
+    assert read('{"expenses": [], "revision": 1}') == {'revision': 1}
+    assert read(' \n{ "expenses" : [ ] }\n') == {}
+
+
+@pytest.mark.parametrize('read_size', [1, 7, 64, dashboard_files.READ_SIZE])
+def test_truncated_files_raise(monkeypatch, read_size):
+    monkeypatch.setattr(dashboard_files, 'READ_SIZE', read_size)
+    text = ENCODINGS['indented']
+    for end in range(len(text.rstrip())):
+        with pytest.raises(ValueError):
+            read(text[:end])
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    '[]',
+    '{"monthly_budget" 5}',
+    '{"monthly_budget": 5 "currency_symbol": "$"}',
+    '{"expenses": [{"amount": 1},, {"amount": 2}]}',
+    '{"expenses": [{"amount": 1}}',
+    '{"expenses": {"amount": 1}}',
+    '{"monthly_budget": 12.5.3}',
+    '{"monthly_budget": nope}',
+    '{"currency_symbol": "unterminated}',
+    '{"currency_symbol": "bad \\q escape"}',
+])
+def test_invalid_files_raise(monkeypatch, text):
+    monkeypatch.setattr(dashboard_files, 'READ_SIZE', 3)
+    with pytest.raises(ValueError):
+        read(text)
+
+
+def test_cut_utf8_sequence_raises():
+    data = json.dumps({'currency_symbol': "€"}, ensure_ascii=False).encode('utf-8')
+    with pytest.raises(ValueError):
+        list(iter_json(io.BytesIO(data[:data.index(b'\xe2') + 1])))
+
+
+def test_chunks_and_progress():
+    text = ENCODINGS['compact']
+    events = list(iter_json(io.BytesIO(text.encode('utf-8')), chunk_rows=4))
+    assert [len(payload) for kind, payload, bytes_read in events if kind == 'rows'] == [4, 2]
+    progress = [bytes_read for kind, payload, bytes_read in events]
+    assert progress == sorted(progress) and progress[-1] == len(text.encode('utf-8'))
+
+
+def written_rows():
+    return [(expense['date'], expense['category'], float(expense['amount'])) for expense in DASHBOARD['expenses']]
+
+
+def test_write_json_matches_json_dump():
+    settings = {key: value for key, value in DASHBOARD.items() if key != 'expenses'}
+    file = io.StringIO()
+    write_json(file, settings, written_rows(), batch_rows=4)
+    expected = dict(DASHBOARD, expenses=[dict(expense, amount=float(expense['amount'])) for expense in DASHBOARD['expenses']])
+    assert file.getvalue() == json.dumps(expected, indent=4)
+    assert read(file.getvalue()) == expected
+
+
+def test_jsonl_round_trip():
+    header = {key: value for key, value in DASHBOARD.items() if key != 'expenses'}
+    file = io.StringIO()
+    write_jsonl(file, header, written_rows(), batch_rows=4)
+    lines = io.BytesIO(file.getvalue().encode('utf-8'))
+    result = {}
+    for kind, payload, bytes_read in iter_jsonl(lines, chunk_rows=4):
+        if kind == 'rows':
+            result.setdefault('expenses', []).extend(payload)
+        else:
+            result[payload[0]] = payload[1]
+    assert result == dict(header, expenses=[dict(zip(('date', 'category', 'amount'), row)) for row in written_rows()])
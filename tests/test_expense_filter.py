@@ -0,0 +1,80 @@
+"""Filtered rows against checking every expense."""
+
+import random
+from datetime import date
+
+import pytest
+
+from expense_filter import ExpenseFilter, FilterResult, date_prefix_range, filter_rows
+from ledger import Ledger
+
+
+@pytest.mark.parametrize('text, first, last', [
+    ('2026', date(2026, 1, 1), date(2026, 12, 31)),
+    ('2024-02', date(2024, 2, 1), date(2024, 2, 29)),
+    ('2026-12', date(2026, 12, 1), date(2026, 12, 31)),
+    ('2026-03-14', date(2026, 3, 14), date(2026, 3, 14)),
+])
+def test_date_prefix_range(text, first, last):
+    assert date_prefix_range(text) == (first.toordinal(), last.toordinal())
+
+
+@pytest.mark.parametrize('text', ['', 'Food', '2026-13', '2026-1x', '20a6', '2026-02-30', '9999-12-31x'])
+def test_date_prefix_range_rejects(text):
+    assert date_prefix_range(text) is None
+
+
+def test_filter_rows_match_every_criterion():
+    rng = random.Random(0)
+    categories = ["Rent", "Food", "Entertainment", "Car"]
+    ledger = Ledger.from_records([{'date': f"2026-{rng.randint(1, 6):02d}-{rng.randint(1, 28):02d}",
+                                   'category': rng.choice(categories), 'amount': rng.randint(1, 100)}
+                                  for _ in range(2000)])
+    first_day, last_day = date(2026, 2, 10).toordinal(), date(2026, 4, 20).toordinal()
+    filters = [
+        ExpenseFilter(categories=["Food", "Car"]),
+        ExpenseFilter(first_day=first_day, last_day=last_day, min_amount=20, max_amount=60),
+        ExpenseFilter(categories=["Rent"], min_amount=90),
+        ExpenseFilter(text="2026-03"),
+        ExpenseFilter(text="en", last_day=last_day),
+        ExpenseFilter(text="42"),
+    ]
+    for expense_filter in filters:
+        expected = [index for index in range(len(ledger)) if matches(ledger, index, expense_filter)]
+        assert list(filter_rows(ledger, expense_filter)) == expected
+
+
+@pytest.mark.parametrize('categories', [["Food"], ["Food", "Car", "Rent"]])
+@pytest.mark.parametrize('sort_keys', [('date',), ('category', 'date'), ('amount',)])
+def test_filter_result_order(categories, sort_keys):
+    """Narrow results are sorted and broad ones read out of the ledger's order; both keep its ties."""
+    rng = random.Random(1)
+    ledger = Ledger.from_records([{'date': f"2026-{rng.randint(1, 3):02d}-{rng.randint(1, 28):02d}",
+                                   'category': rng.choice(["Rent", "Food", "Car"] + [f"Other {n}" for n in range(12)]),
+                                   'amount': rng.randint(1, 20)}
+                                  for _ in range(3000)])
+    result = FilterResult(ledger, ExpenseFilter(categories=categories))
+    rows = set(result.rows)
+    assert list(result.order(sort_keys)) == [index for index in ledger.sort_order(sort_keys) if index in rows]
+
+
+def matches(ledger, index, expense_filter):
+    day, code, amount = ledger.dates[index], ledger.codes[index], ledger.amounts[index]
+    category = ledger.category_names[code]
+    if expense_filter.categories is not None and category not in expense_filter.categories:
+        return False
+    if expense_filter.first_day is not None and day < expense_filter.first_day:
+        return False
+    if expense_filter.last_day is not None and day > expense_filter.last_day:
+        return False
+    if expense_filter.min_amount is not None and amount < expense_filter.min_amount:
+        return False
+    if expense_filter.max_amount is not None and amount > expense_filter.max_amount:
+        return False
+    if expense_filter.text:
+        text = expense_filter.text
+        days = date_prefix_range(text)
+        number = float(text) if text.isdigit() else None
+        return (text.casefold() in category.casefold() or (days is not None and days[0] <= day <= days[1]) or
+                amount == number)
+    return True
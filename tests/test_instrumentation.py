@@ -0,0 +1,64 @@
+"""Spans that finish, and spans that are dropped with their profile."""
+
+import sys
+import threading
+
+from instrumentation import Instrumentation
+from tasks import TaskScheduler
+
+
+class StubRoot:
+    """Takes the scheduler's polling callbacks without running them."""
+
+    def after(self, milliseconds, callback, *args):
+        pass
+
+
+def test_finish_records_and_writes_profile(tmp_path):
+    instruments = Instrumentation(enabled=True, dump_path=str(tmp_path / 'stats.json'))
+    instruments.profile_next('chart')
+    span = instruments.start('chart')
+    assert sys.getprofile() is not None
+    instruments.finish(span, rows=10)
+
+    assert sys.getprofile() is None
+    assert instruments.stats['chart'].latency.count == 1
+    assert len(instruments.profiles) == 1
+
+
+def test_abandon_stops_profile_and_rearms(tmp_path):
+    instruments = Instrumentation(enabled=True, dump_path=str(tmp_path / 'stats.json'))
+    instruments.profile_next('chart')
+    span = instruments.start('chart')
+    instruments.abandon(span)
+
+    assert sys.getprofile() is None
+    assert 'chart' not in instruments.stats
+    assert instruments.profiles == []
+    assert instruments.profile_armed == 'chart'
+
+    # The next run is profiled instead
+    instruments.finish(instruments.start('chart'))
+    assert sys.getprofile() is None
+    assert len(instruments.profiles) == 1
+
+
+def test_abandon_ignores_disabled_spans():
+    instruments = Instrumentation()
+    instruments.abandon(instruments.start('chart'))
+    assert instruments.stats == {}
+
+
+def test_cancelled_and_superseded_jobs_call_on_cancel():
+    scheduler = TaskScheduler(StubRoot())
+    release = threading.Event()
+    cancelled = []
+    try:
+        scheduler.submit('chart', release.wait, on_cancel=lambda: cancelled.append('first'))
+        scheduler.submit('chart', release.wait, on_cancel=lambda: cancelled.append('second'))
+        assert cancelled == ['first']
+        scheduler.cancel_all()
+        assert cancelled == ['first', 'second']
+    finally:
+        release.set()
+        scheduler.shutdown()
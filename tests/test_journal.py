@@ -0,0 +1,155 @@
+"""Journal replay, torn lines, rotation and recovery from the journal of a snapshot being written."""
+
+import os
+
+import pytest
+
+from engine import Dashboard, write_dashboard
+from journal import Journal, journal_path, read_journal, replay
+from ledger import Ledger
+
+EVENTS = [
+    {'op': 'add', 'date': '2026-01-03', 'category': "Rent", 'amount': 950.0},
+    {'op': 'add', 'date': '2026-01-04', 'category': "Café", 'amount': 4.5},
+    {'op': 'category', 'name': "Café"},
+    {'op': 'add', 'date': '2026-01-05', 'category': "Food", 'amount': 20.0},
+    {'op': 'edit', 'index': 0, 'date': '2026-01-02', 'category': "Rent", 'amount': 900.0},
+    {'op': 'delete', 'index': 2},
+    {'op': 'budget', 'value': 1500.0},
+    {'op': 'month_budget', 'month': '2026-01', 'value': 1200.0},
+    {'op': 'month_budget', 'month': '2026-02', 'value': 800.0},
+    {'op': 'month_budget', 'month': '2026-02', 'value': None},
+    {'op': 'currency', 'symbol': "€"},
+]
+
+EXPECTED_RECORDS = [
+    {'date': '2026-01-02', 'category': "Rent", 'amount': 900.0},
+    {'date': '2026-01-04', 'category': "Café", 'amount': 4.5},
+]
+
+
+def saved_dashboard(tmp_path, revision=1):
+    """Writes an empty dashboard snapshot at a revision and returns its path."""
+    path = str(tmp_path / 'dashboard.json')
+    write_dashboard(path, Ledger(), Dashboard().settings(revision))
+    return path
+
+
+def check_replayed(dashboard):
+    assert dashboard.expenses.to_records() == EXPECTED_RECORDS
+    assert dashboard.monthly_budget == 1500.0
+    assert dashboard.monthly_budgets == {'2026-01': 1200.0}
+    assert dashboard.currency_symbol == "€"
+    assert "Café" in dashboard.categories
+
+
+def test_replay():
+    dashboard = Dashboard()
+    replay(dashboard, EVENTS)
+    check_replayed(dashboard)
+    dashboard.expenses.check_aggregates()
+
+
+def test_recorded_events_survive_a_crash(tmp_path):
+    path = saved_dashboard(tmp_path)
+    journal = Journal(path, 1, fsync_batch=4)
+    for event in EVENTS:
+        journal.record(event)
+    # Batches of 4 are on disk; the rest are pending until the next flush
+    assert read_journal(path, 1) == EVENTS[:8]
+    assert journal.flush() == 3
+    assert read_journal(path, 1) == EVENTS
+    journal.close()
+
+    check_replayed(Dashboard.load(path))
+
+
+def test_torn_last_line(tmp_path):
+    path = saved_dashboard(tmp_path)
+    journal = Journal(path, 1)
+    for event in EVENTS[:4]:
+        journal.record(event)
+    journal.close()
+    with open(journal_path(path), 'a', encoding='utf-8') as file:
+        file.write('{"op": "add", "date": "2026-01-0')  # Cut off by a crash
+
+    assert read_journal(path, 1) == EVENTS[:4]
+    # Reopening keeps the intact events and drops the torn line
+    Journal(path, 1, read_journal(path, 1)).close()
+    with open(journal_path(path), encoding='utf-8') as file:
+        assert len(file.readlines()) == 5
+
+
+def test_stale_journal_is_ignored(tmp_path):
+    path = saved_dashboard(tmp_path, revision=2)
+    journal = Journal(path, 1)
+    journal.record(EVENTS[0])
+    journal.close()
+
+    assert read_journal(path, 2) == []
+    assert len(Dashboard.load(path).expenses) == 0
+
+
+def test_finish_rotation(tmp_path):
+    path = saved_dashboard(tmp_path)
+    journal = Journal(path, 1)
+    journal.record(EVENTS[0])
+    journal.begin_rotation(2)
+    journal.record(EVENTS[1])
+    journal.flush()
+
+    # Until the new snapshot is in place, both journals hold the events each revision needs
+    assert read_journal(path, 1) == EVENTS[:2]
+    assert read_journal(path, 2) == EVENTS[1:2]
+
+    journal.finish_rotation()
+    journal.record(EVENTS[2])
+    journal.close()
+    assert not os.path.exists(journal_path(path, next_revision=True))
+    assert journal.revision == 2
+    assert read_journal(path, 2) == EVENTS[1:3]
+    assert read_journal(path, 1) == []
+
+
+def test_abort_rotation(tmp_path):
+    path = saved_dashboard(tmp_path)
+    journal = Journal(path, 1)
+    journal.record(EVENTS[0])
+    journal.begin_rotation(2)
+    journal.record(EVENTS[1])
+    journal.abort_rotation()
+    journal.close()
+
+    assert not os.path.exists(journal_path(path, next_revision=True))
+    assert journal.revision == 1
+    assert read_journal(path, 1) == EVENTS[:2]
+
+
+@pytest.mark.parametrize('file_name', ['dashboard.json', 'dashboard.spendo'])
+def test_recovery_from_next_journal(tmp_path, file_name):
+    """A crash after the new snapshot was written, before its journal replaced the old one."""
+    path = str(tmp_path / file_name)
+    write_dashboard(path, Ledger(), Dashboard().settings(1))
+    journal = Journal(path, 1)
+    journal.record(EVENTS[0])
+    journal.begin_rotation(2)
+    dashboard = Dashboard()
+    replay(dashboard, EVENTS[:1])
+    write_dashboard(path, dashboard.expenses, dashboard.settings(2))
+    for event in EVENTS[1:]:
+        journal.record(event)
+    journal.flush()  # The crash: finish_rotation never runs
+
+    recovered = Dashboard.load(path)
+    assert recovered.revision == 2
+    check_replayed(recovered)
+
+    # Starting the journal of the recovered dashboard clears the leftover
+    Journal(path, recovered.revision, read_journal(path, recovered.revision)).close()
+    assert not os.path.exists(journal_path(path, next_revision=True))
+    check_replayed(Dashboard.load(path))
+
+
+def test_unknown_event():
+    with pytest.raises(ValueError):
+        replay(Dashboard(), [{'op': 'rename'}])
@@ -0,0 +1,76 @@
+"""Cached sort orders and posting lists of the ledger, patched through appends, edits and deletes."""
+
+import random
+
+import pytest
+
+from ledger import DELETE_IN_PLACE_ROWS, Ledger
+
+CATEGORIES = ["Rent", "Food", "Entertainment", "Car", "Credit Cards"]
+SORT_KEYS = (('date',), ('category', 'date'), ('amount',))
+
+
+def random_ledger(rng, rows):
+    ledger = Ledger.from_records([{'date': f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                                   'category': rng.choice(CATEGORIES), 'amount': rng.randint(1, 50)}
+                                  for _ in range(rows)])
+    for keys in SORT_KEYS:
+        ledger.sort_order(keys)
+    ledger.postings()
+    return ledger
+
+
+def check_indexes(ledger):
+    for keys in SORT_KEYS:
+        key = ledger.sort_key(keys)
+        order = ledger.sort_order(keys)
+        assert sorted(order) == list(range(len(ledger)))
+        assert all(key(order[position]) <= key(order[position + 1]) for position in range(len(order) - 1))
+    for code, postings in enumerate(ledger.postings()):
+        assert list(postings) == [index for index, row_code in enumerate(ledger.codes) if row_code == code]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_indexes_follow_changes(seed):
+    rng = random.Random(seed)
+    ledger = random_ledger(rng, 200)
+    for _ in range(200):
+        action = rng.random()
+        if action < 0.4 or len(ledger) < 40:
+            ledger.append(f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                          rng.choice(CATEGORIES + ["Travel"]), rng.randint(1, 50))
+        elif action < 0.7:
+            ledger.edit(rng.randrange(len(ledger)), f"2026-{rng.randint(1, 12):02d}-01", rng.choice(CATEGORIES),
+                        rng.randint(1, 50))
+        elif action < 0.9:
+            ledger.delete(rng.randrange(len(ledger)))
+        else:
+            ledger.delete_rows(rng.sample(range(len(ledger)), rng.randint(2, 30)))
+    check_indexes(ledger)
+    ledger.check_aggregates()
+
+
+@pytest.mark.parametrize('count', [1, DELETE_IN_PLACE_ROWS, DELETE_IN_PLACE_ROWS + 1, 150])
+def test_delete_rows_matches_deleting_one_at_a_time(count):
+    rng = random.Random(count)
+    batched = random_ledger(rng, 300)
+    one_by_one = Ledger.from_records(batched.to_records())
+    indices = rng.sample(range(len(batched)), count)
+
+    batched.delete_rows(indices)
+    for index in sorted(indices, reverse=True):
+        one_by_one.delete(index)
+
+    assert batched.to_records() == one_by_one.to_records()
+    assert list(batched.ids) == list(one_by_one.ids)
+    check_indexes(batched)
+    batched.check_aggregates()
+
+
+def test_delete_everything():
+    ledger = random_ledger(random.Random(1), 20)
+    ledger.delete_rows(range(len(ledger)))
+    assert len(ledger) == 0
+    assert all(len(ledger.sort_order(keys)) == 0 for keys in SORT_KEYS)
+    assert all(len(postings) == 0 for postings in ledger.postings())
+    ledger.check_aggregates()
@@ -0,0 +1,120 @@
+"""Round trips between the JSON dashboard format and binary snapshots."""
+
+import pytest
+
+from engine import read_dashboard, write_dashboard
+from ledger import Ledger
+from snapshot import is_snapshot, load_snapshot
+from sqlite_ledger import convert_dashboard
+
+SETTINGS = {
+    'monthly_budget': 1500.0,
+    'currency_symbol': "€",
+    'categories': ["Rent", "Café & Bäckerei", 'Say "cheese"', "Back\\slash", "食費"],
+    'monthly_budgets': {'2026-01': 1200.0, '2026-02': 1800.5},
+    'revision': 7,
+}
+
+RECORDS = [
+    {'date': '2026-01-03', 'category': "Rent", 'amount': 950.0},
+    {'date': '2026-01-04', 'category': "Café & Bäckerei", 'amount': 4.2},
+    {'date': '2026-01-04', 'category': 'Say "cheese"', 'amount': 19.99},
+    {'date': '2026-02-28', 'category': "Back\\slash", 'amount': 0.01},
+    {'date': '2026-02-28', 'category': "食費", 'amount': 1234567.89},
+    {'date': '1999-12-31', 'category': "Rent", 'amount': 0.0},
+]
+
+
+def round_trip(tmp_path, ledger, settings):
+    """Writes JSON, converts it to a snapshot and back, returning what each file reads as."""
+    write_dashboard(str(tmp_path / 'first.json'), ledger, settings)
+    json_ledger, json_settings = read_dashboard(str(tmp_path / 'first.json'))
+    write_dashboard(str(tmp_path / 'dashboard.spendo'), json_ledger, json_settings)
+    snapshot_ledger, snapshot_settings = read_dashboard(str(tmp_path / 'dashboard.spendo'))
+    write_dashboard(str(tmp_path / 'second.json'), snapshot_ledger, snapshot_settings)
+    return (json_ledger, json_settings), (snapshot_ledger, snapshot_settings), read_dashboard(str(tmp_path / 'second.json'))
+
+
+def test_json_snapshot_json(tmp_path):
+    ledger = Ledger.from_records(RECORDS)
+    first, snapshot, second = round_trip(tmp_path, ledger, SETTINGS)
+
+    assert is_snapshot(str(tmp_path / 'dashboard.spendo'))
+    assert not is_snapshot(str(tmp_path / 'first.json'))
+    for read_ledger, read_settings in (first, snapshot, second):
+        assert read_ledger.to_records() == RECORDS
+        assert read_settings == SETTINGS
+        read_ledger.check_aggregates()
+    assert (tmp_path / 'first.json').read_bytes() == (tmp_path / 'second.json').read_bytes()
+
+
+def test_empty_ledger(tmp_path):
+    settings = {'monthly_budget': 0, 'currency_symbol': "$", 'categories': [], 'revision': 1}
+    for read_ledger, read_settings in round_trip(tmp_path, Ledger(), settings):
+        assert len(read_ledger) == 0
+        assert read_ledger.total() == 0.0
+        assert read_ledger.sum_by_category() == {}
+        assert read_settings == settings
+
+
+def test_snapshot_columns_are_mapped(tmp_path):
+    path = str(tmp_path / 'dashboard.spendo')
+    write_dashboard(path, Ledger.from_records(RECORDS), SETTINGS)
+    ledger, settings = load_snapshot(path)
+
+    assert isinstance(ledger.amounts, memoryview)
+    assert ledger.category_names == SETTINGS['categories']
+    assert settings['monthly_budgets'] == SETTINGS['monthly_budgets']
+    assert settings['revision'] == SETTINGS['revision']
+
+
+@pytest.mark.parametrize('change', ['append', 'edit', 'delete'])
+def test_change_mapped_ledger(tmp_path, change):
+    path = str(tmp_path / 'dashboard.spendo')
+    write_dashboard(path, Ledger.from_records(RECORDS), SETTINGS)
+    ledger, settings = load_snapshot(path)
+    ledger.sort_order(('date',))
+    ledger.postings()
+
+    expected = list(RECORDS)
+    if change == 'append':
+        ledger.append('2026-03-01', "New", 12.5)
+        expected.append({'date': '2026-03-01', 'category': "New", 'amount': 12.5})
+    elif change == 'edit':
+        ledger.edit(1, '2026-01-05', "食費", 8.0)
+        expected[1] = {'date': '2026-01-05', 'category': "食費", 'amount': 8.0}
+    else:
+        ledger.delete(2)
+        del expected[2]
+
+    # The change detaches the ledger from the file, which can then be replaced
+    assert ledger._mapping is None
+    assert ledger.to_records() == expected
+    ledger.check_aggregates()
+    assert list(ledger.sort_order(('date',))) == sorted(range(len(ledger)), key=ledger.dates.__getitem__)
+
+    write_dashboard(path, ledger, settings)
+    assert read_dashboard(path)[0].to_records() == expected
+
+
+def test_truncated_snapshot(tmp_path):
+    path = tmp_path / 'dashboard.spendo'
+    write_dashboard(str(path), Ledger.from_records(RECORDS), SETTINGS)
+    path.write_bytes(path.read_bytes()[:-4])
+    with pytest.raises(ValueError):
+        load_snapshot(str(path))
+
+
+@pytest.mark.parametrize('file_name', ['dashboard.spendo', 'dashboard.json', 'dashboard.jsonl'])
+def test_convert_to_sqlite(tmp_path, file_name):
+    path = str(tmp_path / file_name)
+    write_dashboard(path, Ledger.from_records(RECORDS), SETTINGS)
+    progress = []
+    ledger = convert_dashboard(path, str(tmp_path / 'dashboard.db'), progress=progress.append)
+    try:
+        assert [ledger.record(expense_id) for expense_id in range(1, len(RECORDS) + 1)] == \
+            [(record['date'], record['category'], record['amount']) for record in RECORDS]
+        assert ledger.load_meta()['currency_symbol'] == SETTINGS['currency_symbol']
+        assert progress[-1] == 1.0
+    finally:
+        ledger.close()
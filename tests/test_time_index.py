@@ -0,0 +1,67 @@
+"""Date-range totals of the time index against summing the rows."""
+
+import random
+from datetime import date
+
+import pytest
+
+from engine import Dashboard
+from time_index import TimeIndex, month_bounds
+
+
+def brute_total(rows, first_day, last_day, code=None):
+    return sum(amount for day, row_code, amount in rows
+               if first_day <= day <= last_day and (code is None or row_code == code))
+
+
+def random_rows(rng, count):
+    first = date(2024, 1, 1).toordinal()
+    rows = [(first + rng.randrange(3 * 365), rng.randrange(4), round(rng.uniform(0, 100), 2)) for _ in range(count)]
+    rows.append((date(1900, 1, 1).toordinal(), 0, 5.0))  # A mistyped year far from the rest
+    return rows
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_range_totals(seed):
+    rng = random.Random(seed)
+    rows = random_rows(rng, 500)
+    index = TimeIndex.from_columns([row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows], 4)
+
+    # Rows added later, including new months, categories and removals
+    for _ in range(100):
+        row = (date(2023, 6, 1).toordinal() + rng.randrange(5 * 365), rng.randrange(6), round(rng.uniform(0, 100), 2))
+        index.add(*row)
+        rows.append(row)
+    for day, code, amount in rng.sample(rows, 50):
+        index.add(day, code, -amount)
+        rows.remove((day, code, amount))
+
+    days = sorted({row[0] for row in rows})
+    for _ in range(300):
+        first_day = rng.choice(days) + rng.randrange(-40, 40)
+        last_day = first_day + rng.randrange(0, 800)
+        for code in (None, *range(7)):
+            assert index.range_total(first_day, last_day, code) == pytest.approx(
+                brute_total(rows, first_day, last_day, code), abs=1e-6)
+
+    for year, month in ((1900, 1), (2024, 2), (2025, 12), (2030, 1)):
+        assert index.range_total(*month_bounds(year, month)) == pytest.approx(
+            brute_total(rows, *month_bounds(year, month)), abs=1e-6)
+
+
+def test_size_follows_months_with_expenses():
+    days = [date(2026, 1, day).toordinal() for day in range(1, 22)] + [date(1900, 1, 1).toordinal()]
+    index = TimeIndex.from_columns(days, [0] * len(days), [1.0] * len(days), 1)
+    assert len(index.months) == 2
+    assert index.range_total(date.min.toordinal(), date.max.toordinal()) == 22.0
+
+
+def test_remaining_budget_is_the_months():
+    dashboard = Dashboard(monthly_budget=1000.0, monthly_budgets={'2026-03': 400.0})
+    for day, amount in (('2026-02-27', 700.0), ('2026-03-01', 150.0), ('2026-03-31', 25.0), ('2026-04-01', 60.0)):
+        dashboard.expenses.append(day, "Food", amount)
+
+    assert dashboard.month_spending(2026, 3) == (175.0, 400.0, 225.0)
+    assert dashboard.remaining_budget(date(2026, 3, 15)) == 225.0
+    assert dashboard.remaining_budget(date(2026, 2, 1)) == 300.0
+    assert dashboard.remaining_budget(date(2026, 5, 1)) == 1000.0
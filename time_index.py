@@ -0,0 +1,192 @@
+"""Per-category prefix sums over months, for date-range totals in O(log n).
+
+``TimeIndex`` keeps a Fenwick tree (binary indexed tree) of monthly totals
+per category plus one for all categories, over the months that have
+expenses, and the daily totals of each of those months. A date range is
+the partial months at its ends, summed from their days, plus the whole
+months between them from the trees. Adding or removing an expense and
+asking for the total of any date range (a month, a week, the last 90 days,
+for one category or all of them) each take O(log months). The index grows
+with the months that have expenses, not with the calendar span between the
+first and last one, so a stray date decades off costs one more month.
+
+Month keys are 'YYYY-MM' strings, as used for per-month budgets.
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+FIRST_DAY = date.min.toordinal()
+LAST_DAY = date.max.toordinal()
+
+
+def month_key(year, month):
+    return f"{year:04d}-{month:02d}"
+
+
+def month_bounds(year, month):
+    """Returns the first and last day number of a month."""
+    first = date(year, month, 1).toordinal()
+    following = date(year + month // 12, month % 12 + 1, 1).toordinal()
+    return first, following - 1
+
+
+def parse_month_key(key):
+    """Returns (year, month) for a 'YYYY-MM' key, raising ValueError if it is not one."""
+    if len(key) != 7 or key[4] != '-' or not (key[:4] + key[5:]).isdigit() or not 1 <= int(key[5:]) <= 12:
+        raise ValueError(f"Not a YYYY-MM month: {key!r}")
+    return int(key[:4]), int(key[5:])
+
+
+class FenwickTree:
+    """Prefix sums over a fixed number of slots with O(log n) updates and queries."""
+
+    def __init__(self, values):
+        """Builds the tree from per-slot values in O(n)."""
+        tree = array('d', [0.0])
+        tree.extend(values)
+        size = len(tree) - 1
+        for index in range(1, size + 1):
+            parent = index + (index & -index)
+            if parent <= size:
+                tree[parent] += tree[index]
+        self.tree = tree
+        self.size = size
+
+    def add(self, slot, amount):
+        index = slot + 1
+        tree, size = self.tree, self.size
+        while index <= size:
+            tree[index] += amount
+            index += index & -index
+
+    def prefix(self, end):
+        """Returns the sum of slots [0, end)."""
+        total = 0.0
+        index = min(end, self.size)
+        tree = self.tree
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+
+def _zero_month():
+    return array('d', bytes(8 * 31))
+
+
+class TimeIndex:
+    def __init__(self, category_count=0):
+        # Months with expenses, as year * 12 + month - 1, ascending; their positions are the tree slots
+        self.months = []
+        self.monthly = [array('d') for _ in range(category_count)]  # Code -> total per slot
+        self.total_monthly = array('d')
+        self.daily = {}  # (month, code) -> 31 daily totals
+        self.total_daily = {}  # Month -> 31 daily totals
+        self.trees = []
+        self.total_tree = FenwickTree(())
+        self._build_trees()
+        self._day_cache = {}  # Day number -> (month, day of month - 1)
+
+    @classmethod
+    def from_columns(cls, dates, codes, amounts, category_count):
+        """Builds the index for ledger columns in O(rows + months * categories)."""
+        # Totals per day and category first, so the calendar work is done once per pair
+        by_day = {}
+        for day, code, amount in zip(dates, codes, amounts):
+            key = day << 16 | code
+            by_day[key] = by_day.get(key, 0.0) + amount
+
+        index = cls(category_count)
+        for key, amount in by_day.items():
+            code = key & 0xFFFF
+            month, slot = index._locate(key >> 16)
+            values = index.daily.get((month, code))
+            if values is None:
+                values = index.daily[(month, code)] = _zero_month()
+            values[slot] += amount
+            values = index.total_daily.get(month)
+            if values is None:
+                values = index.total_daily[month] = _zero_month()
+            values[slot] += amount
+
+        index.months = sorted(index.total_daily)
+        slots = {month: slot for slot, month in enumerate(index.months)}
+        index.monthly = [array('d', bytes(8 * len(slots))) for _ in range(category_count)]
+        for (month, code), values in index.daily.items():
+            index.monthly[code][slots[month]] = sum(values)
+        index.total_monthly = array('d', (sum(index.total_daily[month]) for month in index.months))
+        index._build_trees()
+        return index
+
+    def _build_trees(self):
+        self.trees = [FenwickTree(values) for values in self.monthly]
+        self.total_tree = FenwickTree(self.total_monthly)
+
+    def _locate(self, day):
+        """Returns (month, day of month - 1) for a day number of an expense."""
+        located = self._day_cache.get(day)
+        if located is None:
+            when = date.fromordinal(day)
+            located = self._day_cache[day] = (when.year * 12 + when.month - 1, when.day - 1)
+        return located
+
+    def _add_month(self, position, month):
+        """Adds a month at a tree slot, rebuilding the trees in O(months * categories)."""
+        self.months.insert(position, month)
+        for values in self.monthly:
+            values.insert(position, 0.0)
+        self.total_monthly.insert(position, 0.0)
+        self.total_daily[month] = _zero_month()
+        self._build_trees()
+
+    def _add_category(self):
+        values = array('d', bytes(8 * len(self.months)))
+        self.monthly.append(values)
+        self.trees.append(FenwickTree(values))
+
+    def add(self, day, code, amount):
+        """Adds an amount (negative to remove one) on a day for a category code."""
+        month, slot = self._locate(day)
+        position = bisect_left(self.months, month)
+        if position == len(self.months) or self.months[position] != month:
+            self._add_month(position, month)
+        while code >= len(self.trees):
+            self._add_category()
+
+        values = self.daily.get((month, code))
+        if values is None:
+            values = self.daily[(month, code)] = _zero_month()
+        values[slot] += amount
+        self.total_daily[month][slot] += amount
+        self.monthly[code][position] += amount
+        self.total_monthly[position] += amount
+        self.trees[code].add(position, amount)
+        self.total_tree.add(position, amount)
+
+    def _part(self, month, start, end, code):
+        """Returns the total of days [start, end) of a month (0-based days of month)."""
+        values = self.total_daily.get(month) if code is None else self.daily.get((month, code))
+        return sum(values[start:end]) if values is not None else 0.0
+
+    def range_total(self, first_day, last_day, code=None):
+        """Returns the total from first_day to last_day inclusive, for one category code or all."""
+        if code is not None and code >= len(self.trees):
+            return 0.0
+        first_day, last_day = max(first_day, FIRST_DAY), min(last_day, LAST_DAY)
+        if last_day < first_day:
+            return 0.0
+        first, last = date.fromordinal(first_day), date.fromordinal(last_day)
+        first_month, last_month = first.year * 12 + first.month - 1, last.year * 12 + last.month - 1
+        if first_month == last_month:
+            return self._part(first_month, first.day - 1, last.day, code)
+
+        # Partial months at both ends, whole months in between from the tree
+        tree = self.total_tree if code is None else self.trees[code]
+        start = bisect_right(self.months, first_month)
+        end = bisect_left(self.months, last_month)
+        total = self._part(first_month, first.day - 1, 31, code) + self._part(last_month, 0, last.day, code)
+        if end > start:
+            total += tree.prefix(end) - tree.prefix(start)
+        return total